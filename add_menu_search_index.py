@@ -0,0 +1,44 @@
+"""
+Migration script to add the menu full-text search index to existing databases
+Creates and fills the SQLite FTS5 table used by DatabaseManager.search_menu_items
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from database.models import get_engine
+from database.search import ensure_search_index, rebuild_search_index
+
+
+def add_menu_search_index():
+    """Create the FTS5 table and (re)index all menu items"""
+    try:
+        engine = get_engine()
+        
+        if not ensure_search_index(engine):
+            print("ℹ️ Full-text index is only used with SQLite (FTS5); search falls back to a scan")
+            return True
+        
+        with engine.begin() as conn:
+            rebuild_search_index(conn)
+        
+        print("✅ Menu search index is up to date")
+        return True
+    
+    except Exception as e:
+        print(f"❌ Error adding search index: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    print("🔧 Adding menu search index...")
+    print("-" * 50)
+    success = add_menu_search_index()
+    print("-" * 50)
+    
+    if success:
+        print("✅ Migration completed successfully!")
+    else:
+        print("❌ Migration failed!")
@@ -0,0 +1,50 @@
+"""
+Migration script to add the notification tables to existing databases
+Creates notifications (shared in-app notifications) and notification_outbox
+(background email/SMS delivery) with their indexes
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import inspect
+
+from database.models import Notification, NotificationOutbox, get_engine, create_missing_indexes
+
+
+def add_notification_tables():
+    """Create the notification tables and any missing indexes"""
+    try:
+        engine = get_engine()
+        existing = set(inspect(engine).get_table_names())
+        
+        for model in (Notification, NotificationOutbox):
+            table = model.__table__
+            if table.name in existing:
+                print(f"  ✔️ Table {table.name} already exists")
+            else:
+                table.create(engine)
+                print(f"  ➕ Created table {table.name}")
+        
+        for name in create_missing_indexes(engine):
+            print(f"  ➕ Created index {name}")
+        
+        return True
+    
+    except Exception as e:
+        print(f"❌ Error adding notification tables: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    print("🔧 Adding notification tables...")
+    print("-" * 50)
+    success = add_notification_tables()
+    print("-" * 50)
+    
+    if success:
+        print("✅ Migration completed successfully!")
+    else:
+        print("❌ Migration failed!")
@@ -0,0 +1,46 @@
+"""
+Migration script to add query indexes to existing databases
+Creates the order, order item and chat history indexes declared in database/models.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from database.models import Base, get_engine, create_missing_indexes
+
+
+def add_order_indexes():
+    """Create missing tables and indexes"""
+    try:
+        engine = get_engine()
+
+        # New tables (e.g. order_sequences) get their indexes with the table
+        Base.metadata.create_all(engine)
+
+        created = create_missing_indexes(engine)
+        if created:
+            for name in created:
+                print(f"  ➕ Created index {name}")
+            print(f"✅ Successfully added {len(created)} indexes")
+        else:
+            print("✅ All indexes already exist")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Error adding indexes: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    print("🔧 Adding order query indexes...")
+    print("-" * 50)
+    success = add_order_indexes()
+    print("-" * 50)
+
+    if success:
+        print("✅ Migration completed successfully!")
+    else:
+        print("❌ Migration failed!")
@@ -0,0 +1,66 @@
+"""
+Migration script to add updated_at column to orders table
+The admin dashboard polls MAX(orders.updated_at) to detect order changes
+"""
+
+import sqlite3
+import os
+
+def add_order_updated_at_column():
+    """Add updated_at column and its index to orders table if they don't exist"""
+    
+    db_path = "restaurant.db"
+    
+    if not os.path.exists(db_path):
+        print(f"❌ Database not found: {db_path}")
+        return False
+    
+    try:
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+        
+        # Check if column already exists
+        cursor.execute("PRAGMA table_info(orders)")
+        columns = [col[1] for col in cursor.fetchall()]
+        
+        if 'updated_at' in columns:
+            print("✅ updated_at column already exists in orders table")
+        else:
+            cursor.execute("""
+                ALTER TABLE orders 
+                ADD COLUMN updated_at DATETIME
+            """)
+            
+            # Backfill with the latest known timestamp of each order
+            cursor.execute("""
+                UPDATE orders 
+                SET updated_at = COALESCE(paid_at, served_at, prepared_at, created_at)
+                WHERE updated_at IS NULL
+            """)
+            print(f"✅ Successfully added updated_at column ({cursor.rowcount} orders backfilled)")
+        
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS ix_orders_updated_at 
+            ON orders (updated_at)
+        """)
+        
+        conn.commit()
+        conn.close()
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error adding updated_at column: {e}")
+        if 'conn' in locals():
+            conn.close()
+        return False
+
+if __name__ == "__main__":
+    print("🔧 Adding updated_at column to orders table...")
+    print("-" * 50)
+    success = add_order_updated_at_column()
+    print("-" * 50)
+    
+    if success:
+        print("✅ Migration completed successfully!")
+    else:
+        print("❌ Migration failed!")
@@ -3,9 +3,15 @@ AI Menu Assistant using LLM and RAG
 """
 
 from langchain_ollama.llms import OllamaLLM
-from ai.rag_engine import get_rag_engine
+from ai.rag_engine import get_rag_engine, normalize_allergen
 from ai.prompts import menu_assistant_prompt_tr, menu_assistant_prompt_en, get_welcome_message
+from ai.response_cache import ResponseCache
+from ai.scheduler import SchedulerBusy, get_scheduler
+from database.menu_cache import get_menu_version
 import os
+import threading
+import time
+from collections import deque
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -16,13 +22,34 @@ class MenuAssistant:
     
     def __init__(self):
         self.model_name = os.getenv('OLLAMA_MODEL', 'llama3.2')
-        self.llm = OllamaLLM(model=self.model_name, num_predict=150, temperature=0.7)
+        # keep_alive keeps the weights loaded between questions (see ai/warmup.py)
+        self.llm = OllamaLLM(model=self.model_name, num_predict=150, temperature=0.7,
+                             keep_alive=int(os.getenv('OLLAMA_KEEP_ALIVE', '1800')))
         self.rag_engine = get_rag_engine()
         # Keep both chains
         self.chain_tr = menu_assistant_prompt_tr | self.llm
         self.chain_en = menu_assistant_prompt_en | self.llm
+        # Answers to repeated questions, dropped when the menu changes
+        self.response_cache = ResponseCache(embeddings=self.rag_engine.embeddings)
+        # Limits concurrent generations across all sessions
+        self.scheduler = get_scheduler()
+        # Latency of recent streamed responses
+        self.stream_stats = deque(maxlen=100)
     
-    def get_response(self, question, language='tr', filters=None):
+    def _prepare(self, question, language='tr', filters=None):
+        """Retrieve menu items and pick the chain; returns (chain, inputs)"""
+        # Search relevant menu items using RAG
+        menu_docs = self.rag_engine.get_recommendations(question, filters)
+        
+        # Format menu items for prompt
+        menu_items_text = self._format_menu_items(menu_docs, language)
+        
+        # Select the appropriate chain based on language
+        chain = self.chain_tr if language == 'tr' else self.chain_en
+        
+        return chain, {"menu_items": menu_items_text, "question": question}
+    
+    def get_response(self, question, language='tr', filters=None, table=None, on_queue_position=None):
         """
         Get AI response to user question
         
@@ -30,32 +57,106 @@ class MenuAssistant:
             question: User's question
             language: 'tr' or 'en'
             filters: Optional filters for menu search
+            table: Fairness key for the LLM queue (table number or session id)
+            on_queue_position: Called with the queue position while waiting for the LLM
         
         Returns:
             AI response string
         """
+        cached = self.response_cache.get(question, language, filters)
+        if cached is not None:
+            return cached
+        menu_version = get_menu_version()
+        
         try:
-            # Search relevant menu items using RAG
-            menu_docs = self.rag_engine.get_recommendations(question, filters)
-            
-            # Format menu items for prompt
-            menu_items_text = self._format_menu_items(menu_docs, language)
-            
-            # Select the appropriate chain based on language
-            chain = self.chain_tr if language == 'tr' else self.chain_en
-            
-            # Generate response
-            response = chain.invoke({
-                "menu_items": menu_items_text,
-                "question": question
-            })
+            with self.scheduler.slot(table, on_position=on_queue_position):
+                chain, inputs = self._prepare(question, language, filters)
+                
+                # Generate response
+                response = chain.invoke(inputs)
             
+            self.response_cache.put(question, language, filters, response, menu_version)
             return response
             
+        except SchedulerBusy:
+            return self._get_busy_response(question, language, filters)
         except Exception as e:
             print(f"Error generating response: {e}")
             return self._get_error_message(language)
     
+    def stream_response(self, question, language='tr', filters=None, stats=None, table=None,
+                        on_queue_position=None):
+        """
+        Stream the AI response to user question chunk by chunk
+        
+        Same arguments as get_response. Yields text chunks as the LLM produces
+        them (a cached or fallback answer is yielded at once). If a stats dict
+        is passed it is filled with ttft (seconds to first chunk), tokens
+        (chunks streamed), tokens_per_sec, total (seconds) and cached.
+        """
+        started = time.perf_counter()
+        stats = stats if stats is not None else {}
+        
+        cached = self.response_cache.get(question, language, filters)
+        if cached is not None:
+            stats.update(ttft=time.perf_counter() - started, tokens=0, tokens_per_sec=0.0,
+                         total=time.perf_counter() - started, cached=True)
+            yield cached
+            return
+        menu_version = get_menu_version()
+        
+        chunks = []
+        first_chunk_at = None
+        try:
+            # The slot is held until the last chunk (or until the caller stops reading)
+            with self.scheduler.slot(table, on_position=on_queue_position):
+                chain, inputs = self._prepare(question, language, filters)
+                
+                for chunk in chain.stream(inputs):
+                    if not chunk:
+                        continue
+                    if first_chunk_at is None:
+                        first_chunk_at = time.perf_counter()
+                    chunks.append(chunk)
+                    yield chunk
+            
+        except SchedulerBusy:
+            stats.update(ttft=time.perf_counter() - started, tokens=0, tokens_per_sec=0.0,
+                         total=time.perf_counter() - started, cached=False, shed=True)
+            yield self._get_busy_response(question, language, filters)
+            return
+        except Exception as e:
+            print(f"Error generating response: {e}")
+            if not chunks:
+                yield self._get_error_message(language)
+            return
+        
+        finished = time.perf_counter()
+        generating = finished - (first_chunk_at or finished)
+        stats.update(
+            ttft=(first_chunk_at or finished) - started,
+            tokens=len(chunks),
+            # Ollama streams one token per chunk
+            tokens_per_sec=(len(chunks) - 1) / generating if generating > 0 else 0.0,
+            total=finished - started,
+            cached=False,
+        )
+        self.stream_stats.append(dict(stats))
+        
+        self.response_cache.put(question, language, filters, "".join(chunks), menu_version)
+    
+    def get_stream_stats(self):
+        """Averages over the recent streamed (uncached) responses"""
+        recent = list(self.stream_stats)
+        if not recent:
+            return {'responses': 0, 'avg_ttft': 0.0, 'avg_tokens_per_sec': 0.0, 'avg_total': 0.0}
+        return {
+            'responses': len(recent),
+            'avg_ttft': sum(s['ttft'] for s in recent) / len(recent),
+            'avg_tokens_per_sec': sum(s['tokens_per_sec'] for s in recent) / len(recent),
+            'avg_total': sum(s['total'] for s in recent) / len(recent),
+        }
+    
     def _format_menu_items(self, docs, language='tr'):
         """Format retrieved documents for prompt with item IDs"""
         if not docs:
@@ -103,6 +204,31 @@ class MenuAssistant:
         
         return "\n".join(formatted)
     
+    def _get_busy_response(self, question, language='tr', filters=None):
+        """Answer without the LLM when the queue is full: the closest menu items"""
+        if language == 'tr':
+            message = "⏳ Şu anda çok yoğunuz, bu yüzden kısa bir cevap veriyorum."
+        else:
+            message = "⏳ We're very busy right now, so here is a quick answer."
+        
+        try:
+            docs = self.rag_engine.get_recommendations(question, filters, k=3)
+        except Exception as e:
+            print(f"Error in busy fallback: {e}")
+            docs = []
+        
+        if not docs:
+            return message + (" Lütfen biraz sonra tekrar sorun veya menüye göz atın."
+                              if language == 'tr' else " Please ask again shortly or browse the menu.")
+        
+        lines = [message, "Sorunuza uygun olabilecek ürünler:" if language == 'tr'
+                 else "Items that may match your question:"]
+        for doc in docs:
+            metadata = doc.metadata
+            name = metadata.get('name') if language == 'tr' else metadata.get('name_en', metadata.get('name'))
+            lines.append(f"- {name} ({metadata.get('price', 0)} TL) [PRODUCT:{metadata.get('item_id')}]")
+        return "\n".join(lines)
+    
     def _get_error_message(self, language='tr'):
         """Get error message"""
         if language == 'tr':
@@ -165,19 +291,19 @@ Thank you for understanding! 🙏
         Returns:
             (is_safe: bool, message: str)
         """
-        # Search for the specific item
-        docs = self.rag_engine.search_menu(item_name, k=1)
+        # Find the specific item (exact name match first)
+        item = self.rag_engine.find_item(item_name)
         
-        if not docs:
+        if item is None:
             return False, "Ürün bulunamadı."
         
-        item = docs[0]
         item_allergens = item.metadata.get('allergens', '').lower()
         
-        # Check each allergen
+        # Check each allergen (known allergens by key, so "süt" also finds "dairy")
         found_allergens = []
         for allergen in user_allergens:
-            if allergen.lower() in item_allergens:
+            key = normalize_allergen(allergen)
+            if (key and item.metadata.get(f"allergen_{key}")) or allergen.lower() in item_allergens:
                 found_allergens.append(allergen)
         
         if found_allergens:
@@ -192,12 +318,15 @@ Thank you for understanding! 🙏
 
 # Global instance
 _assistant = None
+_assistant_lock = threading.Lock()
 
 def get_assistant():
-    """Get or create assistant instance"""
+    """Get or create assistant instance (built once even when requested from several threads)"""
     global _assistant
     if _assistant is None:
-        _assistant = MenuAssistant()
+        with _assistant_lock:
+            if _assistant is None:
+                _assistant = MenuAssistant()
     return _assistant
 
 
@@ -216,5 +345,9 @@ if __name__ == "__main__":
     
     for question in test_questions:
         print(f"\n❓ Soru: {question}")
-        print(f"\n🤖 Cevap:\n{assistant.get_response(question)}")
+        print("\n🤖 Cevap:")
+        stats = {}
+        for chunk in assistant.stream_response(question, stats=stats):
+            print(chunk, end="", flush=True)
+        print(f"\n\n⏱️ İlk token: {stats.get('ttft', 0):.2f} sn, {stats.get('tokens_per_sec', 0):.1f} token/sn")
         print("\n" + "="*50)
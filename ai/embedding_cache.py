@@ -0,0 +1,187 @@
+"""
+Embedding Cache - Persistent, content-addressed cache for embeddings
+
+Vectors are stored in a small SQLite file keyed by sha256(model, text), so
+unchanged menu items, review rows and repeated questions (the suggestion
+buttons) are embedded once per model instead of on every rebuild or query.
+The least recently used entries are evicted beyond EMBEDDING_CACHE_SIZE.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from typing import Dict, List, Optional
+
+from langchain_core.embeddings import Embeddings
+from langchain_ollama import OllamaEmbeddings
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that serves repeated texts from the on-disk cache"""
+    
+    # SQLite limits the number of bound parameters per statement
+    LOOKUP_CHUNK = 500
+    
+    def __init__(self, embeddings: Embeddings, model_name: str, db_path: Optional[str] = None,
+                 max_entries: Optional[int] = None):
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.db_path = db_path or os.getenv('EMBEDDING_CACHE_PATH', './embedding_cache.db')
+        self.max_entries = int(max_entries or os.getenv('EMBEDDING_CACHE_SIZE', '50000'))
+        
+        self.hits = 0
+        self.misses = 0
+        
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(self.db_path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, model TEXT NOT NULL, vector BLOB NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_embeddings_last_used ON embeddings (last_used)")
+        self._conn.commit()
+        self._size = self._conn.execute("SELECT count(*) FROM embeddings").fetchone()[0]
+    
+    def _key(self, text):
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode("utf-8")).hexdigest()
+    
+    # ========================
+    # STORAGE
+    # ========================
+    
+    def _lookup(self, keys) -> Dict[str, List[float]]:
+        found = {}
+        now = time.time()
+        for start in range(0, len(keys), self.LOOKUP_CHUNK):
+            chunk = keys[start:start + self.LOOKUP_CHUNK]
+            placeholders = ", ".join("?" * len(chunk))
+            rows = self._conn.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+            ).fetchall()
+            for key, blob in rows:
+                found[key] = array("d", blob).tolist()
+            if rows:
+                self._conn.execute(
+                    f"UPDATE embeddings SET last_used = ? WHERE key IN ({placeholders})", [now, *chunk]
+                )
+        self._conn.commit()
+        return found
+    
+    def _store(self, vectors: Dict[str, List[float]]):
+        now = time.time()
+        before = self._conn.total_changes
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO embeddings (key, model, vector, last_used) VALUES (?, ?, ?, ?)",
+            [(key, self.model_name, array("d", vector).tobytes(), now) for key, vector in vectors.items()]
+        )
+        self._size += self._conn.total_changes - before
+        
+        if self._size > self.max_entries:
+            # Evict the least recently used entries (all models share the budget)
+            excess = self._size - self.max_entries
+            self._conn.execute(
+                "DELETE FROM embeddings WHERE key IN "
+                "(SELECT key FROM embeddings ORDER BY last_used, rowid LIMIT ?)", (excess,)
+            )
+            self._size -= excess
+        self._conn.commit()
+    
+    # ========================
+    # EMBEDDINGS API
+    # ========================
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts, computing only those not in the cache (each distinct text once)"""
+        if not texts:
+            return []
+        
+        keys = [self._key(text) for text in texts]
+        with self._lock:
+            cached = self._lookup(list(dict.fromkeys(keys)))
+        
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cached:
+                missing.setdefault(key, text)
+        
+        if missing:
+            vectors = self.embeddings.embed_documents(list(missing.values()))
+            computed = dict(zip(missing, vectors))
+            with self._lock:
+                self._store(computed)
+            cached.update(computed)
+        
+        with self._lock:
+            self.hits += len(texts) - len(missing)
+            self.misses += len(missing)
+        return [cached[key] for key in keys]
+    
+    def embed_query(self, text: str) -> List[float]:
+        """
+        Embed a search query through the same cache
+
+        Assumes the model embeds queries and documents the same way (true for
+        OllamaEmbeddings).
+        """
+        key = self._key(text)
+        with self._lock:
+            cached = self._lookup([key])
+        if key in cached:
+            with self._lock:
+                self.hits += 1
+            return cached[key]
+        
+        vector = self.embeddings.embed_query(text)
+        with self._lock:
+            self._store({key: vector})
+            self.misses += 1
+        return vector
+    
+    # ========================
+    # STATS
+    # ========================
+    
+    def stats(self):
+        """Hit/miss counters of this process and the number of cached vectors"""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'entries': self._size,
+        }
+    
+    def clear(self):
+        """Drop every cached vector and reset the counters"""
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+            self._size = 0
+            self.hits = 0
+            self.misses = 0
+    
+    def close(self):
+        """Close the cache database"""
+        with self._lock:
+            self._conn.close()
+
+
+# Cached embeddings per model, shared by the menu engine and the review store
+_cached_embeddings = {}
+_cached_embeddings_lock = threading.Lock()
+
+def get_cached_embeddings(model: Optional[str] = None) -> CachedEmbeddings:
+    """Get the process-wide cached Ollama embeddings for a model"""
+    model = model or os.getenv('EMBEDDING_MODEL', 'mxbai-embed-large')
+    with _cached_embeddings_lock:
+        if model not in _cached_embeddings:
+            keep_alive = int(os.getenv('OLLAMA_KEEP_ALIVE', '1800'))
+            model_embeddings = OllamaEmbeddings(model=model, keep_alive=keep_alive)
+            _cached_embeddings[model] = CachedEmbeddings(model_embeddings, model)
+        return _cached_embeddings[model]
@@ -0,0 +1,180 @@
+"""
+Hybrid Search - Keyword (BM25) + vector retrieval for menu questions
+
+Embeddings are good at "something light and vegetarian" but weak at exact
+words: a dish name ("Margherita var mı?"), an ingredient or an allergen. The
+keyword index scores the same menu documents with BM25 over Turkish-folded
+words, and the two rankings are merged with reciprocal rank fusion (RRF).
+Dish names found verbatim in the question skip ranking altogether and come
+first (exact-name fast path).
+
+Turkish is agglutinative ("mantarlı", "mantarlar"), so every word is also
+indexed by its first PREFIX_LENGTH letters - a cheap stand-in for stemming.
+"""
+
+import math
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from database.search import search_tokens
+
+
+PREFIX_LENGTH = 5
+# Name words count this many times, so dish names outrank mentions in descriptions
+NAME_WEIGHT = 3
+# RRF constant (Cormack et al.): dampens the weight of the very top ranks
+RRF_K = 60
+
+
+def _terms(text):
+    terms = []
+    for token in search_tokens(text):
+        terms.append(token)
+        if len(token) > PREFIX_LENGTH:
+            terms.append(token[:PREFIX_LENGTH] + "*")
+    return terms
+
+
+def matches_where(metadata, where) -> bool:
+    """Evaluate a Chroma-style where clause ($and, $or, $eq, $ne, $lt(e), $gt(e), $in) on metadata"""
+    if not where:
+        return True
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(matches_where(metadata, clause) for clause in condition):
+                return False
+        elif key == "$or":
+            if not any(matches_where(metadata, clause) for clause in condition):
+                return False
+        else:
+            value = metadata.get(key)
+            if not isinstance(condition, dict):
+                condition = {"$eq": condition}
+            for op, expected in condition.items():
+                if op == "$eq" and value != expected:
+                    return False
+                if op == "$ne" and value == expected:
+                    return False
+                if op == "$in" and value not in expected:
+                    return False
+                if op in ("$lt", "$lte", "$gt", "$gte"):
+                    if value is None:
+                        return False
+                    if (op == "$lt" and not value < expected) or (op == "$lte" and not value <= expected) or \
+                       (op == "$gt" and not value > expected) or (op == "$gte" and not value >= expected):
+                        return False
+    return True
+
+
+def reciprocal_rank_fusion(rankings: Iterable[Sequence[str]], k=RRF_K) -> List[str]:
+    """Merge ranked id lists; ids ranked high in several lists win"""
+    scores = defaultdict(float)
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, 1):
+            scores[doc_id] += 1.0 / (k + rank)
+    return sorted(scores, key=lambda doc_id: -scores[doc_id])
+
+
+class KeywordIndex:
+    """BM25 index over menu documents (built with the vector index, once per sync)"""
+    
+    def __init__(self, documents: Iterable, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.documents = {}
+        self.postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self.lengths = {}
+        # Folded dish names (Turkish and English) -> document ids
+        self.names: Dict[str, List[str]] = defaultdict(list)
+        
+        for doc in documents:
+            doc_id = str(doc.metadata["item_id"])
+            self.documents[doc_id] = doc
+            names = [doc.metadata.get("name"), doc.metadata.get("name_en")]
+            terms = _terms(doc.page_content)
+            for name in names:
+                terms += _terms(name) * NAME_WEIGHT
+            for term, count in Counter(terms).items():
+                self.postings[term][doc_id] = count
+            self.lengths[doc_id] = len(terms)
+            for name in set(" ".join(search_tokens(name)) for name in names if name):
+                if len(name) >= 3:
+                    self.names[name].append(doc_id)
+        
+        self.average_length = sum(self.lengths.values()) / len(self.lengths) if self.lengths else 0.0
+    
+    def __len__(self):
+        return len(self.documents)
+    
+    def _idf(self, term):
+        frequency = len(self.postings.get(term, ()))
+        return math.log(1 + (len(self.documents) - frequency + 0.5) / (frequency + 0.5))
+    
+    def search(self, query, k=10, where=None) -> List:
+        """Top k documents by BM25 score (documents matching no query word are left out)"""
+        scores = defaultdict(float)
+        for term in set(_terms(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self._idf(term)
+            for doc_id, tf in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[doc_id] / self.average_length)
+                scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+        
+        ranked = sorted(scores, key=lambda doc_id: (-scores[doc_id], doc_id))
+        results = []
+        for doc_id in ranked:
+            if matches_where(self.documents[doc_id].metadata, where):
+                results.append(self.documents[doc_id])
+                if len(results) == k:
+                    break
+        return results
+    
+    def exact_matches(self, query, where=None) -> List:
+        """Documents whose full dish name appears in the query, longest name first"""
+        folded = f" {' '.join(search_tokens(query))} "
+        found = []
+        for name in sorted(self.names, key=len, reverse=True):
+            if f" {name} " in folded:
+                for doc_id in self.names[name]:
+                    if doc_id not in found and matches_where(self.documents[doc_id].metadata, where):
+                        found.append(doc_id)
+        return [self.documents[doc_id] for doc_id in found]
+
+
+def hybrid_search(keyword_index: Optional[KeywordIndex], vector_search, query, k=5, where=None) -> List:
+    """
+    Exact-name matches first, then the RRF fusion of BM25 and vector rankings
+
+    Args:
+        keyword_index: KeywordIndex over the menu documents (None = vector only)
+        vector_search: Callable (query, k, where) -> documents, most similar first
+        query: User question
+        k: Number of documents
+        where: Chroma-style metadata filter, applied to both rankings
+    """
+    candidates = max(k * 2, 10)
+    vector_docs = vector_search(query, candidates, where)
+    if keyword_index is None or not len(keyword_index):
+        return vector_docs[:k]
+    
+    exact = keyword_index.exact_matches(query, where)
+    keyword_docs = keyword_index.search(query, candidates, where)
+    
+    by_id = {str(doc.metadata["item_id"]): doc for doc in keyword_docs}
+    by_id.update((str(doc.metadata["item_id"]), doc) for doc in vector_docs)
+    fused = reciprocal_rank_fusion([
+        [str(doc.metadata["item_id"]) for doc in vector_docs],
+        [str(doc.metadata["item_id"]) for doc in keyword_docs],
+    ])
+    
+    results = list(exact[:k])
+    seen = {str(doc.metadata["item_id"]) for doc in results}
+    for doc_id in fused:
+        if len(results) == k:
+            break
+        if doc_id not in seen:
+            results.append(by_id[doc_id])
+            seen.add(doc_id)
+    return results
@@ -3,28 +3,70 @@ RAG Engine for Menu AI Assistant
 Uses database instead of CSV files for menu data
 """
 
-from langchain_ollama import OllamaEmbeddings
 from langchain_chroma import Chroma
 from langchain_core.documents import Document
+import hashlib
+import json
 import os
+import threading
+import uuid
 from dotenv import load_dotenv
 from database.db_manager import get_db
+from database.search import turkish_fold
+from ai.embedding_cache import get_cached_embeddings
+from ai.hybrid_search import KeywordIndex, hybrid_search
 
 load_dotenv()
 
+# Allergen keys stored as boolean metadata (allergen_<key>), with the spellings mapped to them
+ALLERGENS = ("gluten", "dairy", "nuts", "fish", "egg")
+ALLERGEN_ALIASES = {
+    "gluten": "gluten", "buğday": "gluten", "wheat": "gluten",
+    "dairy": "dairy", "milk": "dairy", "süt": "dairy", "süt ürünleri": "dairy", "laktoz": "dairy",
+    "nuts": "nuts", "nut": "nuts", "peanut": "nuts", "peanuts": "nuts", "kuruyemiş": "nuts",
+    "fındık": "nuts", "fıstık": "nuts", "ceviz": "nuts", "badem": "nuts",
+    "fish": "fish", "balık": "fish",
+    "egg": "egg", "eggs": "egg", "yumurta": "egg",
+}
+# Looked up by folded spelling, like the menu search terms ("SÜT", "Sut" -> "sut")
+_FOLDED_ALLERGEN_ALIASES = {turkish_fold(alias): key for alias, key in ALLERGEN_ALIASES.items()}
+
+
+def normalize_allergen(name):
+    """Allergen key for a spelling (e.g. 'Süt' -> 'dairy'), or None if unknown"""
+    return _FOLDED_ALLERGEN_ALIASES.get(turkish_fold(name).strip())
+
+
+def parse_allergens(text):
+    """Allergen keys in a comma separated allergen list"""
+    return {key for key in (normalize_allergen(part) for part in (text or "").split(",")) if key}
+
+
 class MenuRAGEngine:
     """RAG Engine specifically for menu recommendations"""
     
-    def __init__(self):
+    COLLECTION_NAME = "restaurant_menu"
+    # Name of the collection queries read from, inside db_location
+    ACTIVE_COLLECTION_FILE = "active_collection"
+    # Candidates fetched per result when some filters have to be checked after the query
+    OVERFETCH = 4
+    
+    def __init__(self, embeddings=None):
         self.embedding_model = os.getenv('EMBEDDING_MODEL', 'mxbai-embed-large')
         self.db_location = os.getenv('VECTOR_DB_PATH', './chrome_langchain_db')
+        self.top_k = int(os.getenv('RAG_TOP_K', '5'))
+        
+        # Initialize embeddings (cached on disk: unchanged items and repeated questions are not re-embedded)
+        self.embeddings = embeddings or get_cached_embeddings(self.embedding_model)
         
-        # Initialize embeddings
-        self.embeddings = OllamaEmbeddings(model=self.embedding_model)
+        # Serializes sync/rebuild; searches never wait on it
+        self._index_lock = threading.Lock()
         
         # Initialize or load vector store
         self.vector_store = None
         self.retriever = None
+        # BM25 index over the same documents, rebuilt on every sync
+        self.keyword_index = None
         self._init_vector_store()
     
     def _init_vector_store(self):
@@ -33,73 +75,99 @@ class MenuRAGEngine:
         
         if add_documents:
             print("📚 Creating new vector database for menu...")
-            self._create_menu_documents()
+            self._set_active_store(self._open_collection(self.COLLECTION_NAME))
+            stats = self.sync_index()
+            print(f"✅ Vector database created successfully! ({stats['added']} items)")
         else:
             print("📂 Loading existing vector database...")
-            self.vector_store = Chroma(
-                collection_name="restaurant_menu",
-                persist_directory=self.db_location,
-                embedding_function=self.embeddings
-            )
-            self.retriever = self.vector_store.as_retriever(search_kwargs={"k": 5})
+            self._set_active_store(self._open_collection(self._read_active_collection()))
+            try:
+                # Picks up edits made while the app was down and metadata fields added
+                # since the index was built (unchanged texts come from the embedding cache)
+                self.sync_index()
+            except Exception as e:
+                print(f"⚠️ Vector index sync failed, serving the existing index: {e}")
+    
+    def _open_collection(self, collection_name):
+        return Chroma(
+            collection_name=collection_name,
+            persist_directory=self.db_location,
+            embedding_function=self.embeddings
+        )
+    
+    def _set_active_store(self, vector_store):
+        # One attribute assignment each - readers see either the old or the new store
+        self.vector_store = vector_store
+        self.retriever = vector_store.as_retriever(search_kwargs={"k": self.top_k})
+    
+    def _read_active_collection(self):
+        path = os.path.join(self.db_location, self.ACTIVE_COLLECTION_FILE)
+        try:
+            with open(path, encoding="utf-8") as f:
+                return f.read().strip() or self.COLLECTION_NAME
+        except FileNotFoundError:
+            # Databases created before collections were versioned
+            return self.COLLECTION_NAME
+    
+    def _write_active_collection(self, collection_name):
+        path = os.path.join(self.db_location, self.ACTIVE_COLLECTION_FILE)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(collection_name)
+        os.replace(tmp_path, path)
+    
+    # ========================
+    # DOCUMENTS
+    # ========================
     
     def _create_menu_documents(self):
-        """Create vector documents from database menu items (only available items)"""
-        documents = []
-        ids = []
+        """Create vector documents from database menu items (only available items), by id"""
+        documents = {}
         
         # Load menu items from database - ONLY AVAILABLE ITEMS
         try:
             db = get_db()
-            menu_items = db.get_all_menu_items(available_only=True)  # Only active/available items
+            menu_items = db.get_all_menu_items(available_only=True, with_category=True)
             
             for item in menu_items:
                 # Create rich document with all menu information
                 content = self._create_document_content_from_db(item)
+                metadata = {
+                    "item_id": item.id,
+                    "name": item.name,
+                    "name_en": item.name_en or item.name,
+                    "category": item.category.name if item.category else "Uncategorized",
+                    "price": float(item.price),
+                    "is_vegetarian": bool(item.is_vegetarian),
+                    "is_vegan": bool(item.is_vegan),
+                    "is_spicy": bool(item.is_spicy),
+                    "spicy_level": item.spicy_level if item.is_spicy else 0,
+                    "allergens": item.allergens or "",
+                    "ingredients": item.ingredients or "",
+                    "is_available": True,  # Always True since we filter
+                }
+                # One boolean per known allergen, so exclusions can be queried as metadata
+                item_allergens = parse_allergens(item.allergens)
+                for allergen in ALLERGENS:
+                    metadata[f"allergen_{allergen}"] = allergen in item_allergens
+                metadata["content_hash"] = self._document_hash(content, metadata)
                 
-                document = Document(
-                    page_content=content,
-                    metadata={
-                        "item_id": item.id,
-                        "name": item.name,
-                        "name_en": item.name_en or item.name,
-                        "category": item.category.name if item.category else "Uncategorized",
-                        "price": float(item.price),
-                        "is_vegetarian": item.is_vegetarian,
-                        "is_vegan": item.is_vegan,
-                        "is_spicy": item.is_spicy,
-                        "spicy_level": item.spicy_level if item.is_spicy else 0,
-                        "allergens": item.allergens or "",
-                        "ingredients": item.ingredients or "",
-                        "is_available": True,  # Always True since we filter
-                    },
-                    id=str(item.id)
-                )
-                documents.append(document)
-                ids.append(str(item.id))
+                documents[str(item.id)] = Document(page_content=content, metadata=metadata, id=str(item.id))
             
             db.close()
-            print(f"✅ Created {len(documents)} menu documents from database (available only)")
             
         except Exception as e:
             print(f"❌ Error loading menu data from database: {e}")
             print("💡 Make sure the database is initialized with menu items")
             raise
         
-        # Create vector store
-        self.vector_store = Chroma(
-            collection_name="restaurant_menu",
-            persist_directory=self.db_location,
-            embedding_function=self.embeddings
-        )
-        
-        # Add documents
-        self.vector_store.add_documents(documents=documents, ids=ids)
-        
-        # Create retriever
-        self.retriever = self.vector_store.as_retriever(search_kwargs={"k": 5})
-        
-        print("✅ Vector database created successfully!")
+        return documents
+    
+    @staticmethod
+    def _document_hash(content, metadata):
+        """Fingerprint of what gets embedded and stored for an item"""
+        payload = json.dumps([content, metadata], sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
     
     def _create_document_content_from_db(self, item):
         """Create rich text content for embedding from database MenuItem"""
@@ -134,70 +202,189 @@ class MenuRAGEngine:
         
         return " | ".join(content_parts)
     
-    def search_menu(self, query, k=3):
-        """Search menu items based on query"""
-        if not self.retriever:
+    def search_menu(self, query, k=None, where=None):
+        """
+        Search menu items based on query
+        
+        Args:
+            query: Natural language query
+            k: Number of items (defaults to RAG_TOP_K)
+            where: Optional Chroma metadata filter, applied inside the vector query
+        """
+        if not self.vector_store:
             return []
         
-        results = self.retriever.invoke(query)
-        return results
+        return self.vector_store.similarity_search(query, k=k or self.top_k, filter=where)
     
-    def get_recommendations(self, query, filters=None):
+    def hybrid_search(self, query, k=None, where=None):
+        """
+        Dish names in the query first, then keyword (BM25) and vector rankings fused
+        
+        Same arguments as search_menu; falls back to vector search alone if the
+        keyword index has not been built.
+        """
+        vector_search = lambda text, n, clause: self.search_menu(text, k=n, where=clause)
+        return hybrid_search(self.keyword_index, vector_search, query, k=k or self.top_k, where=where)
+    
+    def find_item(self, name):
+        """Menu document for a dish name (exact name match, else the best hybrid match)"""
+        if self.keyword_index is not None:
+            exact = self.keyword_index.exact_matches(name)
+            if exact:
+                return exact[0]
+        results = self.hybrid_search(name, k=1)
+        return results[0] if results else None
+    
+    def _build_where(self, filters):
+        """
+        Translate recommendation filters into a Chroma where clause
+        
+        Returns (where, residual_allergens); allergens outside ALLERGENS cannot
+        be expressed as metadata conditions and are checked on the results.
+        """
+        conditions = []
+        residual = []
+        if filters:
+            if filters.get('vegetarian'):
+                conditions.append({"is_vegetarian": True})
+            if filters.get('vegan'):
+                conditions.append({"is_vegan": True})
+            if filters.get('max_price'):
+                conditions.append({"price": {"$lte": float(filters['max_price'])}})
+            for allergen in filters.get('exclude_allergens') or []:
+                key = normalize_allergen(allergen)
+                if key:
+                    conditions.append({f"allergen_{key}": False})
+                else:
+                    residual.append(allergen.lower())
+        
+        if not conditions:
+            return None, residual
+        if len(conditions) == 1:
+            return conditions[0], residual
+        return {"$and": conditions}, residual
+    
+    def get_recommendations(self, query, filters=None, k=None):
         """
         Get menu recommendations based on query and filters
         
         Args:
             query: User's natural language query
             filters: Dict with filters like {'vegetarian': True, 'max_price': 100}
+            k: Number of items (defaults to RAG_TOP_K)
         
         Returns:
-            List of recommended items
+            Up to k items matching every filter, most relevant first
         """
-        results = self.search_menu(query)
+        k = k or self.top_k
+        where, residual = self._build_where(filters)
+        if not residual:
+            return self.hybrid_search(query, k=k, where=where)
         
-        if filters:
-            # Apply additional filtering
-            filtered_results = []
-            for doc in results:
-                metadata = doc.metadata
-                
-                # Check filters
-                if filters.get('vegetarian') and not metadata.get('is_vegetarian'):
-                    continue
-                if filters.get('vegan') and not metadata.get('is_vegan'):
-                    continue
-                if filters.get('max_price') and metadata.get('price', 999) > filters['max_price']:
-                    continue
-                if filters.get('exclude_allergens'):
-                    allergens = metadata.get('allergens', '')
-                    if any(allergen in allergens for allergen in filters['exclude_allergens']):
-                        continue
-                
-                filtered_results.append(doc)
-            
-            return filtered_results
+        # Unknown allergens are matched against the allergen text, so fetch extra candidates
+        results = self.hybrid_search(query, k=k * self.OVERFETCH, where=where)
+        return [
+            doc for doc in results
+            if not any(allergen in doc.metadata.get('allergens', '').lower() for allergen in residual)
+        ][:k]
+    
+    # ========================
+    # INDEX MAINTENANCE
+    # ========================
+    
+    def sync_index(self):
+        """
+        Bring the vector index in line with the menu, embedding only what changed
         
-        return results
+        Items whose text or metadata changed (or are new) are re-embedded and
+        upserted; unavailable and deleted items are removed. Upserts happen
+        before deletes, so queries never see a partially emptied collection.
+        The keyword index is swapped only once the vector writes succeeded,
+        so both halves of a hybrid query describe the same menu.
+        
+        Returns:
+            Dict with added/updated/deleted/unchanged counts
+        """
+        with self._index_lock:
+            documents = self._create_menu_documents()
+            
+            stored = self.vector_store.get(include=["metadatas"])
+            stored_hashes = {
+                doc_id: (metadata or {}).get("content_hash")
+                for doc_id, metadata in zip(stored["ids"], stored["metadatas"])
+            }
+            
+            changed = [doc for doc_id, doc in documents.items()
+                       if stored_hashes.get(doc_id) != doc.metadata["content_hash"]]
+            removed = [doc_id for doc_id in stored_hashes if doc_id not in documents]
+            
+            if changed:
+                # Chroma upserts by id: the old vector stays searchable until the new one is written
+                self.vector_store.add_documents(documents=changed, ids=[doc.id for doc in changed])
+            if removed:
+                self.vector_store.delete(ids=removed)
+            self.keyword_index = KeywordIndex(documents.values())
+            
+            updated = sum(1 for doc in changed if doc.id in stored_hashes)
+            stats = {
+                "added": len(changed) - updated,
+                "updated": updated,
+                "deleted": len(removed),
+                "unchanged": len(documents) - len(changed),
+            }
+            if changed or removed:
+                print(f"🔄 Vector index synced: {stats}")
+            return stats
     
     def rebuild_index(self):
-        """Rebuild vector index from scratch"""
-        if os.path.exists(self.db_location):
-            import shutil
-            shutil.rmtree(self.db_location)
-        self._init_vector_store()
+        """
+        Re-embed every item into a fresh collection, then switch to it
+        
+        The current collection keeps serving queries until the new one is
+        complete; only then is the active collection swapped and the old one
+        dropped. Use sync_index() after ordinary menu edits.
+        """
+        with self._index_lock:
+            documents = self._create_menu_documents()
+            old_store = self.vector_store
+            
+            new_store = self._open_collection(f"{self.COLLECTION_NAME}_{uuid.uuid4().hex[:12]}")
+            if documents:
+                new_store.add_documents(documents=list(documents.values()), ids=list(documents))
+            
+            self._write_active_collection(new_store._collection.name)
+            self._set_active_store(new_store)
+            self.keyword_index = KeywordIndex(documents.values())
+            
+            if old_store is not None:
+                try:
+                    old_store.delete_collection()
+                except Exception as e:
+                    print(f"⚠️ Could not drop old vector collection: {e}")
+            
+            print(f"✅ Vector index rebuilt with {len(documents)} items")
+            return {"added": len(documents), "updated": 0, "deleted": 0, "unchanged": 0}
 
 
 # Global instance
 _rag_engine = None
+_rag_engine_lock = threading.Lock()
 
 def get_rag_engine():
-    """Get or create RAG engine instance"""
+    """Get or create RAG engine instance (built once even when requested from several threads)"""
     global _rag_engine
     if _rag_engine is None:
-        _rag_engine = MenuRAGEngine()
+        with _rag_engine_lock:
+            if _rag_engine is None:
+                _rag_engine = MenuRAGEngine()
     return _rag_engine
 
 
+def sync_rag_index():
+    """Sync the shared engine's vector index with the menu (call after menu edits)"""
+    return get_rag_engine().sync_index()
+
+
 if __name__ == "__main__":
     # Test the RAG engine
     engine = get_rag_engine()
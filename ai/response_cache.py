@@ -0,0 +1,151 @@
+"""
+Response Cache - Reuse assistant answers for repeated questions
+
+Answers are keyed by (language, filters, normalized question, menu version):
+the suggestion buttons and common questions ("Vejetaryen pizzanız var mı?")
+are answered from memory instead of a retrieval plus an LLM generation.
+Normalizing folds Turkish casing, diacritics and punctuation, so
+"VEJETERYAN pizzanız var mı" and "vejeteryan pizzaniz var mi?" share an entry.
+
+An optional semantic tier (RESPONSE_CACHE_SIMILARITY > 0) also matches
+paraphrases whose question embedding is at least that cosine-similar to a
+cached one with the same language and filters.
+
+Entries expire after RESPONSE_CACHE_TTL seconds, the least recently used are
+evicted beyond RESPONSE_CACHE_SIZE, and the whole cache is dropped when the
+menu version changes (prices, availability, new items).
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+from database.menu_cache import get_menu_version
+from database.search import search_tokens
+
+
+def normalize_question(question: str) -> str:
+    """Folded words of a question (Turkish casing, no diacritics or punctuation)"""
+    return " ".join(search_tokens(question or ""))
+
+
+def _filters_key(filters) -> str:
+    return json.dumps(filters or {}, sort_keys=True, ensure_ascii=False, default=str)
+
+
+class ResponseCache:
+    """LRU + TTL cache of assistant responses, invalidated by menu changes"""
+    
+    def __init__(self, max_entries=None, ttl=None, similarity=None, embeddings=None):
+        self.max_entries = int(max_entries or os.getenv('RESPONSE_CACHE_SIZE', '256'))
+        self.ttl = float(ttl if ttl is not None else os.getenv('RESPONSE_CACHE_TTL', '3600'))
+        # Minimum cosine similarity for the semantic tier (0 disables it)
+        self.similarity = float(similarity if similarity is not None
+                                else os.getenv('RESPONSE_CACHE_SIMILARITY', '0'))
+        self.embeddings = embeddings if self.similarity > 0 else None
+        
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        
+        # key -> (response, created_at, unit question vector or None)
+        self._entries = OrderedDict()
+        self._menu_version = get_menu_version()
+        self._lock = threading.Lock()
+    
+    def _key(self, question, language, filters):
+        return (language, _filters_key(filters), normalize_question(question), self._menu_version)
+    
+    def _check_menu_version(self):
+        version = get_menu_version()
+        if version != self._menu_version:
+            self._entries.clear()
+            self._menu_version = version
+    
+    def _embed(self, question):
+        # Same text the retriever embeds, so the embedding cache serves both
+        vector = np.asarray(self.embeddings.embed_query(question), dtype=float)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+    
+    def _expired(self, created_at):
+        return time.monotonic() - created_at > self.ttl
+    
+    def get(self, question, language='tr', filters=None) -> Optional[str]:
+        """Cached response for the question, or None"""
+        with self._lock:
+            self._check_menu_version()
+            key = self._key(question, language, filters)
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry[1]):
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            
+            if self.embeddings is None:
+                self.misses += 1
+                return None
+            candidates = [
+                (entry_key, entry) for entry_key, entry in self._entries.items()
+                if entry_key[:2] == key[:2] and entry[2] is not None and not self._expired(entry[1])
+            ]
+        
+        if candidates:
+            # Embedding outside the lock
+            vector = self._embed(question)
+            scores = np.stack([entry[2] for _, entry in candidates]) @ vector
+            best = int(np.argmax(scores))
+            if scores[best] >= self.similarity:
+                entry_key, entry = candidates[best]
+                with self._lock:
+                    if entry_key in self._entries:
+                        self._entries.move_to_end(entry_key)
+                    self.semantic_hits += 1
+                return entry[0]
+        
+        with self._lock:
+            self.misses += 1
+        return None
+    
+    def put(self, question, language, filters, response, menu_version=None):
+        """
+        Store a response for the question under the current menu version
+        
+        menu_version is the version the answer was generated from; the answer
+        is dropped if the menu changed while it was being generated.
+        """
+        vector = self._embed(question) if self.embeddings is not None else None
+        with self._lock:
+            self._check_menu_version()
+            if menu_version is not None and menu_version != self._menu_version:
+                return
+            key = self._key(question, language, filters)
+            self._entries[key] = (response, time.monotonic(), vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        """Drop every cached response"""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self):
+        """Hit/miss counters and the number of cached responses"""
+        with self._lock:
+            total = self.hits + self.semantic_hits + self.misses
+            return {
+                'hits': self.hits,
+                'semantic_hits': self.semantic_hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits + self.semantic_hits) / total if total else 0.0,
+                'entries': len(self._entries),
+            }
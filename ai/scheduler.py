@@ -0,0 +1,192 @@
+"""
+LLM Scheduler - Admission control in front of the shared MenuAssistant
+
+A CPU Ollama server slows down for everyone when many generations run at
+once. The scheduler lets at most LLM_MAX_CONCURRENT generations run; other
+questions wait in per-table queues served round-robin, so one busy table
+cannot starve the rest. At most LLM_MAX_QUEUE questions wait in total, and a
+question still waiting after LLM_QUEUE_TIMEOUT seconds is shed - the
+assistant then answers from its cache or with a fallback instead of timing out.
+
+    with get_scheduler().slot(table_key, on_position=show_position):
+        ...generate...
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+
+class SchedulerBusy(Exception):
+    """The question was not admitted (queue full or waited past its deadline)"""
+    
+    def __init__(self, reason):
+        super().__init__(f"LLM scheduler busy: {reason}")
+        self.reason = reason  # 'queue_full' or 'deadline'
+
+
+class _Ticket:
+    __slots__ = ('key', 'granted', 'submitted_at')
+    
+    def __init__(self, key):
+        self.key = key
+        self.granted = threading.Event()
+        self.submitted_at = time.monotonic()
+
+
+class LLMScheduler:
+    """Concurrency limit + bounded fair queue for LLM generations"""
+    
+    # How often a waiting question re-checks its position and deadline
+    POLL_INTERVAL = 0.25
+    
+    def __init__(self, max_concurrent=None, max_queue=None, queue_timeout=None):
+        self.max_concurrent = int(max_concurrent or os.getenv('LLM_MAX_CONCURRENT', '2'))
+        self.max_queue = int(max_queue if max_queue is not None else os.getenv('LLM_MAX_QUEUE', '20'))
+        self.queue_timeout = float(queue_timeout if queue_timeout is not None
+                                   else os.getenv('LLM_QUEUE_TIMEOUT', '30'))
+        
+        self.active = 0
+        # Table key -> waiting tickets; the first key is served next
+        self._queues = OrderedDict()
+        self._waiting = 0
+        self._lock = threading.Lock()
+        
+        self.served = 0
+        self.shed_queue_full = 0
+        self.shed_deadline = 0
+        self.max_wait = 0.0
+    
+    # ========================
+    # QUEUE
+    # ========================
+    
+    def _dispatch(self):
+        # Grant free slots round-robin: take the head of the first table's queue,
+        # then move that table to the back of the rotation
+        while self.active < self.max_concurrent and self._queues:
+            key, queue = next(iter(self._queues.items()))
+            ticket = queue.popleft()
+            if queue:
+                self._queues.move_to_end(key)
+            else:
+                del self._queues[key]
+            self._waiting -= 1
+            self.active += 1
+            ticket.granted.set()
+    
+    def _position(self, ticket):
+        """1-based place in the service order, 0 if no longer waiting"""
+        # Round r serves the r-th waiting ticket of every table, in rotation order
+        queues = list(self._queues.values())
+        position = 0
+        for round_index in range(max((len(queue) for queue in queues), default=0)):
+            for queue in queues:
+                if round_index < len(queue):
+                    position += 1
+                    if queue[round_index] is ticket:
+                        return position
+        return 0
+    
+    def _cancel(self, ticket):
+        queue = self._queues.get(ticket.key)
+        if queue is not None and ticket in queue:
+            queue.remove(ticket)
+            if not queue:
+                del self._queues[ticket.key]
+            self._waiting -= 1
+            return True
+        return False
+    
+    def acquire(self, key, on_position: Optional[Callable[[int], None]] = None, timeout=None):
+        """
+        Wait for a generation slot
+
+        Args:
+            key: Fairness key (table number or session id)
+            on_position: Called with the queue position (1 = next) whenever it changes
+            timeout: Seconds to wait in the queue (defaults to LLM_QUEUE_TIMEOUT)
+
+        Raises:
+            SchedulerBusy: queue full, or still waiting when the timeout expired
+        """
+        timeout = self.queue_timeout if timeout is None else timeout
+        ticket = _Ticket(key)
+        with self._lock:
+            if self.active < self.max_concurrent and not self._queues:
+                self.active += 1
+                self.served += 1
+                return
+            if self._waiting >= self.max_queue:
+                self.shed_queue_full += 1
+                raise SchedulerBusy('queue_full')
+            self._queues.setdefault(key, deque()).append(ticket)
+            self._waiting += 1
+            self._dispatch()
+            position = self._position(ticket)
+        
+        last_position = None
+        if on_position and position:
+            on_position(position)
+            last_position = position
+        deadline = ticket.submitted_at + timeout
+        while not ticket.granted.wait(min(self.POLL_INTERVAL, max(deadline - time.monotonic(), 0))):
+            with self._lock:
+                if time.monotonic() >= deadline and self._cancel(ticket):
+                    self.shed_deadline += 1
+                    raise SchedulerBusy('deadline')
+                position = self._position(ticket)
+            if on_position and position and position != last_position:
+                on_position(position)
+                last_position = position
+        
+        with self._lock:
+            self.served += 1
+            self.max_wait = max(self.max_wait, time.monotonic() - ticket.submitted_at)
+    
+    def release(self):
+        """Free a generation slot and admit the next waiting question"""
+        with self._lock:
+            self.active -= 1
+            self._dispatch()
+    
+    @contextmanager
+    def slot(self, key, on_position=None, timeout=None):
+        """acquire() ... release() as a context manager"""
+        self.acquire(key, on_position=on_position, timeout=timeout)
+        try:
+            yield
+        finally:
+            self.release()
+    
+    def stats(self):
+        """Current load and shedding counters"""
+        with self._lock:
+            return {
+                'active': self.active,
+                'waiting': self._waiting,
+                'tables_waiting': len(self._queues),
+                'served': self.served,
+                'shed_queue_full': self.shed_queue_full,
+                'shed_deadline': self.shed_deadline,
+                'max_wait': self.max_wait,
+            }
+
+
+# Global scheduler instance
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def get_scheduler() -> LLMScheduler:
+    """Get the process-wide LLM scheduler"""
+    global _scheduler
+    
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = LLMScheduler()
+    
+    return _scheduler
@@ -0,0 +1,132 @@
+"""
+AI Warm-up - Load the assistant in the background at startup
+
+Without this the first diner after a restart pays for opening Chroma,
+building the prompt templates and loading the Ollama model weights. The
+warm-up thread does all of that once per process, in order:
+
+1. vector_store - open (and sync) the menu vector index
+2. embeddings   - one tiny embedding to load the embedding model
+3. assistant    - build MenuAssistant (prompt templates, chains)
+4. llm          - a one-token generation to load the LLM weights; the
+                  assistant's keep_alive then keeps them loaded
+
+get_warmup_status() reports progress; wait_until_ready() lets the AI page
+wait for an in-flight warm-up instead of starting a second, parallel load.
+Disable with AI_WARMUP=false.
+"""
+
+import os
+import threading
+import time
+
+
+STEPS = ("vector_store", "embeddings", "assistant", "llm")
+
+
+class AIWarmup:
+    """Background loader for the RAG engine and the LLM"""
+    
+    def __init__(self):
+        self.state = 'idle'  # idle, running, ready, failed
+        self.current_step = None
+        self.step_durations = {}
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+        self._done = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+    
+    def _warm_vector_store(self):
+        from ai.rag_engine import get_rag_engine
+        get_rag_engine()
+    
+    def _warm_embeddings(self):
+        from ai.rag_engine import get_rag_engine
+        embeddings = get_rag_engine().embeddings
+        # Go past the embedding cache: the point is to load the model
+        getattr(embeddings, 'embeddings', embeddings).embed_query("menü")
+    
+    def _warm_assistant(self):
+        from ai.assistant import get_assistant
+        get_assistant()
+    
+    def _warm_llm(self):
+        from ai.assistant import get_assistant
+        llm = get_assistant().llm
+        llm.invoke("Merhaba", options={"num_predict": 1})
+    
+    def _run(self):
+        try:
+            for step in STEPS:
+                self.current_step = step
+                step_started = time.perf_counter()
+                getattr(self, f"_warm_{step}")()
+                self.step_durations[step] = time.perf_counter() - step_started
+            self.state = 'ready'
+        except Exception as e:
+            self.error = f"{self.current_step}: {e}"
+            self.state = 'failed'
+            print(f"AI warm-up failed at {self.error}")
+        finally:
+            self.current_step = None
+            self.finished_at = time.time()
+            self._done.set()
+    
+    def start(self):
+        """Start warming up in a background thread (no-op if already started)"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self.state = 'running'
+            self.started_at = time.time()
+            self._thread = threading.Thread(target=self._run, name="ai-warmup", daemon=True)
+            self._thread.start()
+    
+    def wait_until_ready(self, timeout=None):
+        """Block until the warm-up has finished; True if the assistant is ready"""
+        if self._thread is None:
+            return self.state == 'ready'
+        self._done.wait(timeout)
+        return self.state == 'ready'
+    
+    def status(self):
+        """Readiness snapshot for the UI"""
+        return {
+            'state': self.state,
+            'ready': self.state == 'ready',
+            'current_step': self.current_step,
+            'completed_steps': [step for step in STEPS if step in self.step_durations],
+            'step_durations': dict(self.step_durations),
+            'error': self.error,
+            'elapsed': (self.finished_at or time.time()) - self.started_at if self.started_at else 0.0,
+        }
+
+
+# Global warm-up instance
+_warmup = None
+_warmup_lock = threading.Lock()
+
+def get_warmup() -> AIWarmup:
+    """Get the process-wide warm-up"""
+    global _warmup
+    
+    if _warmup is None:
+        with _warmup_lock:
+            if _warmup is None:
+                _warmup = AIWarmup()
+    
+    return _warmup
+
+
+def start_warmup():
+    """Start the background warm-up unless AI_WARMUP=false (safe to call on every rerun)"""
+    if os.getenv('AI_WARMUP', 'true').lower() != 'true':
+        return
+    get_warmup().start()
+
+
+def get_warmup_status():
+    """Readiness of the AI assistant"""
+    return get_warmup().status()
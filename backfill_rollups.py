@@ -0,0 +1,57 @@
+"""
+Rebuild the daily sales rollups (daily_rollups) from the order history
+Run once after upgrading an existing database, or after bulk order changes
+
+Usage:
+    python backfill_rollups.py                        # all days
+    python backfill_rollups.py 2025-01-01             # from a day until today
+    python backfill_rollups.py 2025-01-01 2025-03-31  # a date range
+"""
+
+import os
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from database.models import Base, get_engine, get_session
+from database.rollups import backfill_rollups
+
+
+def run_backfill(start_date=None, end_date=None):
+    """Create the rollup table if needed and rebuild its rows"""
+    try:
+        Base.metadata.create_all(get_engine())
+        
+        session = get_session()
+        try:
+            started = time.perf_counter()
+            written = backfill_rollups(session, start_date, end_date)
+        finally:
+            session.close()
+        
+        for dimension, count in written.items():
+            print(f"  📊 {dimension}: {count} rows")
+        print(f"✅ Rollups rebuilt in {time.perf_counter() - started:.1f}s")
+        return True
+    
+    except Exception as e:
+        print(f"❌ Error rebuilding rollups: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    start = date.fromisoformat(sys.argv[1]) if len(sys.argv) > 1 else None
+    end = date.fromisoformat(sys.argv[2]) if len(sys.argv) > 2 else None
+    
+    days = f"{start} - {end or 'today'}" if start else "all days"
+    print(f"🔧 Rebuilding daily rollups ({days})...")
+    print("-" * 50)
+    success = run_backfill(start, end)
+    print("-" * 50)
+    
+    if success:
+        print("✅ Backfill completed successfully!")
+    else:
+        print("❌ Backfill failed!")
@@ -0,0 +1,133 @@
+"""
+Benchmark concurrent checkout throughput and order number uniqueness
+
+Simulates many phones confirming their carts at the same time against a
+temporary SQLite database and compares the per-day counter (order_sequences)
+with the old COUNT(*) based order number generation.
+
+Usage:
+    python benchmark_checkout.py [threads] [orders_per_thread]
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import func
+
+from database import models
+from database.models import Category, MenuItem, Table, Order
+
+
+def setup_database():
+    """Create and seed a fresh temporary database"""
+    db_path = os.path.join(tempfile.mkdtemp(), "bench_checkout.db")
+    os.environ['DATABASE_URL'] = f"sqlite:///{db_path}"
+    models.dispose_engine()
+    models.init_db()
+
+    session = models.get_session()
+    category = Category(name="Pizzalar", name_en="Pizzas")
+    session.add(category)
+    session.flush()
+    for i in range(20):
+        session.add(MenuItem(category_id=category.id, name=f"Ürün {i}", price=50.0 + i, order_count=0))
+    for i in range(1, 41):
+        session.add(Table(table_number=i))
+    session.commit()
+    session.close()
+
+
+def legacy_order_number(db):
+    """Old generator: COUNT(*) over today's orders (non-sargable, racy)"""
+    today = datetime.now().strftime("%Y%m%d")
+    count = db.session.query(Order).filter(
+        func.DATE(Order.created_at) == datetime.now().date()
+    ).count()
+    return f"ORD-{today}-{count+1:03d}"
+
+
+def run(threads, orders_per_thread, legacy=False):
+    """Place orders from many threads and report throughput and failures"""
+    from database.db_manager import DatabaseManager
+
+    setup_database()
+    errors = []
+    latencies = []
+    lock = threading.Lock()
+
+    def worker(worker_id):
+        for n in range(orders_per_thread):
+            db = DatabaseManager()
+            if legacy:
+                db._generate_order_number = lambda db=db: legacy_order_number(db)
+            cart = [
+                {'item_id': (worker_id + n) % 20 + 1, 'quantity': 2},
+                {'item_id': (worker_id * 3 + n) % 20 + 1, 'quantity': 1},
+            ]
+            start = time.perf_counter()
+            try:
+                if legacy:
+                    # No retries - this is how checkout behaved before
+                    db._run_with_retry = lambda op: op()
+                db.place_order(worker_id % 40 + 1, f"bench-{worker_id}", cart)
+            except Exception as e:
+                with lock:
+                    errors.append(type(e).__name__)
+            finally:
+                with lock:
+                    latencies.append(time.perf_counter() - start)
+                db.close()
+
+    started = time.perf_counter()
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    session = models.get_session()
+    placed = session.query(Order).count()
+    distinct_numbers = session.query(func.count(func.distinct(Order.order_number))).scalar()
+    session.close()
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0
+    return {
+        'placed': placed,
+        'distinct_numbers': distinct_numbers,
+        'errors': len(errors),
+        'error_types': sorted(set(errors)),
+        'elapsed': elapsed,
+        'throughput': placed / elapsed if elapsed else 0,
+        'p95_ms': p95 * 1000,
+    }
+
+
+def print_result(label, result):
+    print(f"{label}")
+    print(f"   Orders placed:      {result['placed']}")
+    print(f"   Unique numbers:     {result['distinct_numbers']}")
+    print(f"   Failed checkouts:   {result['errors']} {result['error_types'] or ''}")
+    print(f"   Throughput:         {result['throughput']:.1f} orders/s")
+    print(f"   p95 latency:        {result['p95_ms']:.1f} ms")
+    print()
+
+
+if __name__ == "__main__":
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    orders_per_thread = int(sys.argv[2]) if len(sys.argv) > 2 else 25
+
+    print("=" * 60)
+    print(f"Concurrent Checkout Benchmark ({threads} threads x {orders_per_thread} orders)")
+    print("=" * 60)
+    print()
+
+    print_result("📊 Legacy COUNT(*) order numbers", run(threads, orders_per_thread, legacy=True))
+    print_result("🚀 Per-day counter + retry", run(threads, orders_per_thread))
@@ -0,0 +1,133 @@
+"""
+Benchmark menu retrieval: vector only vs keyword (BM25) vs hybrid (RRF + exact names)
+
+Loads the seeded menu (data/menu_items.csv) into a temporary database and
+vector index, then measures recall@k and latency for three query sets:
+  - names:       "<dish> var mı?" for every item (relevant: that item)
+  - ingredients: an ingredient word (relevant: items containing it)
+  - allergens:   an allergen keyword (relevant: items declaring it)
+
+Uses the Ollama embedding model when it is reachable; otherwise falls back to
+deterministic hash embeddings, which carry no meaning - vector recall is then
+a chance baseline and the numbers show what the keyword side adds.
+
+Usage:
+    python benchmark_hybrid_search.py [k]
+"""
+
+import hashlib
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from langchain_core.embeddings import Embeddings
+
+INGREDIENTS = ["mozzarella", "tuna", "chicken", "mushroom", "basil", "garlic", "olives", "cream", "onion", "rice"]
+ALLERGENS = ["fish", "egg", "dairy"]
+
+
+class HashEmbeddings(Embeddings):
+    """Deterministic vectors without meaning (used when Ollama is not running)"""
+    
+    def _vector(self, text):
+        digest = hashlib.sha256(text.encode("utf-8")).digest()
+        return [byte / 255 for byte in digest[:32]]
+    
+    def embed_documents(self, texts):
+        return [self._vector(text) for text in texts]
+    
+    def embed_query(self, text):
+        return self._vector(text)
+
+
+def pick_embeddings():
+    """Ollama embeddings if the server answers, else hash embeddings"""
+    try:
+        from ai.embedding_cache import get_cached_embeddings
+        embeddings = get_cached_embeddings()
+        embeddings.embed_query("test")
+        return embeddings, f"Ollama ({embeddings.model_name})"
+    except Exception:
+        return HashEmbeddings(), "hash embeddings (Ollama not reachable - vector side is a chance baseline)"
+
+
+def build_engine():
+    """Seeded menu in a temporary database, plus a RAG engine over it"""
+    from database import models
+    from database.init_data import init_sample_data
+    
+    tmp_dir = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmp_dir, 'benchmark.db')}"
+    os.environ['VECTOR_DB_PATH'] = os.path.join(tmp_dir, "vector_db")
+    os.environ.setdefault('EMBEDDING_CACHE_PATH', os.path.join(tmp_dir, "embedding_cache.db"))
+    models.dispose_engine()
+    init_sample_data()
+    
+    from ai.rag_engine import MenuRAGEngine
+    embeddings, label = pick_embeddings()
+    return MenuRAGEngine(embeddings=embeddings), label
+
+
+def build_queries(engine):
+    """(query set, question, relevant item ids)"""
+    documents = list(engine.keyword_index.documents.values())
+    queries = []
+    for doc in documents:
+        queries.append(("names", f"{doc.metadata['name']} var mı?", {doc.metadata['item_id']}))
+    for ingredient in INGREDIENTS:
+        relevant = {doc.metadata['item_id'] for doc in documents
+                    if ingredient in doc.metadata['ingredients'].split(",")}
+        if relevant:
+            queries.append(("ingredients", f"{ingredient} olan bir şey", relevant))
+    for allergen in ALLERGENS:
+        relevant = {doc.metadata['item_id'] for doc in documents if doc.metadata[f"allergen_{allergen}"]}
+        if relevant:
+            queries.append(("allergens", f"{allergen} içeren ürünler", relevant))
+    return queries
+
+
+def recall_at_k(found, relevant, k):
+    return len(set(found[:k]) & relevant) / min(k, len(relevant))
+
+
+def run(k=5):
+    engine, label = build_engine()
+    queries = build_queries(engine)
+    retrievers = {
+        'vector': lambda q: engine.search_menu(q, k=k),
+        'keyword': lambda q: engine.keyword_index.search(q, k=k),
+        'hybrid': lambda q: engine.hybrid_search(q, k=k),
+    }
+    
+    results = {}
+    for name, retrieve in retrievers.items():
+        recalls = {}
+        started = time.perf_counter()
+        for query_set, question, relevant in queries:
+            found = [doc.metadata['item_id'] for doc in retrieve(question)]
+            recalls.setdefault(query_set, []).append(recall_at_k(found, relevant, k))
+        elapsed = time.perf_counter() - started
+        results[name] = {
+            'recall': {query_set: sum(values) / len(values) for query_set, values in recalls.items()},
+            'ms_per_query': elapsed / len(queries) * 1000,
+        }
+    return label, len(queries), results
+
+
+if __name__ == "__main__":
+    k = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    
+    label, query_count, results = run(k)
+    
+    print("=" * 60)
+    print(f"Menu Retrieval Benchmark (recall@{k}, {query_count} queries)")
+    print(f"Embeddings: {label}")
+    print("=" * 60)
+    query_sets = list(next(iter(results.values()))['recall'])
+    print(f"{'':10}" + "".join(f"{name:>13}" for name in query_sets) + f"{'ms/query':>11}")
+    for name, result in results.items():
+        print(f"{name:10}" + "".join(f"{result['recall'][s]:>13.2f}" for s in query_sets)
+              + f"{result['ms_per_query']:>11.2f}")
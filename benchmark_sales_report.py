@@ -0,0 +1,156 @@
+"""
+Benchmark the Reports page sales report: ORM loop vs SQL GROUP BY
+
+Fills a temporary SQLite database with a synthetic year of orders and runs
+the old generate_sales_report (every Order loaded, counted in Python) and
+database.reports.get_sales_report (GROUP BY day, status) over the same date
+ranges, measuring latency and peak Python memory (tracemalloc).
+
+Usage:
+    python benchmark_sales_report.py [orders_per_day] [days]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import and_, insert
+
+from database import models
+from database.db_manager import day_range
+from database.models import Order, Table
+from database.reports import get_sales_report
+
+STATUSES = ['paid'] * 8 + ['served', 'cancelled', 'pending', 'preparing', 'ready']
+RANGES = [7, 30, 90, 365]
+
+
+def setup_database(orders_per_day, days):
+    """Create a temporary database with `days` days of synthetic orders up to today"""
+    db_path = os.path.join(tempfile.mkdtemp(), "bench_reports.db")
+    os.environ['DATABASE_URL'] = f"sqlite:///{db_path}"
+    models.dispose_engine()
+    models.init_db()
+    
+    session = models.get_session()
+    for i in range(1, 41):
+        session.add(Table(table_number=i))
+    session.commit()
+    
+    rng = random.Random(42)
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    for day_offset in range(days):
+        day = today - timedelta(days=day_offset)
+        rows = []
+        for n in range(orders_per_day):
+            created_at = day + timedelta(seconds=rng.randint(10 * 3600, 23 * 3600))
+            rows.append({
+                'order_number': f"ORD-{day:%Y%m%d}-{n + 1:04d}",
+                'table_id': rng.randint(1, 40),
+                'session_id': f"bench-{day_offset}-{n}",
+                'status': rng.choice(STATUSES),
+                'total_amount': round(rng.uniform(40, 600), 2),
+                'created_at': created_at,
+                'updated_at': created_at,
+            })
+        session.execute(insert(Order), rows)
+    session.commit()
+    session.close()
+
+
+def legacy_sales_report(db, start_date, end_date):
+    """Old generate_sales_report from the Reports page (loads every Order)"""
+    range_start, range_end = day_range(start_date, end_date)
+    orders = db.session.query(Order).filter(
+        and_(
+            Order.created_at >= range_start,
+            Order.created_at < range_end
+        )
+    ).all()
+    
+    if not orders:
+        return None
+    
+    total_orders = len(orders)
+    total_revenue = sum(o.total_amount for o in orders if o.status == 'paid')
+    avg_order_value = total_revenue / total_orders if total_orders > 0 else 0
+    
+    status_counts = {}
+    for order in orders:
+        status_counts[order.status] = status_counts.get(order.status, 0) + 1
+    
+    daily_data = {}
+    for order in orders:
+        date_key = order.created_at.date()
+        if date_key not in daily_data:
+            daily_data[date_key] = {'orders': 0, 'revenue': 0}
+        daily_data[date_key]['orders'] += 1
+        if order.status == 'paid':
+            daily_data[date_key]['revenue'] += order.total_amount
+    
+    return {
+        'total_orders': total_orders,
+        'total_revenue': total_revenue,
+        'avg_order_value': avg_order_value,
+        'status_counts': status_counts,
+        'daily_data': daily_data
+    }
+
+
+def measure(report):
+    """Run one report on a fresh session; (result, seconds, peak MB)"""
+    from database.db_manager import DatabaseManager
+    
+    db = DatabaseManager()
+    try:
+        tracemalloc.start()
+        started = time.perf_counter()
+        result = report(db)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        db.close()
+    return result, elapsed, peak / 1024 / 1024
+
+
+def run(orders_per_day, days):
+    setup_database(orders_per_day, days)
+    end_date = datetime.now().date()
+    results = []
+    for range_days in [r for r in RANGES if r <= days]:
+        start_date = end_date - timedelta(days=range_days - 1)
+        legacy, legacy_time, legacy_mb = measure(lambda db: legacy_sales_report(db, start_date, end_date))
+        grouped, grouped_time, grouped_mb = measure(lambda db: get_sales_report(db.session, start_date, end_date))
+        assert legacy['total_orders'] == grouped['total_orders']
+        assert abs(legacy['total_revenue'] - grouped['total_revenue']) < 0.01 * max(1, legacy['total_revenue'])
+        assert legacy['status_counts'] == dict(grouped['status_counts'].itertuples(index=False))
+        results.append({
+            'days': range_days,
+            'orders': legacy['total_orders'],
+            'legacy_ms': legacy_time * 1000,
+            'legacy_mb': legacy_mb,
+            'grouped_ms': grouped_time * 1000,
+            'grouped_mb': grouped_mb,
+            'grouped_rows': len(grouped['daily']),
+        })
+    return results
+
+
+if __name__ == "__main__":
+    orders_per_day = int(sys.argv[1]) if len(sys.argv) > 1 else 650
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 365
+    
+    print("=" * 60)
+    print(f"Sales Report Benchmark ({orders_per_day} orders/day x {days} days)")
+    print("=" * 60)
+    print(f"{'range':>6} {'orders':>8} | {'ORM loop':>18} | {'GROUP BY':>18} | speedup")
+    for r in run(orders_per_day, days):
+        print(f"{r['days']:>5}d {r['orders']:>8} | {r['legacy_ms']:>8.0f} ms {r['legacy_mb']:>6.1f} MB | "
+              f"{r['grouped_ms']:>8.1f} ms {r['grouped_mb']:>6.2f} MB | {r['legacy_ms'] / r['grouped_ms']:.0f}x")
@@ -1 +1,5 @@
-# Database module
\ No newline at end of file
+# Database module
+
+# Register the session/mapper events that keep the menu cache version
+# and the menu search index up to date
+from database import menu_cache, search  # noqa: F401
@@ -2,17 +2,39 @@
 Database Manager - CRUD operations for the restaurant system
 """
 
-from sqlalchemy.orm import Session
-from sqlalchemy import desc, func
+from sqlalchemy.orm import Session, joinedload, selectinload, subqueryload
+from sqlalchemy import desc, func, case, insert, update
+from sqlalchemy.exc import IntegrityError, OperationalError
 from database.models import (
-    Category, MenuItem, Table, Order, OrderItem, 
-    CustomerReview, ChatHistory, Restaurant, get_session
+    Category, MenuItem, Table, Order, OrderItem, OrderSequence,
+    CustomerReview, ChatHistory, Notification, NotificationOutbox, Restaurant, get_session
 )
-from datetime import datetime
+from database.rollups import ensure_rollups, get_day_total, record_status_change
+from database.search import search_menu_items
+from datetime import datetime, timedelta
 import json
+import os
+import random
+import time
 from typing import List, Optional
 
 
+ACTIVE_ORDER_STATUSES = ['pending', 'preparing', 'ready', 'served']
+
+
+def day_range(start_date, end_date=None):
+    """
+    Half-open datetime range [start 00:00, day after end 00:00) for date filters
+    
+    Filtering created_at against this range can use the created_at indexes,
+    unlike func.DATE(created_at) comparisons.
+    """
+    end_date = end_date or start_date
+    start = datetime.combine(start_date, datetime.min.time())
+    end = datetime.combine(end_date, datetime.min.time()) + timedelta(days=1)
+    return start, end
+
+
 class DatabaseManager:
     """Centralized database operations"""
     
@@ -57,11 +79,13 @@ class DatabaseManager:
             query = query.filter(MenuItem.is_available == True)
         return query.all()
     
-    def get_all_menu_items(self, available_only=True):
-        """Get all menu items"""
+    def get_all_menu_items(self, available_only=True, with_category=False):
+        """Get all menu items (with_category=True loads each item's category in the same query)"""
         query = self.session.query(MenuItem)
         if available_only:
             query = query.filter(MenuItem.is_available == True)
+        if with_category:
+            query = query.options(joinedload(MenuItem.category))
         return query.all()
     
     def get_menu_item_by_id(self, item_id):
@@ -72,21 +96,21 @@ class DatabaseManager:
         """Alias for get_menu_item_by_id"""
         return self.get_menu_item_by_id(item_id)
     
-    def search_menu_items(self, search_term, available_only=True):
-        """Search menu items by name or description"""
-        query = self.session.query(MenuItem).filter(
-            (MenuItem.name.contains(search_term)) | 
-            (MenuItem.description.contains(search_term))
-        )
-        if available_only:
-            query = query.filter(MenuItem.is_available == True)
-        return query.all()
-    
-    def get_popular_items(self, limit=10):
-        """Get most popular items"""
-        return self.session.query(MenuItem)\
-            .filter(MenuItem.is_available == True)\
-            .order_by(desc(MenuItem.order_count))\
+    def search_menu_items(self, search_term, available_only=True, limit=50):
+        """
+        Search menu items by name, description and ingredients (best matches first)
+        
+        Turkish-aware (İ/ı, ş/s...) full-text search; every word matches as a prefix.
+        """
+        return search_menu_items(self.session, search_term, available_only=available_only, limit=limit)
+    
+    def get_popular_items(self, limit=10, with_category=False):
+        """Get most popular items (with_category=True loads each item's category in the same query)"""
+        query = self.session.query(MenuItem)\
+            .filter(MenuItem.is_available == True)
+        if with_category:
+            query = query.options(joinedload(MenuItem.category))
+        return query.order_by(desc(MenuItem.order_count))\
             .limit(limit).all()
     
     def get_vegetarian_items(self):
@@ -154,24 +178,85 @@ class DatabaseManager:
     # ORDER OPERATIONS
     # ========================
     
+    def _last_order_number_for(self, day):
+        """Highest order sequence already used on a day (seeds a new day counter)"""
+        prefix = f"ORD-{day}-"
+        last = self.session.query(Order.order_number).filter(
+            Order.order_number >= prefix,
+            Order.order_number < f"ORD-{day}."
+        ).order_by(func.length(Order.order_number).desc(), Order.order_number.desc()).first()
+        if not last:
+            return 0
+        try:
+            return int(last[0][len(prefix):])
+        except ValueError:
+            return 0
+    
+    def _generate_order_number(self):
+        """
+        Reserve the next order number for today: ORD-20250106-001
+        
+        Bumps the per-day counter row in order_sequences. The row stays locked
+        until the surrounding transaction commits, so concurrent checkouts can
+        never be handed the same number.
+        """
+        today = datetime.now().strftime("%Y%m%d")
+        bumped = self.session.execute(
+            update(OrderSequence)
+            .where(OrderSequence.seq_date == today)
+            .values(last_value=OrderSequence.last_value + 1)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        
+        if not bumped:
+            # First order of the day - a concurrent insert surfaces as IntegrityError and is retried
+            self.session.add(OrderSequence(
+                seq_date=today,
+                last_value=self._last_order_number_for(today) + 1
+            ))
+            self.session.flush()
+        
+        value = self.session.query(OrderSequence.last_value)\
+            .filter(OrderSequence.seq_date == today).scalar()
+        return f"ORD-{today}-{value:03d}"
+    
+    def _run_with_retry(self, operation, attempts=None):
+        """
+        Run a write transaction, retrying on order number collisions and lock errors
+        
+        operation must commit its own work; the session is rolled back before each retry.
+        """
+        attempts = attempts or int(os.getenv('ORDER_RETRY_ATTEMPTS', '5'))
+        for attempt in range(attempts):
+            try:
+                return operation()
+            except (IntegrityError, OperationalError) as e:
+                self.session.rollback()
+                retryable = isinstance(e, IntegrityError) or any(
+                    word in str(e.orig).lower() for word in ('locked', 'busy', 'deadlock', 'serializ')
+                )
+                if not retryable or attempt == attempts - 1:
+                    raise
+                # Exponential backoff with jitter
+                time.sleep(0.01 * (2 ** attempt) * (1 + random.random()))
+            except Exception:
+                self.session.rollback()
+                raise
+    
     def create_order(self, table_id, session_id, order_number=None):
         """Create new order"""
-        if not order_number:
-            # Generate order number: ORD-20250106-001
-            today = datetime.now().strftime("%Y%m%d")
-            count = self.session.query(Order).filter(
-                func.DATE(Order.created_at) == datetime.now().date()
-            ).count()
-            order_number = f"ORD-{today}-{count+1:03d}"
+        def _create():
+            order = Order(
+                order_number=order_number or self._generate_order_number(),
+                table_id=table_id,
+                session_id=session_id
+            )
+            self.session.add(order)
+            self.session.commit()
+            return order
         
-        order = Order(
-            order_number=order_number,
-            table_id=table_id,
-            session_id=session_id
-        )
-        self.session.add(order)
-        self.session.commit()
-        return order
+        # A caller-supplied number cannot change between attempts
+        return self._run_with_retry(_create, attempts=1 if order_number else None)
     
     def get_order_by_id(self, order_id):
         """Get order by ID"""
@@ -184,55 +269,145 @@ class DatabaseManager:
             query = query.filter(Order.session_id == session_id)
         return query.all()
     
-    def get_today_orders_by_table(self, table_id):
+    def _with_order_details(self, query):
+        """Eager-load table, items and each item's menu item for a query over Order"""
+        return query.options(
+            joinedload(Order.table),
+            selectinload(Order.items).joinedload(OrderItem.menu_item)
+        )
+    
+    def get_today_orders_by_table(self, table_id, with_items=False):
         """Get today's orders for a table"""
         from datetime import datetime, date
         today_start = datetime.combine(date.today(), datetime.min.time())
-        return self.session.query(Order).filter(
+        query = self.session.query(Order).filter(
             Order.table_id == table_id,
             Order.created_at >= today_start
-        ).order_by(Order.created_at.desc()).all()
+        )
+        if with_items:
+            query = self._with_order_details(query)
+        return query.order_by(Order.created_at.desc()).all()
     
-    def get_orders_by_table_and_date_range(self, table_id=None, start_date=None, end_date=None):
-        """Get orders by table and date range"""
-        from datetime import datetime, timedelta
-        
-        query = self.session.query(Order)
-        
-        # Filter by table if provided
+    def _filter_table_and_date_range(self, query, table_id=None, start_date=None, end_date=None):
+        """Restrict an orders query to a table (optional) and a date range"""
         if table_id:
             query = query.filter(Order.table_id == table_id)
-        
-        # Filter by date range
         if start_date:
-            start_datetime = datetime.combine(start_date, datetime.min.time())
-            query = query.filter(Order.created_at >= start_datetime)
-        
+            query = query.filter(Order.created_at >= day_range(start_date)[0])
         if end_date:
-            end_datetime = datetime.combine(end_date, datetime.max.time())
-            query = query.filter(Order.created_at <= end_datetime)
+            query = query.filter(Order.created_at < day_range(end_date)[1])
+        return query
+    
+    def get_orders_by_table_and_date_range(self, table_id=None, start_date=None, end_date=None, with_items=False,
+                                           limit=None, offset=0):
+        """
+        Get orders by table and date range, newest first
+        
+        with_items: eager-load table, items and menu items
+        limit/offset: one page of the orders (reports show large ranges page by page)
+        """
+        query = self.session.query(Order)
+        if with_items:
+            # subqueryload: one items query for any range (selectinload batches 500 ids per query)
+            query = query.options(
+                joinedload(Order.table),
+                subqueryload(Order.items).joinedload(OrderItem.menu_item)
+            )
         
+        query = self._filter_table_and_date_range(query, table_id, start_date, end_date)
+        query = query.order_by(Order.created_at.desc(), Order.id.desc())
+        if limit is not None:
+            query = query.limit(limit).offset(offset)
+        return query.all()
+    
+    def get_order_summary_by_table_and_date_range(self, table_id=None, start_date=None, end_date=None):
+        """Order count, paid order count and paid revenue in one aggregate query"""
+        query = self.session.query(
+            func.count(Order.id),
+            func.coalesce(func.sum(case((Order.status == 'paid', 1), else_=0)), 0),
+            func.coalesce(func.sum(case((Order.status == 'paid', Order.total_amount), else_=0.0)), 0.0)
+        )
+        total_orders, paid_orders, paid_revenue = self._filter_table_and_date_range(
+            query, table_id, start_date, end_date
+        ).one()
+        return {
+            'total_orders': int(total_orders),
+            'paid_orders': int(paid_orders),
+            'total_revenue': float(paid_revenue),
+        }
+    
+    def get_active_orders(self, with_items=False):
+        """
+        Get all active orders (not paid or cancelled) - ordered by newest first
+        
+        with_items=True also loads each order's table, items and menu items up front
+        (three queries in total instead of several per order).
+        """
+        query = self.session.query(Order).filter(
+            Order.status.in_(ACTIVE_ORDER_STATUSES)
+        )
+        if with_items:
+            query = self._with_order_details(query)
         return query.order_by(Order.created_at.desc()).all()
     
-    def get_active_orders(self):
-        """Get all active orders (not paid or cancelled) - ordered by newest first"""
-        return self.session.query(Order).filter(
-            Order.status.in_(['pending', 'preparing', 'ready', 'served'])
-        ).order_by(Order.created_at.desc()).all()
+    def get_active_order_count(self):
+        """Count active orders without loading them"""
+        return self.session.query(func.count(Order.id)).filter(
+            Order.status.in_(ACTIVE_ORDER_STATUSES)
+        ).scalar()
+    
+    def get_order_change_token(self):
+        """
+        Cheap token that changes whenever an order or table is created or updated
+        
+        Each part is a MAX() over an indexed column (or the tiny tables table),
+        so polling it costs a few index lookups instead of re-running page queries.
+        """
+        return (
+            self.session.query(func.max(Order.id)).scalar(),
+            self.session.query(func.max(Order.updated_at)).scalar(),
+            self.session.query(func.max(Table.updated_at)).scalar(),
+        )
+    
+    def get_latest_order_id(self):
+        """Highest order id (0 when there are no orders)"""
+        return self.session.query(func.max(Order.id)).scalar() or 0
+    
+    def get_orders_after_id(self, order_id, limit=200):
+        """
+        Orders with an id greater than order_id, oldest first, with their table number
+        
+        A primary key range read - used by the order change feed instead of
+        created_at comparisons, which can miss rows committed late.
+        """
+        return self.session.query(
+            Order.id, Order.order_number, Order.total_amount,
+            Order.created_at, Table.table_number
+        ).outerjoin(Table, Order.table_id == Table.id).filter(
+            Order.id > order_id
+        ).order_by(Order.id).limit(limit).all()
     
     def update_order_status(self, order_id, status):
-        """Update order status"""
-        order = self.get_order_by_id(order_id)
-        if order:
-            order.status = status
-            if status == 'preparing':
-                order.prepared_at = datetime.now()
-            elif status == 'served':
-                order.served_at = datetime.now()
-            elif status == 'paid':
-                order.paid_at = datetime.now()
-            self.session.commit()
-        return order
+        """Update order status (and the daily rollups when it is paid or cancelled)"""
+        # Before the change: a backfill run afterwards would count this order twice,
+        # and an empty table filled by this change alone would never be backfilled
+        ensure_rollups()
+        
+        def _update():
+            order = self.get_order_by_id(order_id)
+            if order:
+                record_status_change(self.session, order, order.status, status)
+                order.status = status
+                if status == 'preparing':
+                    order.prepared_at = datetime.now()
+                elif status == 'served':
+                    order.served_at = datetime.now()
+                elif status == 'paid':
+                    order.paid_at = datetime.now()
+                self.session.commit()
+            return order
+        
+        return self._run_with_retry(_update)
     
     def add_order_item(self, order_id, menu_item_id, quantity=1, notes=None):
         """Add item to order"""
@@ -258,12 +433,109 @@ class DatabaseManager:
         if order:
             order.total_amount += subtotal
         
-        # Update item order count
-        menu_item.order_count += quantity
+        # Update item order count (without touching updated_at, see place_order)
+        self.session.execute(
+            update(MenuItem)
+            .where(MenuItem.id == menu_item_id)
+            .values(order_count=func.coalesce(MenuItem.order_count, 0) + quantity, updated_at=MenuItem.updated_at)
+            .execution_options(synchronize_session=False)
+        )
         
         self.session.commit()
         return order_item
     
+    def place_order(self, table_id, session_id, cart_lines, table_status='occupied'):
+        """
+        Create an order with all its items in a single transaction
+        
+        Args:
+            table_id: Table placing the order
+            session_id: Customer session ID
+            cart_lines: List of dicts with 'item_id', 'quantity' and optional 'notes'
+                        (the same shape as st.session_state.cart)
+            table_status: Status to set on the table once the order is placed
+        
+        Returns:
+            The created Order, or None if no cart line matched a menu item
+        """
+        quantities = {}
+        for line in cart_lines:
+            item_id = line['item_id']
+            quantities[item_id] = quantities.get(item_id, 0) + line.get('quantity', 1)
+        
+        if not quantities:
+            return None
+        
+        def _place():
+            # Reserve the order number first so the write lock is taken up front
+            order_number = self._generate_order_number()
+            
+            # Prefetch all menu items in one IN query
+            prices = dict(
+                self.session.query(MenuItem.id, MenuItem.price)
+                .filter(MenuItem.id.in_(list(quantities)))
+                .all()
+            )
+            if not prices:
+                self.session.rollback()
+                return None
+            
+            order = Order(
+                order_number=order_number,
+                table_id=table_id,
+                session_id=session_id
+            )
+            self.session.add(order)
+            self.session.flush()  # Get the order ID
+            
+            rows = []
+            total_amount = 0.0
+            for line in cart_lines:
+                item_id = line['item_id']
+                if item_id not in prices:
+                    continue
+                quantity = line.get('quantity', 1)
+                subtotal = prices[item_id] * quantity
+                total_amount += subtotal
+                rows.append({
+                    'order_id': order.id,
+                    'menu_item_id': item_id,
+                    'quantity': quantity,
+                    'unit_price': prices[item_id],
+                    'subtotal': subtotal,
+                    'notes': line.get('notes') or None,
+                })
+            
+            self.session.execute(insert(OrderItem), rows)
+            order.total_amount = total_amount
+            
+            # Bump popularity counters in one UPDATE; a counter is not a menu change,
+            # so updated_at keeps its value (the analytics export tracks menu changes by it)
+            increments = {item_id: qty for item_id, qty in quantities.items() if item_id in prices}
+            self.session.execute(
+                update(MenuItem)
+                .where(MenuItem.id.in_(list(increments)))
+                .values(
+                    order_count=func.coalesce(MenuItem.order_count, 0) + case(increments, value=MenuItem.id, else_=0),
+                    updated_at=MenuItem.updated_at
+                )
+                .execution_options(synchronize_session=False)
+            )
+            
+            if table_status:
+                table_values = {'status': table_status, 'updated_at': datetime.now()}
+                if session_id:
+                    table_values['current_session_id'] = session_id
+                self.session.execute(
+                    update(Table).where(Table.id == table_id).values(**table_values)
+                    .execution_options(synchronize_session=False)
+                )
+            
+            self.session.commit()
+            return order
+        
+        return self._run_with_retry(_place)
+    
     def get_order_items(self, order_id):
         """Get all items in an order"""
         return self.session.query(OrderItem).filter(OrderItem.order_id == order_id).all()
@@ -294,6 +566,136 @@ class DatabaseManager:
             .order_by(ChatHistory.created_at)\
             .limit(limit).all()
     
+    # ========================
+    # NOTIFICATIONS
+    # ========================
+    
+    def create_notification(self, type, title, message=None, priority='low',
+                            order_id=None, table_number=None):
+        """Save a notification"""
+        notification = Notification(
+            type=type,
+            title=title,
+            message=message,
+            priority=priority,
+            order_id=order_id,
+            table_number=table_number
+        )
+        self.session.add(notification)
+        self.session.commit()
+        return notification
+    
+    def get_recent_notifications(self, limit=200):
+        """Latest notifications, newest first"""
+        return self.session.query(Notification)\
+            .order_by(Notification.id.desc())\
+            .limit(limit).all()
+    
+    def get_unread_notifications(self, limit=None):
+        """Unread notifications, newest first (served by the (is_read, id) index)"""
+        query = self.session.query(Notification)\
+            .filter(Notification.is_read == False)\
+            .order_by(Notification.id.desc())
+        if limit:
+            query = query.limit(limit)
+        return query.all()
+    
+    def count_notifications(self, unread_only=False):
+        """Count notifications without loading them"""
+        query = self.session.query(func.count(Notification.id))
+        if unread_only:
+            query = query.filter(Notification.is_read == False)
+        return query.scalar()
+    
+    def mark_notifications_read(self, notification_ids=None):
+        """Mark the given (or all) unread notifications as read, return how many changed"""
+        query = self.session.query(Notification).filter(Notification.is_read == False)
+        if notification_ids is not None:
+            query = query.filter(Notification.id.in_(notification_ids))
+        changed = query.update(
+            {Notification.is_read: True, Notification.read_at: datetime.now()},
+            synchronize_session=False
+        )
+        self.session.commit()
+        return changed
+    
+    def prune_notifications(self, keep):
+        """Delete all but the newest `keep` notifications (one DELETE on the primary key), return how many"""
+        max_id = self.session.query(func.max(Notification.id)).scalar()
+        if max_id is None or max_id <= keep:
+            return 0
+        deleted = self.session.query(Notification).filter(
+            Notification.id <= max_id - keep
+        ).delete(synchronize_session=False)
+        self.session.commit()
+        return deleted
+    
+    def delete_all_notifications(self):
+        """Delete every notification"""
+        self.session.query(Notification).delete(synchronize_session=False)
+        self.session.commit()
+    
+    # ========================
+    # NOTIFICATION OUTBOX
+    # ========================
+    
+    def enqueue_outbox_message(self, channel, body, recipient=None, subject=None):
+        """Queue an email/SMS for the background outbox worker"""
+        message = NotificationOutbox(
+            channel=channel,
+            recipient=recipient,
+            subject=subject,
+            body=body
+        )
+        self.session.add(message)
+        self.session.commit()
+        return message
+    
+    def get_due_outbox_messages(self, limit=20):
+        """Pending messages whose next attempt is due, oldest first"""
+        return self.session.query(NotificationOutbox).filter(
+            NotificationOutbox.status == 'pending',
+            NotificationOutbox.next_attempt_at <= datetime.now()
+        ).order_by(NotificationOutbox.id).limit(limit).all()
+    
+    def has_pending_outbox_messages(self):
+        """Whether any message is still waiting for delivery (due now or later)"""
+        return self.session.query(NotificationOutbox.id).filter(
+            NotificationOutbox.status == 'pending'
+        ).first() is not None
+    
+    def mark_outbox_sent(self, message_ids):
+        """Mark delivered messages as sent in one statement"""
+        if not message_ids:
+            return
+        self.session.query(NotificationOutbox).filter(
+            NotificationOutbox.id.in_(message_ids)
+        ).update({
+            NotificationOutbox.status: 'sent',
+            NotificationOutbox.sent_at: datetime.now(),
+            NotificationOutbox.attempts: NotificationOutbox.attempts + 1
+        }, synchronize_session=False)
+        self.session.commit()
+    
+    def record_outbox_failure(self, message_id, error, next_attempt_at=None):
+        """Record a failed attempt; without next_attempt_at the message is dead-lettered"""
+        self.session.query(NotificationOutbox).filter(
+            NotificationOutbox.id == message_id
+        ).update({
+            NotificationOutbox.status: 'pending' if next_attempt_at else 'dead',
+            NotificationOutbox.next_attempt_at: next_attempt_at,
+            NotificationOutbox.last_error: str(error)[:1000],
+            NotificationOutbox.attempts: NotificationOutbox.attempts + 1
+        }, synchronize_session=False)
+        self.session.commit()
+    
+    def get_outbox_counts(self):
+        """Number of outbox messages per status"""
+        rows = self.session.query(
+            NotificationOutbox.status, func.count(NotificationOutbox.id)
+        ).group_by(NotificationOutbox.status).all()
+        return {status: count for status, count in rows}
+    
     # ========================
     # STATISTICS
     # ========================
@@ -301,15 +703,14 @@ class DatabaseManager:
     def get_daily_stats(self):
         """Get today's statistics"""
         today = datetime.now().date()
+        day_start, day_end = day_range(today)
         
         total_orders = self.session.query(Order).filter(
-            func.DATE(Order.created_at) == today
+            Order.created_at >= day_start,
+            Order.created_at < day_end
         ).count()
         
-        total_revenue = self.session.query(func.sum(Order.total_amount)).filter(
-            func.DATE(Order.created_at) == today,
-            Order.status == 'paid'
-        ).scalar() or 0
+        total_revenue = get_day_total(self.session, today)
         
         return {
             'total_orders': total_orders,
@@ -0,0 +1,191 @@
+"""
+Menu Cache - Process-wide immutable menu snapshot
+
+The customer menu is read on every rerun but changes a few times a day. The
+snapshot (restaurant info, active categories, available items) is loaded once
+and shared by all sessions until the menu version changes. The version is
+bumped after every committed ORM write to categories, menu items or the
+restaurant record; MENU_CACHE_TTL bounds staleness for writes made by other
+processes (or bulk SQL that bypasses the ORM - call bump_menu_version()).
+"""
+
+import os
+import threading
+import time
+from dataclasses import dataclass, field, make_dataclass
+from types import MappingProxyType
+from typing import Optional, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from database.models import Category, MenuItem, Restaurant
+from database.menu_index import MenuIndex
+
+
+# Column changes that do not affect what the menu shows
+_IGNORED_ITEM_CHANGES = {'order_count', 'rating', 'updated_at'}
+
+_menu_version = 0
+_version_lock = threading.Lock()
+
+
+def get_menu_version():
+    """Current menu version"""
+    return _menu_version
+
+
+def bump_menu_version():
+    """Invalidate cached menu snapshots"""
+    global _menu_version
+    with _version_lock:
+        _menu_version += 1
+    return _menu_version
+
+
+def _touches_menu(obj, is_dirty=False):
+    if isinstance(obj, (Category, Restaurant)):
+        return True
+    if isinstance(obj, MenuItem):
+        if not is_dirty:
+            return True
+        state = inspect(obj)
+        return any(
+            state.attrs[attr.key].history.has_changes()
+            for attr in state.mapper.column_attrs
+            if attr.key not in _IGNORED_ITEM_CHANGES
+        )
+    return False
+
+
+@event.listens_for(Session, "after_flush")
+def _track_menu_changes(session, flush_context):
+    if session.info.get('menu_changed'):
+        return
+    if any(_touches_menu(obj) for obj in session.new) or \
+       any(_touches_menu(obj) for obj in session.deleted) or \
+       any(_touches_menu(obj, is_dirty=True) for obj in session.dirty):
+        session.info['menu_changed'] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_on_commit(session):
+    if session.info.pop('menu_changed', False):
+        bump_menu_version()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session):
+    session.info.pop('menu_changed', None)
+
+
+# ========================
+# SNAPSHOT TYPES
+# ========================
+
+def _snapshot_type(name, model):
+    """Frozen dataclass with the same attribute names as the model's columns"""
+    columns = [column.key for column in inspect(model).column_attrs]
+    cls = make_dataclass(name, columns, frozen=True)
+    cls.from_model = classmethod(lambda cls, obj: cls(**{key: getattr(obj, key) for key in columns}))
+    return cls
+
+
+CategorySnapshot = _snapshot_type('CategorySnapshot', Category)
+MenuItemSnapshot = _snapshot_type('MenuItemSnapshot', MenuItem)
+RestaurantSnapshot = _snapshot_type('RestaurantSnapshot', Restaurant)
+
+
+@dataclass(frozen=True)
+class MenuSnapshot:
+    """Read-only menu for customer pages"""
+    version: int
+    loaded_at: float
+    restaurant: RestaurantSnapshot
+    categories: Tuple[CategorySnapshot, ...]  # Active, in display order
+    items: Tuple[MenuItemSnapshot, ...]  # Available items
+    _categories_by_id: MappingProxyType = field(init=False, repr=False, compare=False)
+    _items_by_category: MappingProxyType = field(init=False, repr=False, compare=False)
+    _index: Optional[MenuIndex] = field(init=False, default=None, repr=False, compare=False)
+    
+    def __post_init__(self):
+        by_category = {}
+        for item in self.items:
+            by_category.setdefault(item.category_id, []).append(item)
+        object.__setattr__(self, '_categories_by_id',
+                           MappingProxyType({cat.id: cat for cat in self.categories}))
+        object.__setattr__(self, '_items_by_category',
+                           MappingProxyType({cid: tuple(items) for cid, items in by_category.items()}))
+    
+    def category(self, category_id) -> Optional[CategorySnapshot]:
+        """Active category by id"""
+        return self._categories_by_id.get(category_id)
+    
+    def category_by_name(self, name) -> Optional[CategorySnapshot]:
+        """Active category by name"""
+        return next((cat for cat in self.categories if cat.name == name), None)
+    
+    def items_in_category(self, category_id) -> Tuple[MenuItemSnapshot, ...]:
+        """Available items of a category"""
+        return self._items_by_category.get(category_id, ())
+    
+    @property
+    def index(self) -> MenuIndex:
+        """Filter index over the available items (built on first use, once per version)"""
+        if self._index is None:
+            object.__setattr__(self, '_index', MenuIndex(self.items))
+        return self._index
+
+
+# ========================
+# CACHE
+# ========================
+
+_snapshot = None
+_snapshot_lock = threading.Lock()
+
+
+def _load_snapshot():
+    from database.db_manager import get_db
+    
+    db = get_db()
+    try:
+        # May create the default restaurant (a menu write) - take the version after it,
+        # but before categories/items so a write while loading triggers another reload
+        restaurant = db.get_restaurant_info()
+        version = _menu_version
+        return MenuSnapshot(
+            version=version,
+            loaded_at=time.monotonic(),
+            restaurant=RestaurantSnapshot.from_model(restaurant),
+            categories=tuple(CategorySnapshot.from_model(cat) for cat in db.get_all_categories()),
+            items=tuple(MenuItemSnapshot.from_model(item) for item in
+                        sorted(db.get_all_menu_items(), key=lambda item: item.id)),
+        )
+    finally:
+        db.close()
+
+
+def get_menu_snapshot() -> MenuSnapshot:
+    """Current menu snapshot (no SQL unless the menu changed or the TTL expired)"""
+    global _snapshot
+    
+    ttl = float(os.getenv('MENU_CACHE_TTL', '300'))
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.version == _menu_version and \
+       time.monotonic() - snapshot.loaded_at < ttl:
+        return snapshot
+    
+    with _snapshot_lock:
+        snapshot = _snapshot
+        if snapshot is None or snapshot.version != _menu_version or \
+           time.monotonic() - snapshot.loaded_at >= ttl:
+            snapshot = _snapshot = _load_snapshot()
+        return snapshot
+
+
+def clear_menu_cache():
+    """Drop the cached snapshot"""
+    global _snapshot
+    with _snapshot_lock:
+        _snapshot = None
@@ -0,0 +1,109 @@
+"""
+Menu Index - Precomputed filter index for menu browsing
+
+Built once per menu snapshot. Every item gets a bit position; boolean flags
+and categories are stored as int bitsets, and the items sorted by price give
+one prefix bitset per rank, so a max price filter is a bisect plus a lookup.
+Any combination of filters is then a handful of integer ANDs; search terms
+are matched against text folded once and cached as bitsets too.
+"""
+
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence
+
+from database.search import turkish_fold
+
+
+def _positions(mask):
+    """Positions of the set bits, lowest first"""
+    bits = bin(mask)[:1:-1]
+    position = bits.find('1')
+    while position != -1:
+        yield position
+        position = bits.find('1', position + 1)
+
+
+class MenuIndex:
+    """Bitset index over a fixed sequence of menu items"""
+    
+    FLAGS = ('is_vegetarian', 'is_vegan', 'is_spicy')
+    SEARCH_CACHE_SIZE = 128
+    
+    def __init__(self, items: Sequence):
+        self.items = tuple(items)
+        self.all_mask = (1 << len(self.items)) - 1
+        
+        # Boolean flags and categories
+        self.flag_masks: Dict[str, int] = {flag: 0 for flag in self.FLAGS}
+        self.category_masks: Dict[int, int] = {}
+        for position, item in enumerate(self.items):
+            bit = 1 << position
+            for flag in self.FLAGS:
+                if getattr(item, flag):
+                    self.flag_masks[flag] |= bit
+            self.category_masks[item.category_id] = self.category_masks.get(item.category_id, 0) | bit
+        
+        # Price ranks: price_masks[k] has the bits of the k cheapest items
+        by_price = sorted(range(len(self.items)), key=lambda position: self.items[position].price)
+        self.sorted_prices = [self.items[position].price for position in by_price]
+        self.price_masks = [0]
+        for position in by_price:
+            self.price_masks.append(self.price_masks[-1] | (1 << position))
+        
+        # Search text, folded once instead of on every keystroke (Turkish casing, no diacritics)
+        self.search_text = [
+            f"{turkish_fold(item.name)}\n{turkish_fold(item.description)}" for item in self.items
+        ]
+        # Search term -> bitset, oldest first; reruns keep the same term while other widgets change.
+        # The index is shared by all sessions, so the cache is only touched under the lock.
+        self._search_masks = OrderedDict()
+        self._search_lock = threading.Lock()
+    
+    def max_price_mask(self, max_price):
+        """Items priced at or below max_price"""
+        return self.price_masks[bisect_right(self.sorted_prices, max_price)]
+    
+    def mask(self, category_id: Optional[int] = None, vegetarian=False, vegan=False, spicy=False,
+             max_price=None) -> int:
+        """Bitset of the items matching the structured filters"""
+        mask = self.all_mask
+        if category_id is not None:
+            mask &= self.category_masks.get(category_id, 0)
+        if vegetarian:
+            mask &= self.flag_masks['is_vegetarian']
+        if vegan:
+            mask &= self.flag_masks['is_vegan']
+        if spicy:
+            mask &= self.flag_masks['is_spicy']
+        if max_price is not None:
+            mask &= self.max_price_mask(max_price)
+        return mask
+    
+    def search_mask(self, search):
+        """Items whose name or description contains search (case and diacritic insensitive)"""
+        search_lower = turkish_fold(search)
+        with self._search_lock:
+            mask = self._search_masks.get(search_lower)
+        if mask is None:
+            # A single-line search term cannot match across the name/description separator
+            mask = 0
+            for position, text in enumerate(self.search_text):
+                if search_lower in text:
+                    mask |= 1 << position
+            with self._search_lock:
+                self._search_masks[search_lower] = mask
+                while len(self._search_masks) > self.SEARCH_CACHE_SIZE:
+                    self._search_masks.popitem(last=False)
+        return mask
+    
+    def filter(self, category_id: Optional[int] = None, vegetarian=False, vegan=False, spicy=False,
+               max_price=None, search=None) -> List:
+        """Matching items in their original order"""
+        mask = self.mask(category_id, vegetarian, vegan, spicy, max_price)
+        if search:
+            mask &= self.search_mask(search)
+        if mask == self.all_mask:
+            return list(self.items)
+        return [self.items[position] for position in _positions(mask)]
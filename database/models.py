@@ -3,11 +3,15 @@ Database models for QR Menu AI System
 Using SQLAlchemy ORM for database operations
 """
 
-from sqlalchemy import create_engine, Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import create_engine, event, exc, inspect, Column, Integer, String, Float, Boolean, Date, DateTime, ForeignKey, Text, Index
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship, sessionmaker
+from sqlalchemy.pool import QueuePool
 from datetime import datetime
 import os
+import threading
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -128,10 +132,27 @@ class Order(Base):
     prepared_at = Column(DateTime)
     served_at = Column(DateTime)
     paid_at = Column(DateTime)
+    updated_at = Column(DateTime, default=datetime.now, onupdate=datetime.now)  # Change token for live views
     
     # Relationships
     table = relationship("Table", back_populates="orders")
     items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        Index('ix_orders_created_at', 'created_at'),
+        Index('ix_orders_status_created_at', 'status', 'created_at'),
+        Index('ix_orders_table_id_created_at', 'table_id', 'created_at'),
+        Index('ix_orders_session_id', 'session_id'),
+        Index('ix_orders_updated_at', 'updated_at'),
+    )
+
+
+class OrderSequence(Base):
+    """Per-day order number counter (ORD-YYYYMMDD-NNN)"""
+    __tablename__ = 'order_sequences'
+    
+    seq_date = Column(String(8), primary_key=True)  # 20250106
+    last_value = Column(Integer, nullable=False, default=0)
 
 
 class OrderItem(Base):
@@ -154,6 +175,11 @@ class OrderItem(Base):
     # Relationships
     order = relationship("Order", back_populates="items")
     menu_item = relationship("MenuItem", back_populates="order_items")
+    
+    __table_args__ = (
+        Index('ix_order_items_order_id', 'order_id'),
+        Index('ix_order_items_menu_item_id', 'menu_item_id'),
+    )
 
 
 # ========================
@@ -229,29 +255,327 @@ class ChatHistory(Base):
     recommended_items = Column(String(500))  # JSON array of item IDs
     
     created_at = Column(DateTime, default=datetime.now)
+    
+    __table_args__ = (
+        Index('ix_chat_history_session_id_created_at', 'session_id', 'created_at'),
+    )
+
+
+class Notification(Base):
+    """Staff notifications (new orders, status changes, table calls...)"""
+    __tablename__ = 'notifications'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    type = Column(String(30), nullable=False)  # new_order, status_change, low_stock, table_call
+    title = Column(String(200), nullable=False)
+    message = Column(Text)
+    priority = Column(String(10), default='low')  # low, medium, high
+    
+    # Optional references
+    order_id = Column(Integer)
+    table_number = Column(Integer)
+    
+    is_read = Column(Boolean, default=False, nullable=False)
+    created_at = Column(DateTime, default=datetime.now)
+    read_at = Column(DateTime)
+    
+    __table_args__ = (
+        Index('ix_notifications_is_read_id', 'is_read', 'id'),
+    )
+
+
+class NotificationOutbox(Base):
+    """Outgoing email/SMS messages, delivered by the background outbox worker"""
+    __tablename__ = 'notification_outbox'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    channel = Column(String(10), nullable=False)  # email, sms
+    recipient = Column(String(200))
+    subject = Column(String(300))
+    body = Column(Text, nullable=False)
+    
+    # Delivery state
+    status = Column(String(10), default='pending', nullable=False)  # pending, sent, dead
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime, default=datetime.now)
+    last_error = Column(Text)
+    
+    created_at = Column(DateTime, default=datetime.now)
+    sent_at = Column(DateTime)
+    
+    __table_args__ = (
+        Index('ix_notification_outbox_status_next_attempt_at', 'status', 'next_attempt_at'),
+    )
+
+
+# ========================
+# ANALYTICS
+# ========================
+
+class DailyRollup(Base):
+    """
+    Pre-aggregated sales per day and dimension, for paid and cancelled orders
+    
+    Maintained by database.rollups when an order is paid or cancelled (rebuild
+    with backfill_rollups.py). Rows are bucketed by the order's created_at day.
+    Dimensions: day (dimension_id 0), hour (0-23), table (table id),
+    item (menu item id), category (category id).
+    """
+    __tablename__ = 'daily_rollups'
+    
+    dimension = Column(String(10), primary_key=True)
+    day = Column(Date, primary_key=True)
+    dimension_id = Column(Integer, primary_key=True)
+    status = Column(String(20), primary_key=True)  # paid, cancelled
+    
+    orders = Column(Integer, nullable=False, default=0)  # Orders (containing the item/category)
+    amount = Column(Float, nullable=False, default=0.0)  # Order totals, or item subtotals for item/category
+    quantity = Column(Integer, nullable=False, default=0)  # Item units
 
 
 # ========================
 # DATABASE UTILITIES
 # ========================
 
+class PoolMetrics:
+    """Process-wide connection pool counters (checkouts, waits, timeouts)"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        """Reset all counters"""
+        with self._lock:
+            self.connects = 0
+            self.checkouts = 0
+            self.checkins = 0
+            self.invalidations = 0
+            self.timeouts = 0
+            self.max_checked_out = 0
+            self.total_wait = 0.0
+            self.max_wait = 0.0
+    
+    def record_wait(self, seconds):
+        """Record time spent waiting for a pooled connection"""
+        with self._lock:
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+    
+    def record_timeout(self):
+        """Record a checkout that gave up waiting for a connection"""
+        with self._lock:
+            self.timeouts += 1
+    
+    def record_checkout(self, checked_out):
+        """Record a connection checkout and the current number in use"""
+        with self._lock:
+            self.checkouts += 1
+            self.max_checked_out = max(self.max_checked_out, checked_out)
+    
+    def snapshot(self):
+        """Get a copy of the counters as a dict"""
+        with self._lock:
+            return {
+                'connects': self.connects,
+                'checkouts': self.checkouts,
+                'checkins': self.checkins,
+                'invalidations': self.invalidations,
+                'timeouts': self.timeouts,
+                'max_checked_out': self.max_checked_out,
+                'total_wait_ms': round(self.total_wait * 1000, 3),
+                'avg_wait_ms': round(self.total_wait * 1000 / self.checkouts, 3) if self.checkouts else 0.0,
+                'max_wait_ms': round(self.max_wait * 1000, 3),
+            }
+
+
+_pool_metrics = PoolMetrics()
+_engine = None
+_session_factory = None
+_engine_lock = threading.Lock()
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection"""
+    
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            _pool_metrics.record_timeout()
+            raise
+        finally:
+            _pool_metrics.record_wait(time.perf_counter() - start)
+
+
+def _env_flag(name, default):
+    """Read a true/false environment variable"""
+    return os.getenv(name, default).lower() in ('1', 'true', 'yes')
+
+
+def _register_pool_events(engine):
+    """Attach metric counters to the engine's pool"""
+    
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        with _pool_metrics._lock:
+            _pool_metrics.connects += 1
+    
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        checked_out = engine.pool.checkedout() if hasattr(engine.pool, 'checkedout') else 0
+        _pool_metrics.record_checkout(checked_out)
+    
+    @event.listens_for(engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        with _pool_metrics._lock:
+            _pool_metrics.checkins += 1
+    
+    @event.listens_for(engine, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        with _pool_metrics._lock:
+            _pool_metrics.invalidations += 1
+
+
+def _register_sqlite_pragmas(engine, use_wal):
+    """Apply WAL / busy timeout pragmas on every new SQLite connection"""
+    busy_timeout = int(os.getenv('SQLITE_BUSY_TIMEOUT', '5000'))
+    
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA busy_timeout={busy_timeout}")
+        if use_wal:
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
+
+
+def create_configured_engine(db_url=None):
+    """
+    Create a pooled database engine configured from environment variables
+    
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING, SQLITE_WAL, SQLITE_BUSY_TIMEOUT
+    """
+    db_url = db_url or os.getenv('DATABASE_URL', 'sqlite:///./restaurant.db')
+    url = make_url(db_url)
+    is_sqlite = url.get_backend_name() == 'sqlite'
+    in_memory = is_sqlite and url.database in (None, '', ':memory:')
+    
+    kwargs = {'echo': False}
+    if in_memory:
+        # In-memory SQLite lives inside a single connection - keep SQLAlchemy's default pool
+        kwargs['connect_args'] = {'check_same_thread': False}
+    else:
+        kwargs.update(
+            poolclass=TimedQueuePool,
+            pool_size=int(os.getenv('DB_POOL_SIZE', '5')),
+            max_overflow=int(os.getenv('DB_MAX_OVERFLOW', '10')),
+            pool_timeout=float(os.getenv('DB_POOL_TIMEOUT', '30')),
+            pool_recycle=int(os.getenv('DB_POOL_RECYCLE', '1800')),
+            pool_pre_ping=_env_flag('DB_POOL_PRE_PING', 'true'),
+        )
+        if is_sqlite:
+            # Streamlit serves each session from its own thread
+            kwargs['connect_args'] = {'check_same_thread': False}
+    
+    engine = create_engine(db_url, **kwargs)
+    
+    if is_sqlite:
+        _register_sqlite_pragmas(engine, use_wal=not in_memory and _env_flag('SQLITE_WAL', 'true'))
+    _register_pool_events(engine)
+    return engine
+
+
 def get_engine():
-    """Create database engine"""
-    db_url = os.getenv('DATABASE_URL', 'sqlite:///./restaurant.db')
-    return create_engine(db_url, echo=False)
+    """Get the shared, process-wide database engine"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = create_configured_engine()
+    return _engine
+
+
+def get_session_factory():
+    """Get the shared sessionmaker bound to the process-wide engine"""
+    global _session_factory
+    if _session_factory is None:
+        engine = get_engine()
+        with _engine_lock:
+            if _session_factory is None:
+                _session_factory = sessionmaker(bind=engine)
+    return _session_factory
 
 
 def get_session():
     """Get database session"""
-    engine = get_engine()
-    Session = sessionmaker(bind=engine)
-    return Session()
+    return get_session_factory()()
+
+
+def get_pool_metrics():
+    """Get connection pool status and checkout metrics"""
+    metrics = _pool_metrics.snapshot()
+    pool = get_engine().pool
+    if isinstance(pool, QueuePool):
+        metrics.update({
+            'pool_size': pool.size(),
+            'checked_in': pool.checkedin(),
+            'checked_out': pool.checkedout(),
+            'overflow': pool.overflow(),
+        })
+    metrics['status'] = pool.status()
+    return metrics
+
+
+def dispose_engine():
+    """Dispose the shared engine so the next call re-reads DATABASE_URL"""
+    global _engine, _session_factory
+    with _engine_lock:
+        if _engine is not None:
+            _engine.dispose()
+        _engine = None
+        _session_factory = None
+    _pool_metrics.reset()
+
+
+def create_missing_indexes(engine=None):
+    """Create indexes declared on the models that don't exist yet (create_all skips existing tables)"""
+    engine = engine or get_engine()
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    created = []
+    
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {ix['name'] for ix in inspector.get_indexes(table.name)}
+        columns = {column['name'] for column in inspector.get_columns(table.name)}
+        for index in table.indexes:
+            # Columns added by a migration script that hasn't run yet
+            if index.name in existing or not {column.name for column in index.columns} <= columns:
+                continue
+            index.create(engine)
+            created.append(index.name)
+    
+    return created
 
 
 def init_db():
     """Initialize database - create all tables"""
     engine = get_engine()
     Base.metadata.create_all(engine)
+    create_missing_indexes(engine)
+    
+    # Existing orders are rolled up once into the (new or empty) daily_rollups table
+    from database.rollups import ensure_rollups
+    ensure_rollups()
+    
+    # Full-text search table for menu items (SQLite FTS5)
+    from database.search import ensure_search_index
+    ensure_search_index(engine)
     print("✅ Database tables created successfully!")
 
 
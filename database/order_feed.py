@@ -0,0 +1,114 @@
+"""
+Order Feed - Process-wide new order detection shared by all admin tabs
+
+One poller reads new orders by primary key (id > last seen id) at most once
+per ORDER_FEED_POLL_INTERVAL seconds and keeps the recent events in a bounded
+buffer. Each admin tab only keeps a cursor into that buffer, so ten open tabs
+cost the database one indexed range read per interval instead of ten scans.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+
+from database.db_manager import get_db
+
+
+class OrderFeed:
+    """In-process change feed of newly created orders"""
+    
+    def __init__(self, poll_interval=None, buffer_size=None, lookback=None):
+        self.poll_interval = float(poll_interval if poll_interval is not None
+                                   else os.getenv('ORDER_FEED_POLL_INTERVAL', '2'))
+        self.buffer_size = int(buffer_size or os.getenv('ORDER_FEED_BUFFER', '500'))
+        # Re-read this many ids below the high-water mark so an order whose
+        # transaction committed after a higher id was seen is not skipped
+        self.lookback = int(lookback if lookback is not None else os.getenv('ORDER_FEED_LOOKBACK', '50'))
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self):
+        """Forget all state (start over from the current end of the orders table)"""
+        self._events = deque(maxlen=self.buffer_size)
+        self._seen_ids = set()
+        self._sequence = 0
+        self._max_id = None
+        self._last_poll = 0.0
+    
+    def _fetch(self, after_id):
+        db = get_db()
+        try:
+            return db.get_orders_after_id(after_id, limit=self.buffer_size)
+        finally:
+            db.close()
+    
+    def poll(self, force=False):
+        """Read new orders from the database unless another caller did so recently"""
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._last_poll < self.poll_interval:
+                return
+            self._last_poll = now
+            
+            if self._max_id is None:
+                # First poll: existing orders are history, not news
+                db = get_db()
+                try:
+                    self._max_id = db.get_latest_order_id()
+                finally:
+                    db.close()
+                floor = max(self._max_id - self.lookback, 0)
+                self._seen_ids = {row.id for row in self._fetch(floor)}
+                return
+            
+            floor = max(self._max_id - self.lookback, 0)
+            for row in self._fetch(floor):
+                if row.id not in self._seen_ids:
+                    self._record(row)
+            
+            # Ids at or below the lookback window are not expected to show up late anymore
+            floor = max(self._max_id - self.lookback, 0)
+            self._seen_ids = {order_id for order_id in self._seen_ids if order_id > floor}
+    
+    def _record(self, row):
+        self._sequence += 1
+        self._seen_ids.add(row.id)
+        self._max_id = max(self._max_id, row.id)
+        self._events.append({
+            'seq': self._sequence,
+            'order_id': row.id,
+            'order_number': row.order_number,
+            'table_number': row.table_number,
+            'total_amount': row.total_amount,
+            'created_at': row.created_at,
+        })
+    
+    def latest_cursor(self):
+        """Cursor for a new subscriber - only orders after this point are delivered"""
+        self.poll()
+        with self._lock:
+            return self._sequence
+    
+    def changes_since(self, cursor):
+        """Return (new order events after cursor, new cursor)"""
+        self.poll()
+        with self._lock:
+            events = [event for event in self._events if event['seq'] > cursor]
+            return events, self._sequence
+
+
+# Global order feed instance
+_order_feed = None
+_order_feed_lock = threading.Lock()
+
+def get_order_feed() -> OrderFeed:
+    """Get or create the process-wide order feed"""
+    global _order_feed
+    
+    if _order_feed is None:
+        with _order_feed_lock:
+            if _order_feed is None:
+                _order_feed = OrderFeed()
+    
+    return _order_feed
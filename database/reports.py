@@ -0,0 +1,154 @@
+"""
+Reports - SQL-aggregated sales figures for the Reports page
+
+The sales report used to load every Order in the date range and count in
+Python; a 90-day range meant tens of thousands of ORM objects per rerun.
+Here the database does the counting: one GROUP BY (day, status) query over
+the created_at index returns at most days x statuses rows, and the totals,
+status counts and daily breakdown are derived from that small DataFrame.
+
+Product, category, table and hourly figures (paid orders) are read from the daily
+rollups (database.rollups) instead of the order items.
+"""
+
+from typing import Optional
+
+import pandas as pd
+from sqlalchemy import func
+
+from database.db_manager import day_range
+from database.models import Category, MenuItem, Order, Table
+from database.rollups import get_rollup_totals
+
+
+SALES_COLUMNS = ['date', 'status', 'orders', 'revenue']
+PRODUCT_COLUMNS = ['item_id', 'name', 'price', 'order_count', 'total_quantity', 'total_revenue']
+CATEGORY_COLUMNS = ['category_id', 'name', 'order_count', 'total_quantity', 'total_revenue']
+HOURLY_COLUMNS = ['hour', 'orders', 'revenue']
+TABLE_COLUMNS = ['table_id', 'table_number', 'orders', 'total_quantity', 'revenue']
+
+
+def sales_by_day_and_status(session, start_date, end_date) -> pd.DataFrame:
+    """
+    Order count and order total per (day, status) in the date range
+
+    Returns:
+        DataFrame with columns date (datetime.date), status, orders (int), revenue (float)
+    """
+    range_start, range_end = day_range(start_date, end_date)
+    day = func.date(Order.created_at)
+    rows = session.query(
+        day.label('date'),
+        Order.status,
+        func.count(Order.id).label('orders'),
+        func.coalesce(func.sum(Order.total_amount), 0.0).label('revenue')
+    ).filter(
+        Order.created_at >= range_start,
+        Order.created_at < range_end
+    ).group_by(
+        day, Order.status
+    ).order_by(
+        day
+    ).all()
+    
+    df = pd.DataFrame(rows, columns=SALES_COLUMNS)
+    # SQLite returns DATE() as text, other databases as date
+    df['date'] = pd.to_datetime(df['date']).dt.date
+    df['orders'] = df['orders'].astype(int)
+    df['revenue'] = df['revenue'].astype(float)
+    return df
+
+
+def get_sales_report(session, start_date, end_date) -> Optional[dict]:
+    """
+    Sales report for a date range (revenue counts paid orders only)
+
+    Returns:
+        None if there are no orders, else a dict with total_orders,
+        total_revenue, avg_order_value, status_counts (DataFrame: status,
+        orders) and daily (DataFrame: date, orders, revenue)
+    """
+    by_day_status = sales_by_day_and_status(session, start_date, end_date)
+    if by_day_status.empty:
+        return None
+    
+    paid_revenue = by_day_status['revenue'].where(by_day_status['status'] == 'paid', 0.0)
+    daily = by_day_status.assign(revenue=paid_revenue).groupby('date', as_index=False)[['orders', 'revenue']].sum()
+    status_counts = by_day_status.groupby('status', as_index=False)['orders'].sum()
+    
+    total_orders = int(daily['orders'].sum())
+    total_revenue = float(daily['revenue'].sum())
+    return {
+        'total_orders': total_orders,
+        'total_revenue': total_revenue,
+        'avg_order_value': total_revenue / total_orders if total_orders > 0 else 0,
+        'status_counts': status_counts,
+        'daily': daily,
+    }
+
+
+def _with_names(session, totals, model, columns):
+    """Rollup totals joined with the names (and other columns) of their rows in model"""
+    ids = totals['dimension_id'].tolist()
+    names = pd.DataFrame(
+        session.query(model.id, *columns).filter(model.id.in_(ids)).all() if ids else [],
+        columns=['dimension_id'] + [column.key for column in columns]
+    )
+    return totals.merge(names, on='dimension_id', how='left')
+
+
+def get_product_report(session, start_date, end_date) -> pd.DataFrame:
+    """
+    Paid sales per menu item in the date range, best selling first
+
+    Returns:
+        DataFrame with columns item_id, name, price, order_count, total_quantity, total_revenue
+    """
+    totals = get_rollup_totals(session, 'item', start_date, end_date)
+    df = _with_names(session, totals, MenuItem, [MenuItem.name, MenuItem.price])
+    df = df.rename(columns={
+        'dimension_id': 'item_id', 'orders': 'order_count',
+        'quantity': 'total_quantity', 'amount': 'total_revenue'
+    })
+    return df[PRODUCT_COLUMNS]
+
+
+def get_category_report(session, start_date, end_date) -> pd.DataFrame:
+    """
+    Paid sales per category in the date range, largest revenue first
+
+    Returns:
+        DataFrame with columns category_id, name, order_count, total_quantity, total_revenue
+    """
+    totals = get_rollup_totals(session, 'category', start_date, end_date)
+    df = _with_names(session, totals, Category, [Category.name])
+    df = df.rename(columns={
+        'dimension_id': 'category_id', 'orders': 'order_count',
+        'quantity': 'total_quantity', 'amount': 'total_revenue'
+    })
+    return df[CATEGORY_COLUMNS]
+
+
+def get_hourly_report(session, start_date, end_date) -> pd.DataFrame:
+    """
+    Paid orders and revenue per hour of day (0-23) over the date range
+
+    Returns:
+        DataFrame with columns hour, orders, revenue (hours with sales only, in order)
+    """
+    totals = get_rollup_totals(session, 'hour', start_date, end_date)
+    df = totals.rename(columns={'dimension_id': 'hour', 'amount': 'revenue'})
+    return df[HOURLY_COLUMNS].sort_values('hour', ignore_index=True)
+
+
+def get_table_report(session, start_date, end_date) -> pd.DataFrame:
+    """
+    Paid orders and revenue per table in the date range, largest revenue first
+
+    Returns:
+        DataFrame with columns table_id, table_number, orders, total_quantity, revenue
+    """
+    totals = get_rollup_totals(session, 'table', start_date, end_date)
+    df = _with_names(session, totals, Table, [Table.table_number])
+    df = df.rename(columns={'dimension_id': 'table_id', 'quantity': 'total_quantity', 'amount': 'revenue'})
+    return df[TABLE_COLUMNS]
@@ -0,0 +1,294 @@
+"""
+Rollups - Daily sales aggregates maintained as orders are paid or cancelled
+
+Reports over months used to re-derive revenue from every order and order
+item. daily_rollups keeps one row per (dimension, day, dimension id, status)
+instead, so a 90-day product report reads a few thousand small rows.
+
+Rows are updated in the same transaction as the status change: an order
+moving into paid/cancelled adds its figures, an order moving out of them
+(a correction in the admin dashboard) subtracts them again. Orders are
+bucketed by their created_at day, like the other reports.
+
+Databases that had orders before this table existed are backfilled
+automatically the first time the rollups are read or updated (ensure_rollups); rows
+changed with bulk SQL are rebuilt from the order history with
+backfill_rollups.py.
+"""
+
+import threading
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict
+
+import pandas as pd
+from sqlalchemy import extract, func, update
+
+from database.models import DailyRollup, MenuItem, Order, OrderItem, get_engine, get_session
+
+
+ROLLUP_STATUSES = ('paid', 'cancelled')
+DIMENSIONS = ('day', 'hour', 'table', 'item', 'category')
+
+ROLLUP_COLUMNS = ['dimension_id', 'orders', 'amount', 'quantity']
+
+# Databases (by URL) whose rollup table was checked in this process
+_ready_databases = set()
+_ready_lock = threading.Lock()
+
+
+def _as_date(value):
+    # SQLite returns DATE() as text
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _order_contributions(session, order):
+    """{(dimension, dimension_id): (orders, amount, quantity)} for one order"""
+    lines = session.query(
+        OrderItem.menu_item_id,
+        MenuItem.category_id,
+        func.sum(OrderItem.quantity),
+        func.sum(OrderItem.subtotal)
+    ).join(
+        MenuItem, OrderItem.menu_item_id == MenuItem.id
+    ).filter(
+        OrderItem.order_id == order.id
+    ).group_by(
+        OrderItem.menu_item_id, MenuItem.category_id
+    ).all()
+    
+    units = sum(quantity or 0 for _, _, quantity, _ in lines)
+    contributions = {
+        ('day', 0): (1, order.total_amount or 0.0, units),
+        ('hour', order.created_at.hour): (1, order.total_amount or 0.0, units),
+        ('table', order.table_id): (1, order.total_amount or 0.0, units),
+    }
+    categories = defaultdict(lambda: [0.0, 0])
+    for menu_item_id, category_id, quantity, subtotal in lines:
+        contributions[('item', menu_item_id)] = (1, subtotal or 0.0, quantity or 0)
+        categories[category_id][0] += subtotal or 0.0
+        categories[category_id][1] += quantity or 0
+    for category_id, (subtotal, quantity) in categories.items():
+        contributions[('category', category_id)] = (1, subtotal, quantity)
+    return contributions
+
+
+def _bump(session, dimension, day, dimension_id, status, orders, amount, quantity):
+    """Add to one rollup row, creating it if needed"""
+    bumped = session.execute(
+        update(DailyRollup)
+        .where(
+            DailyRollup.dimension == dimension,
+            DailyRollup.day == day,
+            DailyRollup.dimension_id == dimension_id,
+            DailyRollup.status == status
+        )
+        .values(
+            orders=DailyRollup.orders + orders,
+            amount=DailyRollup.amount + amount,
+            quantity=DailyRollup.quantity + quantity
+        )
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    
+    if not bumped:
+        # A concurrent insert of the same row surfaces as IntegrityError and is retried
+        session.add(DailyRollup(
+            dimension=dimension, day=day, dimension_id=dimension_id, status=status,
+            orders=orders, amount=amount, quantity=quantity
+        ))
+        session.flush()
+
+
+def record_status_change(session, order, old_status, new_status):
+    """
+    Move an order's figures between rollup statuses (call before committing the change)
+
+    Only paid and cancelled orders are rolled up; other transitions are no-ops.
+    Call ensure_rollups() first, outside the session's transaction.
+    """
+    if old_status == new_status:
+        return
+    signs = {}
+    if old_status in ROLLUP_STATUSES:
+        signs[old_status] = -1
+    if new_status in ROLLUP_STATUSES:
+        signs[new_status] = 1
+    if not signs:
+        return
+    
+    day = order.created_at.date()
+    contributions = _order_contributions(session, order)
+    for status, sign in signs.items():
+        for (dimension, dimension_id), (orders, amount, quantity) in contributions.items():
+            _bump(session, dimension, day, dimension_id, status,
+                  sign * orders, sign * amount, sign * quantity)
+
+
+# ========================
+# BACKFILL
+# ========================
+
+def _aggregate_history(session, range_start, range_end):
+    """Rollup rows computed from orders and order items with GROUP BY queries"""
+    order_filters = [Order.status.in_(ROLLUP_STATUSES)]
+    if range_start is not None:
+        order_filters += [Order.created_at >= range_start, Order.created_at < range_end]
+    day = func.date(Order.created_at)
+    
+    # Item units per order, for the order-level dimensions
+    units = session.query(
+        OrderItem.order_id.label('order_id'),
+        func.sum(OrderItem.quantity).label('units')
+    ).group_by(OrderItem.order_id).subquery()
+    
+    order_dimensions = {
+        'day': None,
+        'hour': extract('hour', Order.created_at),
+        'table': Order.table_id,
+    }
+    for dimension, key in order_dimensions.items():
+        columns = [day, Order.status] + ([key] if key is not None else [])
+        rows = session.query(
+            *columns,
+            func.count(Order.id),
+            func.coalesce(func.sum(Order.total_amount), 0.0),
+            func.coalesce(func.sum(units.c.units), 0)
+        ).outerjoin(
+            units, units.c.order_id == Order.id
+        ).filter(*order_filters).group_by(*columns).all()
+        for row in rows:
+            dimension_id = int(row[2]) if key is not None else 0
+            yield (dimension, _as_date(row[0]), dimension_id, row[1]) + tuple(row[-3:])
+    
+    line_dimensions = {
+        'item': OrderItem.menu_item_id,
+        'category': MenuItem.category_id,
+    }
+    for dimension, key in line_dimensions.items():
+        rows = session.query(
+            day, Order.status, key,
+            func.count(func.distinct(Order.id)),
+            func.coalesce(func.sum(OrderItem.subtotal), 0.0),
+            func.coalesce(func.sum(OrderItem.quantity), 0)
+        ).join(
+            OrderItem, OrderItem.order_id == Order.id
+        ).join(
+            MenuItem, OrderItem.menu_item_id == MenuItem.id
+        ).filter(*order_filters).group_by(day, Order.status, key).all()
+        for row in rows:
+            yield (dimension, _as_date(row[0]), row[2], row[1]) + tuple(row[3:])
+
+
+def backfill_rollups(session, start_date=None, end_date=None) -> Dict[str, int]:
+    """
+    Rebuild the rollups from the order history (all days, or start_date..end_date)
+
+    Replaces the existing rows for those days in one transaction and commits.
+
+    Returns:
+        Number of rollup rows written per dimension
+    """
+    from database.db_manager import day_range
+    
+    range_start = range_end = None
+    delete = session.query(DailyRollup)
+    if start_date is not None:
+        end_date = end_date or datetime.now().date()
+        range_start, range_end = day_range(start_date, end_date)
+        delete = delete.filter(DailyRollup.day >= start_date, DailyRollup.day <= end_date)
+    delete.delete(synchronize_session=False)
+    
+    written = {dimension: 0 for dimension in DIMENSIONS}
+    rows = []
+    for dimension, day, dimension_id, status, orders, amount, quantity in \
+            _aggregate_history(session, range_start, range_end):
+        rows.append({
+            'dimension': dimension, 'day': day, 'dimension_id': dimension_id, 'status': status,
+            'orders': int(orders), 'amount': float(amount), 'quantity': int(quantity)
+        })
+        written[dimension] += 1
+    if rows:
+        session.bulk_insert_mappings(DailyRollup, rows)
+    session.commit()
+    return written
+
+
+def ensure_rollups() -> bool:
+    """
+    Create daily_rollups if missing and backfill it when it is empty but orders exist
+
+    Checked once per database per process (init_db, the first rollup query and
+    the first status change).
+
+    Returns:
+        True if the rollups were backfilled
+    """
+    engine = get_engine()
+    url = str(engine.url)
+    if url in _ready_databases:
+        return False
+    
+    with _ready_lock:
+        if url in _ready_databases:
+            return False
+        DailyRollup.__table__.create(engine, checkfirst=True)
+        
+        session = get_session()
+        try:
+            backfill = session.query(DailyRollup.day).first() is None and session.query(Order.id).filter(
+                Order.status.in_(ROLLUP_STATUSES)
+            ).first() is not None
+            if backfill:
+                backfill_rollups(session)
+        finally:
+            session.close()
+        
+        _ready_databases.add(url)
+        return backfill
+
+
+# ========================
+# QUERIES
+# ========================
+
+def get_rollup_totals(session, dimension, start_date, end_date, status='paid') -> pd.DataFrame:
+    """
+    Rollup figures summed over a date range, one row per dimension id
+
+    Returns:
+        DataFrame with columns dimension_id, orders, amount, quantity (largest amount first)
+    """
+    ensure_rollups()
+    rows = session.query(
+        DailyRollup.dimension_id,
+        func.sum(DailyRollup.orders),
+        func.sum(DailyRollup.amount),
+        func.sum(DailyRollup.quantity)
+    ).filter(
+        DailyRollup.dimension == dimension,
+        DailyRollup.day >= start_date,
+        DailyRollup.day <= end_date,
+        DailyRollup.status == status
+    ).group_by(
+        DailyRollup.dimension_id
+    ).having(
+        func.sum(DailyRollup.orders) > 0
+    ).order_by(
+        func.sum(DailyRollup.amount).desc()
+    ).all()
+    
+    df = pd.DataFrame(rows, columns=ROLLUP_COLUMNS)
+    return df.astype({'dimension_id': int, 'orders': int, 'amount': float, 'quantity': int})
+
+
+def get_day_total(session, day: date, status='paid') -> float:
+    """Rolled-up order total for one day (0.0 if there are no orders)"""
+    ensure_rollups()
+    amount = session.query(DailyRollup.amount).filter(
+        DailyRollup.dimension == 'day',
+        DailyRollup.day == day,
+        DailyRollup.dimension_id == 0,
+        DailyRollup.status == status
+    ).scalar()
+    return amount or 0.0
@@ -0,0 +1,228 @@
+"""
+Menu Search - Turkish-aware full-text search over menu items
+
+SQLite: an FTS5 table (menu_items_fts, rowid = menu_items.id) holding folded
+copies of name, name_en, description, description_en and ingredients, kept in
+sync by mapper events on MenuItem and ranked with bm25 (name weighs most).
+PostgreSQL: to_tsvector/to_tsquery ('simple' config) with ts_rank.
+Other databases, or SQLite builds without FTS5, fall back to an in-memory scan
+with the same folding rules.
+
+Folding lowercases with Turkish rules (I -> ı, İ -> i) and then drops
+diacritics, so "ISPANAK", "Ispanaklı" and "ıspanak" all match "ispanak",
+and "sis" finds "Şiş".
+"""
+
+import re
+import unicodedata
+from typing import List, Optional
+
+from sqlalchemy import event, inspect, text, func, literal_column
+from sqlalchemy.exc import OperationalError
+
+from database.models import MenuItem, get_engine
+
+
+FTS_TABLE = 'menu_items_fts'
+SEARCH_COLUMNS = ('name', 'name_en', 'description', 'description_en', 'ingredients')
+# bm25 weights, in SEARCH_COLUMNS order
+COLUMN_WEIGHTS = (10.0, 8.0, 3.0, 3.0, 1.0)
+
+_TURKISH_UPPER = str.maketrans({'I': 'ı', 'İ': 'i'})
+_TURKISH_LETTERS = str.maketrans({'ı': 'i', 'ç': 'c', 'ğ': 'g', 'ö': 'o', 'ş': 's', 'ü': 'u'})
+_TOKEN = re.compile(r'\w+')
+
+
+def turkish_fold(value: Optional[str]) -> str:
+    """Lowercase with Turkish casing rules and strip diacritics"""
+    if not value or not isinstance(value, str):
+        # None, or NaN from pandas-loaded seed data
+        return ''
+    folded = value.translate(_TURKISH_UPPER).lower().translate(_TURKISH_LETTERS)
+    decomposed = unicodedata.normalize('NFKD', folded)
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def search_tokens(search_term: str) -> List[str]:
+    """Folded words of a search term"""
+    return _TOKEN.findall(turkish_fold(search_term))
+
+
+# ========================
+# SQLITE FTS5
+# ========================
+
+def _fts_row(item):
+    return {'rowid': item.id, **{column: turkish_fold(getattr(item, column)) for column in SEARCH_COLUMNS}}
+
+
+def _fts_exists(connection):
+    return connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {'name': FTS_TABLE}
+    ).first() is not None
+
+
+def ensure_search_index(engine=None):
+    """
+    Create the SQLite FTS5 table and fill it if it is out of step with menu_items
+
+    Returns True when the FTS index is available.
+    """
+    engine = engine or get_engine()
+    if engine.dialect.name != 'sqlite':
+        return False
+    
+    try:
+        with engine.begin() as conn:
+            conn.execute(text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                f"{', '.join(SEARCH_COLUMNS)}, tokenize = 'unicode61 remove_diacritics 2')"
+            ))
+            indexed = conn.execute(text(f"SELECT count(*) FROM {FTS_TABLE}")).scalar()
+            total = conn.execute(text("SELECT count(*) FROM menu_items")).scalar()
+            if indexed != total:
+                rebuild_search_index(conn)
+        return True
+    except OperationalError:
+        # SQLite compiled without FTS5
+        return False
+
+
+def rebuild_search_index(connection):
+    """Re-fill the FTS table from menu_items"""
+    rows = connection.execute(text(
+        f"SELECT id, {', '.join(SEARCH_COLUMNS)} FROM menu_items"
+    )).mappings().all()
+    connection.execute(text(f"DELETE FROM {FTS_TABLE}"))
+    if rows:
+        connection.execute(
+            text(f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(SEARCH_COLUMNS)}) "
+                 f"VALUES (:rowid, {', '.join(':' + c for c in SEARCH_COLUMNS)})"),
+            [{'rowid': row['id'], **{c: turkish_fold(row[c]) for c in SEARCH_COLUMNS}} for row in rows]
+        )
+
+
+@event.listens_for(MenuItem, "after_update")
+def _reindex_menu_item(mapper, connection, item):
+    # Skip order_count / price / availability updates
+    state = inspect(item)
+    if any(state.attrs[column].history.has_changes() for column in SEARCH_COLUMNS):
+        _index_menu_item(mapper, connection, item)
+
+
+@event.listens_for(MenuItem, "after_insert")
+def _index_menu_item(mapper, connection, item):
+    if connection.dialect.name != 'sqlite' or not _fts_exists(connection):
+        return
+    connection.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :rowid"), {'rowid': item.id})
+    connection.execute(
+        text(f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(SEARCH_COLUMNS)}) "
+             f"VALUES (:rowid, {', '.join(':' + c for c in SEARCH_COLUMNS)})"),
+        _fts_row(item)
+    )
+
+
+@event.listens_for(MenuItem, "after_delete")
+def _unindex_menu_item(mapper, connection, item):
+    if connection.dialect.name != 'sqlite' or not _fts_exists(connection):
+        return
+    connection.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :rowid"), {'rowid': item.id})
+
+
+def _fts_query(tokens):
+    # Every word must match as a prefix ("mar piz" finds "Margherita Pizza")
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def _search_sqlite(session, tokens, limit, available_only):
+    weights = ', '.join(str(w) for w in COLUMN_WEIGHTS)
+    available = "AND menu_items.is_available = 1 " if available_only else ""
+    rows = session.execute(
+        text(f"SELECT {FTS_TABLE}.rowid FROM {FTS_TABLE} "
+             f"JOIN menu_items ON menu_items.id = {FTS_TABLE}.rowid "
+             f"WHERE {FTS_TABLE} MATCH :query {available}"
+             f"ORDER BY bm25({FTS_TABLE}, {weights}) LIMIT :limit"),
+        {'query': _fts_query(tokens), 'limit': limit}
+    ).all()
+    return [row[0] for row in rows]
+
+
+# ========================
+# POSTGRESQL
+# ========================
+
+def _search_postgres(session, tokens, limit, available_only):
+    # lower() + translate() approximates turkish_fold in SQL
+    def folded(column):
+        return func.translate(
+            func.lower(func.translate(func.coalesce(column, ''), 'Iİ', 'ıi')),
+            'ıçğöşüâîû', 'icgosuaiu'
+        )
+    
+    weights = dict(zip(SEARCH_COLUMNS, 'AABBC'))
+    document = None
+    for column in SEARCH_COLUMNS:
+        vector = func.setweight(func.to_tsvector('simple', folded(getattr(MenuItem, column))),
+                                literal_column(f"'{weights[column]}'"))
+        document = vector if document is None else document.op('||')(vector)
+    
+    query = func.to_tsquery('simple', ' & '.join(f"{token}:*" for token in tokens))
+    rank = func.ts_rank(document, query)
+    rows = session.query(MenuItem.id).filter(document.op('@@')(query))
+    if available_only:
+        rows = rows.filter(MenuItem.is_available == True)
+    rows = rows.order_by(rank.desc()).limit(limit).all()
+    return [row[0] for row in rows]
+
+
+# ========================
+# SEARCH
+# ========================
+
+def _search_fallback(session, tokens, limit, available_only):
+    query = session.query(MenuItem)
+    if available_only:
+        query = query.filter(MenuItem.is_available == True)
+    
+    scored = []
+    for item in query.all():
+        fields = [turkish_fold(getattr(item, column)) for column in SEARCH_COLUMNS]
+        words = [set(_TOKEN.findall(value)) for value in fields]
+        score = 0.0
+        for token in tokens:
+            best = 0.0
+            for weight, field_words in zip(COLUMN_WEIGHTS, words):
+                if any(w.startswith(token) for w in field_words):
+                    best = max(best, weight)
+            if not best:
+                break
+            score += best
+        else:
+            scored.append((-score, item.id, item))
+    
+    scored.sort(key=lambda entry: entry[:2])
+    return [item for _, _, item in scored[:limit]]
+
+
+def search_menu_items(session, search_term, available_only=True, limit=50):
+    """Ranked menu items matching every word of search_term (each word as a prefix)"""
+    tokens = search_tokens(search_term)
+    if not tokens:
+        return []
+    
+    # Checked up front: a failed query would need a rollback of the caller's session
+    dialect = session.get_bind().dialect.name
+    if dialect == 'sqlite' and _fts_exists(session.connection()):
+        ids = _search_sqlite(session, tokens, limit, available_only)
+    elif dialect == 'postgresql':
+        ids = _search_postgres(session, tokens, limit, available_only)
+    else:
+        # FTS table missing (database not migrated, or SQLite without FTS5) or another database
+        return _search_fallback(session, tokens, limit, available_only)
+    
+    if not ids:
+        return []
+    
+    by_id = {item.id: item for item in session.query(MenuItem).filter(MenuItem.id.in_(ids))}
+    return [by_id[item_id] for item_id in ids if item_id in by_id]
@@ -0,0 +1,45 @@
+"""
+Incremental analytics export: append new orders, order items, menu items and
+chat history rows to day-partitioned Parquet files (see utils/analytics_export.py)
+Safe to run from cron; each run only exports rows added or changed since the last one
+
+Usage:
+    python export_analytics.py [output_dir]    # default: ANALYTICS_EXPORT_PATH or ./analytics_export
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from utils.analytics_export import AnalyticsExporter
+
+
+def run_export(output_dir=None):
+    """Run one export and print the appended row counts"""
+    try:
+        exporter = AnalyticsExporter(output_dir)
+        started = time.perf_counter()
+        appended = exporter.run()
+        
+        for table, count in appended.items():
+            print(f"  📦 {table}: {count} new rows")
+        print(f"✅ Exported to {exporter.output_dir} in {time.perf_counter() - started:.1f}s")
+        return True
+    
+    except Exception as e:
+        print(f"❌ Error exporting analytics data: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    print("🔧 Exporting analytics data (Parquet)...")
+    print("-" * 50)
+    success = run_export(sys.argv[1] if len(sys.argv) > 1 else None)
+    print("-" * 50)
+    
+    if success:
+        print("✅ Export completed successfully!")
+    else:
+        print("❌ Export failed!")
@@ -278,12 +278,11 @@ def main():
                         st.success(f"✅ {name} başarıyla eklendi!")
                         st.balloons()
                         
-                        # Rebuild vector index
+                        # Sync vector index
                         st.info("🔄 AI vektör veritabanı güncelleniyor...")
-                        from ai.rag_engine import get_rag_engine
+                        from ai.rag_engine import sync_rag_index
                         try:
-                            engine = get_rag_engine()
-                            engine.rebuild_index()
+                            sync_rag_index()
                             st.success("✅ AI veritabanı güncellendi!")
                         except Exception as e:
                             st.warning(f"AI güncelleme hatası: {e}")
@@ -443,12 +442,11 @@ def main():
                             )
                             st.success("✅ Ürün güncellendi!")
                             
-                            # Rebuild vector index
+                            # Sync vector index
                             st.info("🔄 AI vektör veritabanı güncelleniyor...")
-                            from ai.rag_engine import get_rag_engine
+                            from ai.rag_engine import sync_rag_index
                             try:
-                                engine = get_rag_engine()
-                                engine.rebuild_index()
+                                sync_rag_index()
                                 st.success("✅ AI veritabanı güncellendi!")
                             except:
                                 pass
@@ -504,11 +502,10 @@ def main():
                             db.session.commit()
                             st.success(f"✅ {len(item_ids)} ürün silindi!")
                             
-                            # Rebuild vector index
-                            from ai.rag_engine import get_rag_engine
+                            # Sync vector index
+                            from ai.rag_engine import sync_rag_index
                             try:
-                                engine = get_rag_engine()
-                                engine.rebuild_index()
+                                sync_rag_index()
                             except:
                                 pass
                             
@@ -3,15 +3,13 @@ Menu Page - Display and browse menu items
 """
 
 import streamlit as st
-from database.db_manager import get_db
+from database.menu_cache import get_menu_snapshot
 from utils.session_manager import init_session_state, add_to_cart, get_cart_count
 from utils.page_navigation import show_customer_navigation, hide_default_sidebar
 import pandas as pd
 
-# Get restaurant info for dynamic branding
-db = get_db()
-restaurant = db.get_restaurant_info()
-db.close()
+# Get restaurant info for dynamic branding (cached menu snapshot - no query)
+restaurant = get_menu_snapshot().restaurant
 
 # Page config with dynamic title
 st.set_page_config(
@@ -72,12 +70,12 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-def show_filters(db):
+def show_filters(menu):
     """Display filter options"""
     st.sidebar.markdown("### 🔍 Filtreler")
     
     # Category filter
-    categories = db.get_all_categories()
+    categories = menu.categories
     category_names = ["Tümü"] + [cat.name for cat in categories]
     selected_category = st.sidebar.selectbox(
         "Kategori",
@@ -119,35 +117,23 @@ def show_filters(db):
         'search': search_term
     }
 
-def filter_items(items, filters):
-    """Apply filters to menu items"""
-    filtered = items
+def filter_items(menu, filters):
+    """Apply filters to menu items (bitset index built once per menu version)"""
+    category_id = None
+    if filters['category'] != "Tümü":
+        category = menu.category_by_name(filters['category'])
+        if not category:
+            return []
+        category_id = category.id
     
-    # Vegetarian filter
-    if filters['vegetarian']:
-        filtered = [item for item in filtered if item.is_vegetarian]
-    
-    # Vegan filter
-    if filters['vegan']:
-        filtered = [item for item in filtered if item.is_vegan]
-    
-    # Spicy filter
-    if filters['spicy']:
-        filtered = [item for item in filtered if item.is_spicy]
-    
-    # Price filter
-    filtered = [item for item in filtered if item.price <= filters['max_price']]
-    
-    # Search filter
-    if filters['search']:
-        search_lower = filters['search'].lower()
-        filtered = [
-            item for item in filtered 
-            if search_lower in item.name.lower() or 
-               search_lower in (item.description or "").lower()
-        ]
-    
-    return filtered
+    return menu.index.filter(
+        category_id=category_id,
+        vegetarian=filters['vegetarian'],
+        vegan=filters['vegan'],
+        spicy=filters['spicy'],
+        max_price=filters['max_price'],
+        search=filters['search']
+    )
 
 def display_menu_item(item, col):
     """Display a single menu item"""
@@ -211,10 +197,9 @@ def display_menu_item(item, col):
 
 def main():
     """Main menu page"""
-    # Get restaurant info
-    db_temp = get_db()
-    restaurant = db_temp.get_restaurant_info()
-    db_temp.close()
+    # Menu snapshot shared by all sessions (reloaded only when the menu changes)
+    menu = get_menu_snapshot()
+    restaurant = menu.restaurant
     
     # # Show header with restaurant branding
     # if restaurant.logo_url:
@@ -232,9 +217,6 @@ def main():
     
     st.markdown("---")
     
-    # Get database connection
-    db = get_db()
-    
     # Show cart summary in sidebar
     cart_count = get_cart_count()
     if cart_count > 0:
@@ -243,29 +225,14 @@ def main():
             st.switch_page("pages/2_🛒_Cart.py")
     
     # Show filters
-    filters = show_filters(db)
-    
-    # Get categories
-    categories = db.get_all_categories()
-    
-    # Get menu items
-    if filters['category'] == "Tümü":
-        items = db.get_all_menu_items()
-    else:
-        # Find category ID
-        category = next((cat for cat in categories if cat.name == filters['category']), None)
-        if category:
-            items = db.get_menu_items_by_category(category.id)
-        else:
-            items = []
+    filters = show_filters(menu)
     
     # Apply filters
-    filtered_items = filter_items(items, filters)
+    filtered_items = filter_items(menu, filters)
     
     # Display results
     if not filtered_items:
         st.warning("⚠️ Filtre kriterlerinize uygun ürün bulunamadı. Lütfen filtreleri değiştirin.")
-        db.close()
         return
     
     st.info(f"📊 {len(filtered_items)} ürün gösteriliyor")
@@ -273,14 +240,15 @@ def main():
     # Group by category for better organization
     items_by_category = {}
     for item in filtered_items:
-        cat_name = next((cat.name for cat in categories if cat.id == item.category_id), "Diğer")
+        category = menu.category(item.category_id)
+        cat_name = category.name if category else "Diğer"
         if cat_name not in items_by_category:
             items_by_category[cat_name] = []
         items_by_category[cat_name].append(item)
     
     # Display items by category
     for cat_name, cat_items in items_by_category.items():
-        category = next((cat for cat in categories if cat.name == cat_name), None)
+        category = menu.category_by_name(cat_name)
         icon = category.icon if category else "📁"
         
         st.markdown(f'<div class="category-badge">{icon} {cat_name} ({len(cat_items)})</div>', 
@@ -292,9 +260,6 @@ def main():
         for idx, item in enumerate(cat_items):
             display_menu_item(item, cols[idx % 2])
     
-    # Close database connection
-    db.close()
-    
     # Quick actions
     st.markdown("---")
     col1, col2, col3 = st.columns(3)
@@ -131,27 +131,17 @@ def confirm_order():
     try:
         db = get_db()
         
-        # Create order
-        order = db.create_order(
+        # Create order, its items and update table status in one transaction
+        order = db.place_order(
             table_id=st.session_state.table_id,
-            session_id=get_session_id()
+            session_id=get_session_id(),
+            cart_lines=st.session_state.cart
         )
         
-        # Add items to order
-        for cart_item in st.session_state.cart:
-            db.add_order_item(
-                order_id=order.id,
-                menu_item_id=cart_item['item_id'],
-                quantity=cart_item['quantity'],
-                notes=cart_item.get('notes', '')
-            )
-        
-        # Update table status
-        db.update_table_status(
-            table_id=st.session_state.table_id,
-            status='occupied',
-            session_id=get_session_id()
-        )
+        if not order:
+            db.close()
+            st.error("Sepetteki ürünler menüde bulunamadı!")
+            return None
         
         # Save order ID
         st.session_state.current_order_id = order.id
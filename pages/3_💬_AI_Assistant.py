@@ -4,12 +4,14 @@ AI Assistant Page - Chat with AI menu assistant
 
 import streamlit as st
 from ai.assistant import get_assistant
+from ai.warmup import get_warmup
 from ai.prompts import get_welcome_message
 from utils.session_manager import init_session_state, add_chat_message, clear_chat_history, add_to_cart, get_session_id, clear_cart
 from utils.page_navigation import show_customer_navigation, hide_default_sidebar
 from database.db_manager import get_db
 from utils.ai_helper import (
     parse_ai_response_for_products,
+    hide_product_tags,
     create_product_card,
     create_order_confirmation_message
 )
@@ -81,27 +83,16 @@ def create_order_from_cart():
     try:
         db = get_db()
         
-        # Create order
-        order = db.create_order(
+        # Create order, its items and update table status in one transaction
+        order = db.place_order(
             table_id=st.session_state.table_id,
-            session_id=get_session_id()
+            session_id=get_session_id(),
+            cart_lines=st.session_state.cart
         )
         
-        # Add items to order
-        for cart_item in st.session_state.cart:
-            db.add_order_item(
-                order_id=order.id,
-                menu_item_id=cart_item['item_id'],
-                quantity=cart_item['quantity'],
-                notes=cart_item.get('notes', '')
-            )
-        
-        # Update table status
-        db.update_table_status(
-            table_id=st.session_state.table_id,
-            status='occupied',
-            session_id=get_session_id()
-        )
+        if not order:
+            db.close()
+            return None, "Sepetteki ürünler menüde bulunamadı!"
         
         # Save order ID
         st.session_state.current_order_id = order.id
@@ -152,6 +143,14 @@ def display_chat_message(role, content):
         with st.chat_message("assistant"):
             st.markdown(f"**🤖 AI Asistan:**\n\n{clean_content}")
 
+def clear_on_first_chunk(chunks, placeholder):
+    """Pass chunks through, clearing the placeholder when the first one arrives"""
+    for chunk in chunks:
+        if placeholder is not None:
+            placeholder.empty()
+            placeholder = None
+        yield chunk
+
 def show_suggestions():
     """Display suggestion chips"""
     st.markdown("### 💡 Örnek Sorular")
@@ -179,7 +178,11 @@ def main():
     """Main AI assistant page"""
     st.title("💬 AI Menü Asistanı")
     
-    # Initialize AI assistant
+    # Initialize AI assistant - wait for the background warm-up instead of loading it twice
+    warmup = get_warmup()
+    if warmup.status()['state'] == 'running':
+        with st.spinner("🤖 AI asistan hazırlanıyor..."):
+            warmup.wait_until_ready()
     assistant = get_assistant()
     
     # Sidebar options
@@ -207,6 +210,17 @@ def main():
         key="allergen_select"
     )
     
+    # Latency of the last answer
+    last_stats = st.session_state.get('ai_last_stream_stats')
+    if last_stats:
+        if last_stats.get('cached'):
+            st.sidebar.caption("⚡ Son yanıt önbellekten geldi")
+        else:
+            st.sidebar.caption(
+                f"⏱️ Son yanıt: ilk kelime {last_stats['ttft']:.1f} sn, "
+                f"{last_stats['tokens_per_sec']:.1f} token/sn"
+            )
+    
     # Clear chat button
     if st.sidebar.button("🗑️ Sohbeti Temizle"):
         clear_chat_history()
@@ -380,8 +394,6 @@ Please type 'yes' to confirm your order or 'no' to cancel.
                     # Don't process further if waiting for confirmation
                     return
                 
-                response = assistant.get_response(message, lang_code, filters)
-                
                 # Check if user is asking to confirm order
                 confirm_keywords = ['sipariş ver', 'sipariş et', 'onayla', 'confirm order', 'place order', 'checkout']
                 if any(keyword in message.lower() for keyword in confirm_keywords):
@@ -413,8 +425,29 @@ Please type 'yes' to confirm your order or 'no' to cancel.
                         
                         st.rerun()
                 else:
-                    # Regular AI response
-                    add_chat_message('assistant', response)
+                    # Regular AI response, rendered as it is generated
+                    stream_stats = {}
+                    # Product markers are hidden while streaming but kept in the history for the cards
+                    raw_chunks = []
+                    with processing_placeholder.container():
+                        with st.chat_message("assistant"):
+                            st.markdown("**🤖 AI Asistan:**")
+                            thinking = st.empty()
+                            thinking.caption("🤖 Düşünüyorum...")
+                            st.write_stream(clear_on_first_chunk(
+                                hide_product_tags(assistant.stream_response(
+                                    message, lang_code, filters, stream_stats,
+                                    # Fair share of the LLM per table
+                                    table=st.session_state.get('table_number') or get_session_id(),
+                                    on_queue_position=lambda position: thinking.caption(
+                                        f"⏳ Sıradasınız: {position}. sıra - birazdan cevaplıyorum..."
+                                    )
+                                ), raw_chunks),
+                                thinking
+                            ))
+                    st.session_state.ai_last_stream_stats = stream_stats
+                    
+                    add_chat_message('assistant', ''.join(raw_chunks))
                     
                     # Clear processing indicator and re-enable buttons
                     processing_placeholder.empty()
@@ -5,13 +5,13 @@ Admin only access - requires authentication through admin.py
 
 import streamlit as st
 from database.db_manager import get_db
-from database.models import Order
+from database.order_feed import get_order_feed
 from utils.session_manager import init_session_state, toggle_admin_mode
 from utils.page_navigation import show_admin_navigation, hide_default_sidebar
 from utils.sound_manager import play_alert_sound as play_notification_sound
+from utils.auto_refresh import refreshing_panel
 from datetime import datetime, timedelta
 import pandas as pd
-import time
 
 # Page config
 st.set_page_config(page_title="Admin Dashboard", page_icon="📊", layout="wide")
@@ -67,11 +67,9 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-def show_metrics(db):
+def show_metrics(db, tables):
     """Display key metrics"""
     stats = db.get_daily_stats()
-    active_orders = db.get_active_orders()
-    tables = db.get_all_tables()
     
     col1, col2, col3, col4 = st.columns(4)
     
@@ -94,7 +92,7 @@ def show_metrics(db):
     with col3:
         st.markdown(f"""
         <div class="metric-card">
-            <div class="metric-value">{len(active_orders)}</div>
+            <div class="metric-value">{db.get_active_order_count()}</div>
             <div class="metric-label">🔄 Aktif Sipariş</div>
         </div>
         """, unsafe_allow_html=True)
@@ -108,12 +106,18 @@ def show_metrics(db):
         </div>
         """, unsafe_allow_html=True)
 
-def show_active_orders(db):
-    """Display active orders"""
+def load_active_orders():
+    """Active orders with tables, items and menu items loaded (usable after the session closes)"""
+    db = get_db()
+    try:
+        return db.get_active_orders(with_items=True)
+    finally:
+        db.close()
+
+def show_active_orders(orders):
+    """Display active orders (loaded with tables, items and menu items)"""
     st.markdown("## 📋 Aktif Siparişler")
     
-    orders = db.get_active_orders()
-    
     if not orders:
         st.info("✅ Şu anda aktif sipariş yok.")
         return
@@ -129,9 +133,8 @@ def show_active_orders(db):
             
             with col2:
                 # Order items
-                items = db.get_order_items(order.id)
                 st.markdown("**Ürünler:**")
-                for item in items:
+                for item in order.items:
                     st.write(f"• {item.quantity}x {item.menu_item.name}")
                 
                 if order.special_requests:
@@ -161,7 +164,9 @@ def show_active_orders(db):
                 
                 if new_status != order.status:
                     if st.button("✔️ Güncelle", key=f"update_{order.id}"):
+                        db = get_db()
                         db.update_order_status(order.id, new_status)
+                        db.close()
                         st.success("Durum güncellendi!")
                         st.rerun()
 
@@ -169,7 +174,7 @@ def show_popular_items(db):
     """Display popular menu items"""
     st.markdown("## ⭐ Popüler Ürünler")
     
-    popular = db.get_popular_items(limit=10)
+    popular = db.get_popular_items(limit=10, with_category=True)
     
     if not popular:
         st.info("Henüz sipariş verilen ürün yok.")
@@ -189,12 +194,10 @@ def show_popular_items(db):
     df = pd.DataFrame(data)
     st.dataframe(df, use_container_width=True, hide_index=True)
 
-def show_table_overview(db):
+def show_table_overview(tables):
     """Display table status overview"""
     st.markdown("## 🏓 Masa Durumu")
     
-    tables = db.get_all_tables()
-    
     # Group by status
     status_counts = {
         'available': 0,
@@ -248,52 +251,53 @@ def show_table_overview(db):
 
 def check_new_orders():
     """Check for new orders and show notifications with sound"""
-    # Initialize last check time
-    if 'last_order_check' not in st.session_state:
-        st.session_state.last_order_check = datetime.now()
-        st.session_state.last_order_count = 0
-        return
+    feed = get_order_feed()
     
-    db = get_db()
+    # New tabs start at the current end of the feed
+    if 'order_feed_cursor' not in st.session_state:
+        st.session_state.order_feed_cursor = feed.latest_cursor()
+        return
     
-    # Get orders created after last check
-    new_orders_query = db.session.query(Order).filter(
-        Order.created_at > st.session_state.last_order_check
+    new_orders, st.session_state.order_feed_cursor = feed.changes_since(
+        st.session_state.order_feed_cursor
     )
-    new_orders_count = new_orders_query.count()
     
-    if new_orders_count > 0:
+    if new_orders:
         # Play notification sound
         play_notification_sound()
         
         # Show toast notification
-        st.toast(f"🔔 {new_orders_count} yeni sipariş geldi!", icon="🔔")
-        
-        # Get the actual new orders for details
-        orders = new_orders_query.all()
+        st.toast(f"🔔 {len(new_orders)} yeni sipariş geldi!", icon="🔔")
         
         # Show detailed notifications
-        for order in orders:
-            st.toast(f"📋 Sipariş #{order.order_number} - Masa {order.table.table_number}", icon="🍕")
-    
-    # Update last check time
-    st.session_state.last_order_check = datetime.now()
-    st.session_state.last_order_count = db.session.query(Order).count()
-    
+        for order in new_orders:
+            st.toast(f"📋 Sipariş #{order['order_number']} - Masa {order['table_number']}", icon="🍕")
+
+def get_order_change_token():
+    """Current order/table change token"""
+    db = get_db()
+    token = db.get_order_change_token()
     db.close()
+    return token
+
+def show_orders_panel(orders):
+    """Orders tab body, re-run by the refresh fragment"""
+    # New order notifications with sound
+    check_new_orders()
+    show_active_orders(orders)
 
 def main():
     """Main admin dashboard"""
     st.title("📊 Admin Dashboard")
     
-    # Check for new orders at the beginning
-    check_new_orders()
-    
     # Get database
     db = get_db()
     
+    # Load shared data once for all panels
+    tables = db.get_all_tables()
+    
     # Show metrics
-    show_metrics(db)
+    show_metrics(db, tables)
     
     st.markdown("---")
     
@@ -305,40 +309,18 @@ def main():
     ])
     
     with tab1:
-        show_active_orders(db)
+        # Re-runs on its own every 10s; reloads orders only when orders or tables changed
+        refreshing_panel("admin_orders", get_order_change_token, load_active_orders, show_orders_panel,
+                         interval=10, label="Admin Panel v2.0")
     
     with tab2:
-        show_table_overview(db)
+        show_table_overview(tables)
     
     with tab3:
         show_popular_items(db)
     
     # Close database
     db.close()
-    
-    # Auto-refresh countdown - place at the bottom
-    st.markdown("---")
-    
-    # Initialize refresh counter
-    if 'admin_refresh_count' not in st.session_state:
-        st.session_state.admin_refresh_count = 0
-    
-    # Show refresh status and trigger auto-refresh
-    placeholder = st.empty()
-    
-    # Countdown from 10 to 0
-    for remaining in range(10, 0, -1):
-        with placeholder.container():
-            col1, col2 = st.columns([3, 1])
-            with col1:
-                st.caption(f"📅 {datetime.now().strftime('%d.%m.%Y %H:%M:%S')} - Admin Panel v2.0")
-            with col2:
-                st.caption(f"🔄 Yenileme: {remaining}s")
-        time.sleep(1)
-    
-    # Trigger refresh
-    st.session_state.admin_refresh_count += 1
-    st.rerun()
 
 if __name__ == "__main__":
     main()
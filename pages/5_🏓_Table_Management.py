@@ -155,7 +155,7 @@ def show_table_details(table, db):
     
     # Show orders for this table
     st.markdown("#### 📋 Bugünün Siparişleri")
-    orders = db.get_today_orders_by_table(table.id)
+    orders = db.get_today_orders_by_table(table.id, with_items=True)
     
     if not orders:
         st.info("Bu masa için bugün henüz sipariş yok.")
@@ -200,9 +200,8 @@ def show_table_details(table, db):
                 
                 with col_b:
                     # Order items
-                    items = db.get_order_items(order.id)
                     st.markdown("**Ürünler:**")
-                    for item in items:
+                    for item in order.items:
                         st.write(f"• {item.quantity}x {item.menu_item.name} ({item.subtotal:.2f} ₺)")
                     
                     if order.special_requests:
@@ -297,7 +296,7 @@ def show_table_grid(tables, db):
 def show_quick_stats(db):
     """Show quick statistics"""
     tables = db.get_all_tables()
-    active_orders = db.get_active_orders()
+    active_order_count = db.get_active_order_count()
     
     col1, col2, col3, col4 = st.columns(4)
     
@@ -315,7 +314,7 @@ def show_quick_stats(db):
         st.metric("📅 Rezerve", reserved)
     
     with col4:
-        st.metric("📋 Aktif Sipariş", len(active_orders))
+        st.metric("📋 Aktif Sipariş", active_order_count)
 
 def main():
     """Main table management page"""
@@ -5,13 +5,20 @@ Admin only access - requires authentication through admin.py
 
 import streamlit as st
 from database.db_manager import get_db
-from database.models import Order, OrderItem, MenuItem
-from sqlalchemy import func
+from database.reports import (
+    get_sales_report, get_product_report, get_category_report, get_hourly_report, get_table_report
+)
 from utils.session_manager import init_session_state
 from utils.page_navigation import show_admin_navigation, hide_default_sidebar
+from utils.report_export import FORMATS as EXPORT_FORMATS, export_orders_to_file
+from utils.analytics_export import AnalyticsExporter
 from datetime import datetime, timedelta
+from functools import partial
 import pandas as pd
-import io
+import os
+
+# Orders shown per page in the table report (the export contains all of them)
+ORDERS_PAGE_SIZE = 100
 
 # Page config
 st.set_page_config(page_title="Raporlar", page_icon="📊", layout="wide")
@@ -51,85 +58,35 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-def generate_sales_report(db, start_date, end_date):
-    """Generate sales report for date range"""
-    from sqlalchemy import func, and_
-    from database.models import Order
-    
-    # Get orders in date range
-    orders = db.session.query(Order).filter(
-        and_(
-            func.DATE(Order.created_at) >= start_date,
-            func.DATE(Order.created_at) <= end_date
-        )
-    ).all()
-    
-    if not orders:
-        return None
-    
-    # Calculate metrics
-    total_orders = len(orders)
-    total_revenue = sum(o.total_amount for o in orders if o.status == 'paid')
-    avg_order_value = total_revenue / total_orders if total_orders > 0 else 0
-    
-    # Orders by status
-    status_counts = {}
-    for order in orders:
-        status_counts[order.status] = status_counts.get(order.status, 0) + 1
-    
-    # Daily breakdown
-    daily_data = {}
-    for order in orders:
-        date_key = order.created_at.date()
-        if date_key not in daily_data:
-            daily_data[date_key] = {'orders': 0, 'revenue': 0}
-        daily_data[date_key]['orders'] += 1
-        if order.status == 'paid':
-            daily_data[date_key]['revenue'] += order.total_amount
-    
-    return {
-        'total_orders': total_orders,
-        'total_revenue': total_revenue,
-        'avg_order_value': avg_order_value,
-        'status_counts': status_counts,
-        'daily_data': daily_data
-    }
-
-def generate_product_report(db):
-    """Generate product performance report"""
-    from sqlalchemy import func
-    from database.models import MenuItem, OrderItem
-    
-    # Get product stats
-    product_stats = db.session.query(
-        MenuItem.name,
-        MenuItem.category_id,
-        MenuItem.price,
-        func.count(OrderItem.id).label('order_count'),
-        func.sum(OrderItem.quantity).label('total_quantity'),
-        func.sum(OrderItem.subtotal).label('total_revenue')
-    ).join(
-        OrderItem, MenuItem.id == OrderItem.menu_item_id
-    ).group_by(
-        MenuItem.id
-    ).order_by(
-        func.sum(OrderItem.subtotal).desc()
-    ).all()
-    
-    return product_stats
+def build_order_export(fmt, start_date, end_date, table_id=None, summary=None):
+    """
+    Stream the orders into a temporary file and return its contents (download callback)
+    
+    Orders never sit in memory together; st.download_button still needs the
+    finished (compressed) file as bytes to serve it.
+    """
+    path = export_orders_to_file(fmt, start_date, end_date, table_id=table_id, summary=summary)
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    finally:
+        os.remove(path)
 
-def export_to_excel(data, filename):
-    """Export data to Excel"""
-    output = io.BytesIO()
-    
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        if isinstance(data, dict):
-            for sheet_name, df in data.items():
-                df.to_excel(writer, sheet_name=sheet_name, index=False)
-        else:
-            data.to_excel(writer, index=False)
+def show_table_sales(db, start_date, end_date):
+    """Paid sales per table from the daily rollups"""
+    table_sales = get_table_report(db.session, start_date, end_date)
+    if table_sales.empty:
+        return
     
-    return output.getvalue()
+    st.markdown("### 🏓 Masa Bazında Satışlar")
+    st.caption("Ödenen siparişler (günlük özet tablolarından)")
+    st.dataframe(pd.DataFrame({
+        'Masa': table_sales['table_number'].map(lambda n: f"Masa {n}"),
+        'Sipariş Sayısı': table_sales['orders'],
+        'Ürün Adedi': table_sales['total_quantity'],
+        'Ciro (₺)': table_sales['revenue'].map(lambda r: f"{r:.2f}")
+    }), use_container_width=True, hide_index=True)
+    st.markdown("---")
 
 def show_table_reports(db):
     """Show table reports with orders and export option"""
@@ -230,10 +187,14 @@ def show_table_reports(db):
         table = db.get_table_by_number(table_num)
         table_id = table.id if table else None
     
-    # Get orders with the selected date range
-    orders = db.get_orders_by_table_and_date_range(table_id, query_start_date, query_end_date)
+    if table_id is None:
+        show_table_sales(db, query_start_date, query_end_date)
+    
+    # Counts and revenue from one aggregate query; orders are only loaded one page at a time
+    summary_stats = db.get_order_summary_by_table_and_date_range(table_id, query_start_date, query_end_date)
+    total_orders = summary_stats['total_orders']
     
-    if not orders:
+    if not total_orders:
         st.info(f"📋 {selected_table} için {query_start_date.strftime('%d.%m.%Y')} - {query_end_date.strftime('%d.%m.%Y')} tarihleri arasında sipariş bulunamadı.")
         return
     
@@ -241,11 +202,12 @@ def show_table_reports(db):
     st.markdown("### 📊 Özet")
     col1, col2, col3, col4 = st.columns(4)
     
-    total_revenue = sum(o.total_amount for o in orders if o.status == 'paid')
-    avg_order = total_revenue / len(orders) if orders else 0
+    total_revenue = summary_stats['total_revenue']
+    paid_orders = summary_stats['paid_orders']
+    avg_order = total_revenue / total_orders
     
     with col1:
-        st.metric("Toplam Sipariş", len(orders))
+        st.metric("Toplam Sipariş", total_orders)
     
     with col2:
         st.metric("Toplam Ciro", f"₺{total_revenue:.2f}")
@@ -254,7 +216,6 @@ def show_table_reports(db):
         st.metric("Ortalama Sipariş", f"₺{avg_order:.2f}")
     
     with col4:
-        paid_orders = len([o for o in orders if o.status == 'paid'])
         st.metric("Ödenen Sipariş", paid_orders)
     
     st.markdown("---")
@@ -262,12 +223,27 @@ def show_table_reports(db):
     # Orders table
     st.markdown("### 📋 Sipariş Detayları")
     
-    # Prepare data for display and export
+    page_count = (total_orders + ORDERS_PAGE_SIZE - 1) // ORDERS_PAGE_SIZE
+    page = 1
+    if page_count > 1:
+        col1, col2 = st.columns([1, 3])
+        with col1:
+            page = st.number_input("Sayfa", min_value=1, max_value=page_count, value=1, step=1,
+                                   key="table_report_page")
+        with col2:
+            st.caption(f"Sayfa başına {ORDERS_PAGE_SIZE} sipariş, toplam {page_count} sayfa. "
+                       "Tüm siparişler için dışa aktarmayı kullanın.")
+    
+    # Table, items and item names are eager-loaded (constant query count per page)
+    orders = db.get_orders_by_table_and_date_range(
+        table_id, query_start_date, query_end_date, with_items=True,
+        limit=ORDERS_PAGE_SIZE, offset=(page - 1) * ORDERS_PAGE_SIZE
+    )
+    
+    # Prepare data for display
     orders_data = []
     for order in orders:
-        # Get items
-        items = db.get_order_items(order.id)
-        items_list = ", ".join([f"{item.quantity}x {item.menu_item.name}" for item in items])
+        items_list = ", ".join([f"{item.quantity}x {item.menu_item.name}" for item in order.items])
         
         orders_data.append({
             'Sipariş No': order.order_number,
@@ -287,45 +263,75 @@ def show_table_reports(db):
     
     # Excel export button
     st.markdown("---")
-    st.markdown("### 📥 Excel Export")
+    st.markdown("### 📥 Dışa Aktar")
     
     col1, col2, col3 = st.columns([2, 1, 1])
     
     with col1:
-        st.info(f"📊 {len(orders)} sipariş Excel formatında indirilebilir")
+        st.info(f"📊 {total_orders} sipariş Excel, CSV veya Parquet formatında indirilebilir")
     
     with col2:
-        if st.button("📊 Excel İndir", type="primary", use_container_width=True, key="excel_export_btn"):
-            # Create Excel file
-            output = io.BytesIO()
-            with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-                # Orders sheet
-                orders_df.to_excel(writer, sheet_name='Siparişler', index=False)
-                
-                # Summary sheet
-                summary_df = pd.DataFrame([{
-                    'Başlangıç Tarihi': query_start_date.strftime('%d.%m.%Y'),
-                    'Bitiş Tarihi': query_end_date.strftime('%d.%m.%Y'),
-                    'Masa': selected_table,
-                    'Toplam Sipariş': len(orders),
-                    'Toplam Ciro (₺)': total_revenue,
-                    'Ortalama Sipariş (₺)': avg_order,
-                    'Ödenen Sipariş': paid_orders
-                }])
-                summary_df.to_excel(writer, sheet_name='Özet', index=False)
-            
-            excel_data = output.getvalue()
-            
-            filename = f"masa_raporu_{selected_table.replace(' ', '_')}_{query_start_date}_{query_end_date}.xlsx"
-            
-            st.download_button(
-                label="💾 İndir",
-                data=excel_data,
-                file_name=filename,
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                use_container_width=True,
-                key="excel_download_btn"
-            )
+        export_format = st.selectbox(
+            "Format",
+            list(EXPORT_FORMATS),
+            format_func=lambda fmt: {'xlsx': 'Excel', 'csv': 'CSV', 'parquet': 'Parquet'}[fmt],
+            key="table_export_format"
+        )
+    
+    with col3:
+        summary = {
+            'Başlangıç Tarihi': query_start_date.strftime('%d.%m.%Y'),
+            'Bitiş Tarihi': query_end_date.strftime('%d.%m.%Y'),
+            'Masa': selected_table,
+            'Toplam Sipariş': total_orders,
+            'Toplam Ciro (₺)': total_revenue,
+            'Ortalama Sipariş (₺)': avg_order,
+            'Ödenen Sipariş': paid_orders
+        }
+        extension, mime = EXPORT_FORMATS[export_format]
+        filename = f"masa_raporu_{selected_table.replace(' ', '_')}_{query_start_date}_{query_end_date}{extension}"
+        
+        # The file is generated when the button is clicked, streamed from the database
+        st.download_button(
+            label="💾 İndir",
+            data=partial(build_order_export, export_format, query_start_date, query_end_date, table_id, summary),
+            file_name=filename,
+            mime=mime,
+            type="primary",
+            use_container_width=True,
+            key="excel_download_btn"
+        )
+
+def show_analytics_export():
+    """Incremental Parquet export of orders, items, menu and chat history for offline analysis"""
+    st.markdown("## 🗄️ Analitik Dışa Aktarma")
+    st.caption("Sipariş, sipariş kalemi, menü ve sohbet kayıtları günlere bölünmüş Parquet dosyalarına eklenir. "
+               "Her çalıştırma yalnızca son çalıştırmadan sonra eklenen veya değişen kayıtları yazar.")
+    
+    exporter = AnalyticsExporter()
+    st.markdown(f"📁 Hedef klasör: `{os.path.abspath(exporter.output_dir)}`")
+    
+    state = exporter.load_state()
+    if state:
+        st.dataframe(pd.DataFrame([
+            {
+                'Tablo': table,
+                'Son ID': mark.get('id'),
+                'Son Güncelleme': mark.get('updated_at') or '-'
+            }
+            for table, mark in state.items()
+        ]), use_container_width=True, hide_index=True)
+    else:
+        st.info("📋 Henüz dışa aktarma yapılmadı - ilk çalıştırma tüm geçmişi yazar.")
+    
+    if st.button("📦 Yeni Kayıtları Dışa Aktar", type="primary", key="analytics_export_btn"):
+        with st.spinner("Dışa aktarılıyor..."):
+            try:
+                appended = exporter.run()
+            except Exception as e:
+                st.error(f"❌ Dışa aktarma başarısız: {e}")
+            else:
+                st.success("✅ " + ", ".join(f"{table}: {count} yeni kayıt" for table, count in appended.items()))
 
 def main():
     """Main reports page"""
@@ -335,11 +341,12 @@ def main():
     db = get_db()
     
     # Main tabs
-    tab1, tab2, tab3, tab4 = st.tabs([
+    tab1, tab2, tab3, tab4, tab5 = st.tabs([
         "💰 Satış Raporu",
         "🍽️ Ürün Performansı",
         "🏓 Masa Raporları",
-        "📈 Grafikler"
+        "📈 Grafikler",
+        "🗄️ Analitik Dışa Aktarma"
     ])
     
     with tab1:
@@ -415,7 +422,7 @@ def main():
         st.markdown("---")
         
         # Generate sales report
-        sales_report = generate_sales_report(db, start_date, end_date)
+        sales_report = get_sales_report(db.session, start_date, end_date)
         
         # Store in session state for other tabs
         st.session_state.sales_report = sales_report
@@ -440,7 +447,9 @@ def main():
                 st.metric("Ortalama Sipariş", f"₺{sales_report['avg_order_value']:.2f}")
             
             with col4:
-                completion_rate = (sales_report['status_counts'].get('paid', 0) / 
+                status_counts = sales_report['status_counts']
+                paid_count = status_counts.loc[status_counts['status'] == 'paid', 'orders'].sum()
+                completion_rate = (paid_count / 
                                  sales_report['total_orders'] * 100 if sales_report['total_orders'] > 0 else 0)
                 st.metric("Tamamlanma Oranı", f"%{completion_rate:.1f}")
             
@@ -456,10 +465,10 @@ def main():
                 'cancelled': '❌ İptal'
             }
             
-            status_df = pd.DataFrame([
-                {'Durum': status_labels.get(k, k), 'Adet': v}
-                for k, v in sales_report['status_counts'].items()
-            ])
+            status_df = pd.DataFrame({
+                'Durum': sales_report['status_counts']['status'].map(lambda k: status_labels.get(k, k)),
+                'Adet': sales_report['status_counts']['orders']
+            })
             
             col1, col2 = st.columns([2, 1])
             
@@ -468,26 +477,25 @@ def main():
             
             with col2:
                 # Simple bar representation
-                for status, count in sales_report['status_counts'].items():
+                for status, count in sales_report['status_counts'].itertuples(index=False):
                     percentage = (count / sales_report['total_orders'] * 100)
                     st.progress(percentage / 100, text=f"{status_labels.get(status, status)}: {count}")
             
             # Daily breakdown
             st.markdown("### 📅 Günlük Dağılım")
             
-            daily_df = pd.DataFrame([
-                {
-                    'Tarih': date.strftime('%d.%m.%Y'),
-                    'Sipariş Sayısı': data['orders'],
-                    'Ciro (₺)': f"{data['revenue']:.2f}"
-                }
-                for date, data in sorted(sales_report['daily_data'].items())
-            ])
+            daily = sales_report['daily']
+            daily_df = pd.DataFrame({
+                'Tarih': daily['date'].map(lambda d: d.strftime('%d.%m.%Y')),
+                'Sipariş Sayısı': daily['orders'],
+                'Ciro (₺)': daily['revenue'].map(lambda r: f"{r:.2f}")
+            })
             
             st.dataframe(daily_df, use_container_width=True, hide_index=True)
     
     with tab2:
         st.markdown("## 🍽️ Ürün Performansı")
+        st.caption("Ödenen siparişler (günlük özet tablolarından)")
         
         # Date range selector for product performance
         st.markdown("### 📅 Tarih Aralığı")
@@ -555,33 +563,16 @@ def main():
         
         st.markdown("---")
         
-        # Get product stats with date filter
-        product_stats = (db.session.query(
-            MenuItem.name,
-            MenuItem.category_id,
-            MenuItem.price,
-            func.count(OrderItem.id).label('order_count'),
-            func.sum(OrderItem.quantity).label('total_quantity'),
-            func.sum(OrderItem.subtotal).label('total_revenue')
-        ).join(
-            OrderItem, MenuItem.id == OrderItem.menu_item_id
-        ).join(
-            Order, OrderItem.order_id == Order.id
-        ).filter(
-            Order.created_at.between(product_start_date, product_end_date + timedelta(days=1))
-        ).group_by(
-            MenuItem.id
-        ).order_by(
-            func.sum(OrderItem.subtotal).desc()
-        ).all())
+        # Paid sales per product (daily rollups)
+        product_stats = get_product_report(db.session, product_start_date, product_end_date)
         
-        if not product_stats:
+        if product_stats.empty:
             st.info(f"📋 {product_start_date.strftime('%d.%m.%Y')} - {product_end_date.strftime('%d.%m.%Y')} tarihleri arasında ürün satışı yok.")
         else:
             # Top products
             st.markdown("### ⭐ En Çok Satanlar (Top 10)")
             
-            top_products = product_stats[:10]
+            top_products = product_stats.head(10)
             
             top_df = pd.DataFrame([
                 {
@@ -591,7 +582,7 @@ def main():
                     'Birim Fiyat': f"{p.price:.2f} ₺",
                     'Toplam Ciro': f"{p.total_revenue:.2f} ₺"
                 }
-                for p in top_products
+                for p in top_products.itertuples(index=False)
             ])
             
             st.dataframe(top_df, use_container_width=True, hide_index=True)
@@ -606,10 +597,23 @@ def main():
                     'Adet': p.total_quantity,
                     'Ciro (₺)': f"{p.total_revenue:.2f}"
                 }
-                for p in product_stats
+                for p in product_stats.itertuples(index=False)
             ])
             
             st.dataframe(all_df, use_container_width=True, hide_index=True)
+            
+            # Categories
+            st.markdown("### 🗂️ Kategoriler")
+            
+            category_stats = get_category_report(db.session, product_start_date, product_end_date)
+            category_df = pd.DataFrame({
+                'Kategori': category_stats['name'],
+                'Sipariş': category_stats['order_count'],
+                'Adet': category_stats['total_quantity'],
+                'Ciro (₺)': category_stats['total_revenue'].map(lambda r: f"{r:.2f}")
+            })
+            
+            st.dataframe(category_df, use_container_width=True, hide_index=True)
     
     with tab3:
         # Masa Raporları - independent date selection
@@ -685,9 +689,9 @@ def main():
         st.markdown("---")
         
         # Generate sales report for graphs
-        graph_sales_report = generate_sales_report(db, graph_start_date, graph_end_date)
+        graph_sales_report = get_sales_report(db.session, graph_start_date, graph_end_date)
         
-        if not graph_sales_report or not graph_sales_report['daily_data']:
+        if not graph_sales_report or graph_sales_report['daily'].empty:
             st.info(f"📊 {graph_start_date.strftime('%d.%m.%Y')} - {graph_end_date.strftime('%d.%m.%Y')} tarihleri arasında veri bulunamadı.")
         else:
             # Simple text-based charts since we don't have plotly
@@ -696,20 +700,35 @@ def main():
             # Revenue by day
             st.markdown("### 💰 Günlük Ciro Trendi")
             
-            max_revenue = max([d['revenue'] for d in graph_sales_report['daily_data'].values()])
-            for date, data in sorted(graph_sales_report['daily_data'].items()):
-                bar_length = int(data['revenue'] / max_revenue * 50) if max_revenue > 0 else 0
+            graph_daily = graph_sales_report['daily']
+            max_revenue = graph_daily['revenue'].max()
+            for row in graph_daily.itertuples(index=False):
+                bar_length = int(row.revenue / max_revenue * 50) if max_revenue > 0 else 0
                 bar = "█" * bar_length
-                st.text(f"{date.strftime('%d.%m')}: {bar} ₺{data['revenue']:.2f}")
+                st.text(f"{row.date.strftime('%d.%m')}: {bar} ₺{row.revenue:.2f}")
             
             # Orders by day
             st.markdown("### 📊 Günlük Sipariş Sayısı")
             
-            max_orders = max([d['orders'] for d in graph_sales_report['daily_data'].values()])
-            for date, data in sorted(graph_sales_report['daily_data'].items()):
-                bar_length = int(data['orders'] / max_orders * 50) if max_orders > 0 else 0
+            max_orders = graph_daily['orders'].max()
+            for row in graph_daily.itertuples(index=False):
+                bar_length = int(row.orders / max_orders * 50) if max_orders > 0 else 0
                 bar = "▓" * bar_length
-                st.text(f"{date.strftime('%d.%m')}: {bar} {data['orders']} sipariş")
+                st.text(f"{row.date.strftime('%d.%m')}: {bar} {row.orders} sipariş")
+            
+            # Paid revenue by hour of day (daily rollups)
+            hourly = get_hourly_report(db.session, graph_start_date, graph_end_date)
+            if not hourly.empty:
+                st.markdown("### 🕐 Saatlik Ciro")
+                
+                max_hourly = hourly['revenue'].max()
+                for row in hourly.itertuples(index=False):
+                    bar_length = int(row.revenue / max_hourly * 50) if max_hourly > 0 else 0
+                    bar = "█" * bar_length
+                    st.text(f"{row.hour:02d}:00: {bar} ₺{row.revenue:.2f} ({row.orders} sipariş)")
+    
+    with tab5:
+        show_analytics_export()
     
     # Close database
     db.close()
@@ -4,6 +4,7 @@ Admin only access - requires authentication through admin.py
 """
 
 import streamlit as st
+from database.db_manager import get_db
 from utils.notification_manager import get_notification_manager, show_notifications_sidebar
 from utils.session_manager import init_session_state
 from utils.page_navigation import show_admin_navigation, hide_default_sidebar
@@ -62,16 +63,19 @@ def main():
     col1, col2, col3, col4 = st.columns([2, 2, 2, 1])
     
     with col1:
-        st.metric("Toplam Bildirim", len(st.session_state.get('notifications', [])))
+        st.metric("Toplam Bildirim", nm.get_total_count())
     
     with col2:
         unread_count = nm.get_notification_count()
         st.metric("Okunmamış", unread_count)
     
+    # Latest notifications (bounded) shared by the tabs below
+    recent_notifications = nm.get_recent_notifications()
+    
     with col3:
         # Calculate today's notifications
         today_count = 0
-        for notif in st.session_state.get('notifications', []):
+        for notif in recent_notifications:
             if notif['timestamp'].date() == datetime.now().date():
                 today_count += 1
         st.metric("Bugün", today_count)
@@ -99,18 +103,18 @@ def main():
     
     with tab1:
         # Show all notifications
-        all_notifications = st.session_state.get('notifications', [])
+        all_notifications = recent_notifications
         
         if not all_notifications:
             st.info("📭 Henüz bildirim yok")
         else:
             # Group by date
             notifications_by_date = {}
-            for i, notif in enumerate(all_notifications):
+            for notif in all_notifications:
                 date_key = notif['timestamp'].date()
                 if date_key not in notifications_by_date:
                     notifications_by_date[date_key] = []
-                notifications_by_date[date_key].append({'index': i, **notif})
+                notifications_by_date[date_key].append(notif)
             
             # Display by date groups
             for date_key in sorted(notifications_by_date.keys(), reverse=True):
@@ -126,7 +130,7 @@ def main():
                 
                 # Show notifications for this date
                 for notif in notifications_by_date[date_key]:
-                    is_read = notif['index'] in st.session_state.get('read_notifications', set())
+                    is_read = notif['is_read']
                     priority = notif.get('priority', 'low')
                     
                     col1, col2 = st.columns([6, 1])
@@ -152,20 +156,20 @@ def main():
                     
                     with col2:
                         if not is_read:
-                            if st.button("✓", key=f"mark_read_{notif['index']}", help="Okundu olarak işaretle"):
-                                nm.mark_as_read(notif['index'])
+                            if st.button("✓", key=f"mark_read_{notif['id']}", help="Okundu olarak işaretle"):
+                                nm.mark_as_read(notif['id'])
                                 st.rerun()
                     
                     st.markdown("---")
     
     with tab2:
         # Show only unread
-        unread = nm.get_unread_notifications()
+        unread = nm.get_unread_notifications(limit=50)
         
         if not unread:
             st.success("🎉 Tüm bildirimler okundu!")
         else:
-            st.info(f"📬 {len(unread)} okunmamış bildirim")
+            st.info(f"📬 {unread_count} okunmamış bildirim")
             
             for notif in unread:
                 with st.container():
@@ -177,15 +181,14 @@ def main():
                         st.caption(notif['timestamp'].strftime('%d.%m.%Y %H:%M'))
                     
                     with col2:
-                        if st.button("✓", key=f"read_{notif['index']}"):
-                            nm.mark_as_read(notif['index'])
+                        if st.button("✓", key=f"read_{notif['id']}"):
+                            nm.mark_as_read(notif['id'])
                             st.rerun()
                 
                 st.markdown("---")
             
             if st.button("✅ Tümünü Okundu İşaretle", type="primary"):
-                for notif in unread:
-                    nm.mark_as_read(notif['index'])
+                nm.mark_all_as_read()
                 st.rerun()
     
     with tab3:
@@ -219,6 +222,19 @@ def main():
             
             st.info("💡 Gmail kullanıyorsanız, 'App Password' oluşturmanız gerekir")
         
+        # Outbox status (emails/SMS are sent in the background)
+        db = get_db()
+        outbox_counts = db.get_outbox_counts()
+        db.close()
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("📤 Gönderim Bekleyen", outbox_counts.get('pending', 0))
+        with col2:
+            st.metric("✅ Gönderilen", outbox_counts.get('sent', 0))
+        with col3:
+            st.metric("❌ Başarısız", outbox_counts.get('dead', 0))
+        
         st.markdown("---")
         
         # SMS notifications
@@ -260,7 +276,7 @@ SMS_ENABLED={'true' if sms_enabled else 'false'}
     with tab4:
         st.markdown("## 📊 Bildirim İstatistikleri")
         
-        all_notifications = st.session_state.get('notifications', [])
+        all_notifications = recent_notifications
         
         if not all_notifications:
             st.info("Henüz istatistik yok")
@@ -9,7 +9,7 @@ from database.models import Category
 from utils.session_manager import init_session_state
 from utils.page_navigation import show_admin_navigation, hide_default_sidebar
 from datetime import datetime
-from ai.rag_engine import MenuRAGEngine
+from ai.rag_engine import sync_rag_index
 
 # Page config
 st.set_page_config(page_title="Kategori Yönetimi", page_icon="📂", layout="wide")
@@ -121,10 +121,9 @@ def get_category_stats(db, category_id):
     }
 
 def rebuild_vector_db():
-    """Rebuild vector database after category changes"""
+    """Sync vector database after category changes (re-embeds only the affected items)"""
     try:
-        rag_engine = MenuRAGEngine()
-        rag_engine.rebuild_index()
+        sync_rag_index()
         return True
     except Exception as e:
         st.error(f"Vector DB yeniden oluşturulurken hata: {e}")
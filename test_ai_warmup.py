@@ -0,0 +1,95 @@
+"""
+Test the background AI warm-up and the thread-safe assistant singletons
+Uses fake embeddings and a fake LLM (no Ollama needed)
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from langchain_core.language_models.fake import FakeListLLM
+
+from ai.warmup import AIWarmup, STEPS
+from test_assistant_stream import setup_module as setup_assistant
+
+
+def setup_module(module=None):
+    """Menu database plus a shared RAG engine with fake embeddings"""
+    setup_assistant()
+
+
+def test_get_assistant_builds_once_across_threads():
+    from ai import assistant as assistant_module
+    
+    built = []
+    original_init = assistant_module.MenuAssistant.__init__
+    
+    def slow_init(self):
+        built.append(self)
+        time.sleep(0.05)
+        original_init(self)
+    
+    assistant_module._assistant = None
+    assistant_module.MenuAssistant.__init__ = slow_init
+    try:
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(assistant_module.get_assistant()))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        assistant_module.MenuAssistant.__init__ = original_init
+    
+    assert len(built) == 1
+    assert all(result is built[0] for result in results)
+
+
+def test_warmup_runs_every_step_and_reports_ready():
+    from ai.assistant import get_assistant
+    
+    llm = FakeListLLM(responses=["Merhaba", "Merhaba"])
+    get_assistant().llm = llm
+    
+    warmup = AIWarmup()
+    assert warmup.status()['state'] == 'idle'
+    warmup.start()
+    warmup.start()  # Second call is a no-op
+    assert warmup.wait_until_ready(timeout=10)
+    
+    status = warmup.status()
+    assert status['ready'] and status['error'] is None
+    assert status['completed_steps'] == list(STEPS)
+    assert llm.i == 1  # One generation loaded the model
+
+
+def test_warmup_failure_is_reported():
+    class FailingWarmup(AIWarmup):
+        def _warm_embeddings(self):
+            raise ConnectionError("Ollama is not running")
+    
+    warmup = FailingWarmup()
+    warmup.start()
+    assert not warmup.wait_until_ready(timeout=10)
+    
+    status = warmup.status()
+    assert status['state'] == 'failed'
+    assert status['completed_steps'] == ['vector_store']
+    assert "Ollama is not running" in status['error']
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("AI Warm-up Test")
+    print("=" * 60)
+    setup_module()
+    test_get_assistant_builds_once_across_threads()
+    print("✅ Assistant built once across threads")
+    test_warmup_runs_every_step_and_reports_ready()
+    print("✅ Warm-up loads every stage and reports ready")
+    test_warmup_failure_is_reported()
+    print("✅ Warm-up failures reported")
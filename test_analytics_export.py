@@ -0,0 +1,186 @@
+"""
+Test the incremental Parquet analytics export (high-water marks, day partitions)
+Runs against a temporary SQLite database
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import insert
+
+from database import models
+from database.models import Category, ChatHistory, MenuItem, Order, OrderItem, Table
+from utils.analytics_export import AnalyticsExporter
+
+DAYS = 3
+ORDERS_PER_DAY = 40
+_output_dir = None
+
+
+def setup_module(module=None):
+    """Orders with one item each over the last DAYS days (same updated_at), plus chat history"""
+    global _output_dir
+    tmp_dir = tempfile.mkdtemp()
+    _output_dir = os.path.join(tmp_dir, "analytics")
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmp_dir, 'test_analytics.db')}"
+    models.dispose_engine()
+    models.init_db()
+    
+    session = models.get_session()
+    category = Category(name="Pizzalar")
+    session.add(category)
+    session.flush()
+    session.add_all([
+        MenuItem(category_id=category.id, name="Margherita", price=100.0, order_count=0),
+        MenuItem(category_id=category.id, name="Karışık", price=150.0, order_count=0),
+    ])
+    for i in range(1, 4):
+        session.add(Table(table_number=i))
+    session.commit()
+    
+    # Identical updated_at values exercise the (updated_at, id) high-water mark
+    now = datetime.now().replace(microsecond=0)
+    orders = []
+    for day in range(DAYS):
+        for n in range(ORDERS_PER_DAY):
+            orders.append({
+                'order_number': f"ORD-{day}-{n:03d}", 'table_id': n % 3 + 1, 'session_id': f"s-{day}-{n}",
+                'status': 'paid', 'total_amount': 100.0,
+                'created_at': now - timedelta(days=day, minutes=n), 'updated_at': now,
+            })
+    session.execute(insert(Order), orders)
+    session.execute(insert(OrderItem), [
+        {'order_id': order_id, 'menu_item_id': 1, 'quantity': 1, 'unit_price': 100.0,
+         'subtotal': 100.0, 'created_at': now - timedelta(days=(order_id - 1) // ORDERS_PER_DAY)}
+        for order_id in range(1, DAYS * ORDERS_PER_DAY + 1)
+    ])
+    session.add(ChatHistory(session_id="s-0-0", user_message="Vejetaryen pizza?", ai_response="Margherita"))
+    session.commit()
+    session.close()
+
+
+def read(table):
+    import pyarrow.dataset as ds
+    
+    return ds.dataset(os.path.join(_output_dir, table), format="parquet", partitioning="hive").to_table()
+
+
+def test_first_run_exports_history_by_day():
+    appended = AnalyticsExporter(_output_dir, chunk_size=25).run()
+    assert appended == {
+        'orders': DAYS * ORDERS_PER_DAY,
+        'order_items': DAYS * ORDERS_PER_DAY,
+        'menu_items': 2,
+        'chat_history': 1,
+    }
+    
+    partitions = sorted(os.listdir(os.path.join(_output_dir, "orders")))
+    assert len(partitions) == DAYS and all(name.startswith("day=") for name in partitions)
+    
+    orders = read("orders")
+    assert orders.num_rows == DAYS * ORDERS_PER_DAY
+    assert len(set(orders.column('id').to_pylist())) == DAYS * ORDERS_PER_DAY
+    assert str(orders.schema.field('created_at').type) == "timestamp[us]"
+    assert read("chat_history").column('user_message').to_pylist() == ["Vejetaryen pizza?"]
+
+
+def test_next_run_appends_only_new_and_changed_rows():
+    from database.db_manager import get_db
+    
+    exporter = AnalyticsExporter(_output_dir, chunk_size=25)
+    assert set(exporter.run().values()) == {0}
+    
+    db = get_db()
+    new_order = db.place_order(1, "new-session", [{'item_id': 2, 'quantity': 2}])
+    new_order_id = new_order.id
+    db.update_order_status(1, 'cancelled')
+    db.close()
+    
+    appended = exporter.run()
+    assert appended['orders'] == 2  # the new order and the cancelled one
+    assert appended['order_items'] == 1
+    assert appended['menu_items'] == 0  # Karışık's order_count is not a menu change
+    assert appended['chat_history'] == 0
+    
+    session = models.get_session()
+    session.get(MenuItem, 2).price = 160.0
+    session.commit()
+    session.close()
+    assert exporter.run()['menu_items'] == 1
+    assert sorted(read("menu_items").column('price').to_pylist()) == [100.0, 150.0, 160.0]
+    
+    orders = read("orders").to_pandas()
+    latest = orders.sort_values('updated_at').groupby('id').last()
+    assert latest.loc[1, 'status'] == 'cancelled'
+    assert latest.loc[new_order_id, 'total_amount'] == 300.0
+    assert len(latest) == DAYS * ORDERS_PER_DAY + 1
+    
+    state = exporter.load_state()
+    assert state['order_items']['id'] == DAYS * ORDERS_PER_DAY + 1
+    assert set(exporter.run().values()) == {0}
+
+
+def test_failed_batch_is_not_half_exported():
+    """A batch that fails part way leaves no rows behind and is written once by the next run"""
+    import pyarrow.parquet as pq
+    from database.db_manager import get_db
+    from utils import analytics_export
+    
+    # One new order item on each of two days: a single batch with two day partitions
+    session = models.get_session()
+    first_id = session.query(OrderItem.id).order_by(OrderItem.id.desc()).first()[0] + 1
+    now = datetime.now()
+    session.execute(insert(OrderItem), [
+        {'order_id': 1, 'menu_item_id': 1, 'quantity': 1, 'unit_price': 100.0, 'subtotal': 100.0,
+         'created_at': now - timedelta(days=day)}
+        for day in range(2)
+    ])
+    session.commit()
+    session.close()
+    exported = read("order_items").num_rows
+    
+    exporter = AnalyticsExporter(_output_dir, chunk_size=25)
+    write_table = pq.write_table
+    calls = []
+    
+    def fail_second_partition(table, path, **kwargs):
+        calls.append(path)
+        if len(calls) == 2:
+            raise OSError("disk full")
+        return write_table(table, path, **kwargs)
+    
+    pq.write_table = fail_second_partition
+    try:
+        exporter.run(['order_items'])
+        raise AssertionError("export should have failed")
+    except OSError:
+        pass
+    finally:
+        pq.write_table = write_table
+    
+    assert read("order_items").num_rows == exported
+    assert exporter.load_state()['order_items']['id'] == first_id - 1
+    leftovers = [f for _, _, files in os.walk(_output_dir) for f in files
+                 if f.endswith(analytics_export.TMP_SUFFIX)]
+    assert leftovers == []
+    
+    assert exporter.run(['order_items']) == {'order_items': 2}
+    ids = read("order_items").column('id').to_pylist()
+    assert len(ids) == exported + 2 == len(set(ids))
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Analytics Export Test")
+    print("=" * 60)
+    setup_module()
+    test_first_run_exports_history_by_day()
+    print("✅ First run exports the history, partitioned by day")
+    test_next_run_appends_only_new_and_changed_rows()
+    print("✅ Later runs append only new and changed rows")
+    test_failed_batch_is_not_half_exported()
+    print("✅ A failed batch is not half exported")
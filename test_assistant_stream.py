@@ -0,0 +1,111 @@
+"""
+Test streamed assistant responses
+Runs against a temporary SQLite database and Chroma directory with fake
+embeddings and a fake streaming LLM (no Ollama needed)
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from langchain_core.language_models.fake import FakeStreamingListLLM
+
+from ai import rag_engine
+from test_rag_sync import CountingEmbeddings, setup_module as setup_menu
+
+
+ANSWER = "Margherita vejetaryen bir pizzadır. [PRODUCT:1]"
+
+
+def setup_module(module=None):
+    """Menu database plus a shared RAG engine with fake embeddings"""
+    from database.db_manager import get_db
+    
+    setup_menu()
+    db = get_db()
+    db.get_restaurant_info()  # Creates the default restaurant record
+    db.close()
+    os.environ['EMBEDDING_CACHE_PATH'] = os.path.join(tempfile.mkdtemp(), "embedding_cache.db")
+    rag_engine._rag_engine = rag_engine.MenuRAGEngine(embeddings=CountingEmbeddings())
+
+
+def make_assistant(sleep=0.005):
+    # ai.prompts reads the restaurant record on import
+    from ai.assistant import MenuAssistant
+    from ai.prompts import menu_assistant_prompt_tr
+    
+    assistant = MenuAssistant()
+    assistant.chain_tr = menu_assistant_prompt_tr | FakeStreamingListLLM(responses=[ANSWER], sleep=sleep)
+    return assistant
+
+
+def test_stream_yields_chunks_and_records_latency():
+    assistant = make_assistant()
+    stats = {}
+    chunks = list(assistant.stream_response("Vejetaryen pizzanız var mı?", stats=stats))
+    
+    assert len(chunks) > 1
+    assert "".join(chunks) == ANSWER
+    assert stats['cached'] is False
+    assert stats['tokens'] == len(chunks)
+    assert 0 < stats['ttft'] < stats['total']
+    assert stats['tokens_per_sec'] > 0
+    assert assistant.get_stream_stats()['responses'] == 1
+
+
+def test_streamed_answer_is_cached():
+    assistant = make_assistant()
+    list(assistant.stream_response("En ucuz pizza hangisi?"))
+    
+    stats = {}
+    assert list(assistant.stream_response("en ucuz pizza hangisi", stats=stats)) == [ANSWER]
+    assert stats['cached'] is True
+    assert assistant.get_response("En ucuz pizza hangisi?") == ANSWER
+
+
+def test_stream_error_yields_error_message():
+    from ai.prompts import menu_assistant_prompt_tr
+    
+    assistant = make_assistant()
+    assistant.chain_tr = menu_assistant_prompt_tr | FakeStreamingListLLM(
+        responses=[ANSWER], error_on_chunk_number=0
+    )
+    chunks = list(assistant.stream_response("Tatlı var mı?"))
+    assert chunks == [assistant._get_error_message('tr')]
+    assert assistant.response_cache.get("Tatlı var mı?") is None
+
+
+def test_product_tags_hidden_while_streaming():
+    from utils.ai_helper import hide_product_tags
+    
+    # The marker arrives split over several chunks
+    chunks = ["Margherita ", "[PRO", "DUCT:", "1", "] ve ", "Funghi [PRODUCT:3]", " [not] [P"]
+    raw = []
+    shown = list(hide_product_tags(chunks, raw))
+    
+    assert "".join(shown) == "Margherita  ve Funghi  [not] [P"
+    assert not any("[PRO" in chunk or "DUCT" in chunk for chunk in shown)
+    assert "".join(raw) == "".join(chunks)
+    
+    assistant = make_assistant()
+    raw = []
+    assert "".join(hide_product_tags(assistant.stream_response("Vejetaryen ne var?"), raw)) == \
+        "Margherita vejetaryen bir pizzadır. "
+    assert "".join(raw) == ANSWER
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Assistant Streaming Test")
+    print("=" * 60)
+    setup_module()
+    test_stream_yields_chunks_and_records_latency()
+    print("✅ Response streamed with time-to-first-token recorded")
+    test_streamed_answer_is_cached()
+    print("✅ Streamed answers cached")
+    test_stream_error_yields_error_message()
+    print("✅ Errors reported without caching")
+    test_product_tags_hidden_while_streaming()
+    print("✅ Product markers hidden while streaming")
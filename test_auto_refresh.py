@@ -0,0 +1,93 @@
+"""
+Test the admin dashboard change token and the refresh panel's reload logic
+Runs against a temporary SQLite database
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from database import models
+from database.models import Category, MenuItem, Table
+
+
+def setup_module(module=None):
+    """Point the shared engine at a fresh temporary database with one menu item"""
+    db_path = os.path.join(tempfile.mkdtemp(), "test_auto_refresh.db")
+    os.environ['DATABASE_URL'] = f"sqlite:///{db_path}"
+    models.dispose_engine()
+    models.init_db()
+    
+    session = models.get_session()
+    category = Category(name="Pizzalar")
+    session.add(category)
+    session.flush()
+    session.add(MenuItem(category_id=category.id, name="Margherita", price=120.0, order_count=0))
+    for i in range(1, 3):
+        session.add(Table(table_number=i))
+    session.commit()
+    session.close()
+
+
+def change_token():
+    from database.db_manager import get_db
+    
+    db = get_db()
+    token = db.get_order_change_token()
+    db.close()
+    return token
+
+
+def test_token_changes_on_insert_and_status_update():
+    from database.db_manager import get_db
+    
+    before = change_token()
+    assert change_token() == before
+    
+    db = get_db()
+    order_id = db.place_order(1, "refresh-session", [{'item_id': 1, 'quantity': 1}]).id
+    db.close()
+    placed = change_token()
+    assert placed != before
+    
+    db = get_db()
+    db.update_order_status(order_id, 'preparing')
+    db.close()
+    updated = change_token()
+    assert updated != placed
+    assert updated[0] == placed[0]  # same orders, newer updated_at
+
+
+def test_panel_reloads_only_when_token_changes():
+    import streamlit as st
+    from utils.auto_refresh import load_if_changed
+    
+    st.session_state.clear()
+    token = [1]
+    loads = []
+    
+    def load():
+        loads.append(token[0])
+        return f"data-{token[0]}"
+    
+    assert load_if_changed("orders", lambda: token[0], load) == "data-1"
+    assert load_if_changed("orders", lambda: token[0], load) == "data-1"
+    assert loads == [1]
+    
+    token[0] = 2
+    assert load_if_changed("orders", lambda: token[0], load) == "data-2"
+    assert load_if_changed("orders", lambda: token[0], load) == "data-2"
+    assert loads == [1, 2]
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Auto Refresh Test")
+    print("=" * 60)
+    setup_module()
+    test_token_changes_on_insert_and_status_update()
+    print("✅ Change token moves on insert and status update")
+    test_panel_reloads_only_when_token_changes()
+    print("✅ Panel reloads only when the token changes")
@@ -0,0 +1,120 @@
+"""
+Test the shared engine, sessionmaker and connection pool metrics
+Runs against a temporary SQLite database
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import exc, text
+
+from database import models
+
+POOL_SETTINGS = {'DB_POOL_SIZE': '1', 'DB_MAX_OVERFLOW': '0', 'DB_POOL_TIMEOUT': '0.3'}
+
+
+def setup_module(module=None):
+    """Fresh temporary database behind a one-connection pool"""
+    db_path = os.path.join(tempfile.mkdtemp(), "test_pool.db")
+    os.environ['DATABASE_URL'] = f"sqlite:///{db_path}"
+    os.environ.update(POOL_SETTINGS)
+    models.dispose_engine()
+    models.init_db()
+
+
+def teardown_module(module=None):
+    for key in POOL_SETTINGS:
+        os.environ.pop(key, None)
+    models.dispose_engine()
+
+
+def test_engine_and_sessionmaker_are_shared():
+    from database.db_manager import get_db
+    
+    engines = []
+    threads = [threading.Thread(target=lambda: engines.append(models.get_engine())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert all(engine is models.get_engine() for engine in engines)
+    assert models.get_session_factory() is models.get_session_factory()
+    
+    db = get_db()
+    try:
+        assert db.session.get_bind() is models.get_engine()
+    finally:
+        db.close()
+
+
+def test_metrics_count_checkouts_and_wait_time():
+    models.get_engine().dispose()
+    models._pool_metrics.reset()
+    
+    for _ in range(3):
+        session = models.get_session()
+        session.execute(text("SELECT 1"))
+        session.close()
+    
+    metrics = models.get_pool_metrics()
+    assert metrics['checkouts'] == 3
+    assert metrics['checkins'] == 3
+    assert metrics['connects'] == 1  # the pooled connection is reused
+    assert metrics['checked_out'] == 0
+    assert metrics['pool_size'] == 1
+    
+    # A second checkout waits for the only connection to be returned
+    holder = models.get_session()
+    holder.execute(text("SELECT 1"))
+    releaser = threading.Timer(0.15, holder.close)
+    releaser.start()
+    session = models.get_session()
+    session.execute(text("SELECT 1"))
+    session.close()
+    releaser.join()
+    
+    metrics = models.get_pool_metrics()
+    assert metrics['max_wait_ms'] >= 100
+    assert metrics['max_checked_out'] == 1
+    assert metrics['timeouts'] == 0
+
+
+def test_metrics_count_timeouts():
+    models._pool_metrics.reset()
+    holder = models.get_session()
+    holder.execute(text("SELECT 1"))
+    try:
+        session = models.get_session()
+        started = time.perf_counter()
+        try:
+            session.execute(text("SELECT 1"))
+            raise AssertionError("checkout should have timed out")
+        except exc.TimeoutError:
+            pass
+        finally:
+            session.close()
+        assert time.perf_counter() - started >= 0.25
+    finally:
+        holder.close()
+    
+    assert models.get_pool_metrics()['timeouts'] == 1
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Connection Pool Test")
+    print("=" * 60)
+    setup_module()
+    test_engine_and_sessionmaker_are_shared()
+    print("✅ Engine and sessionmaker are shared")
+    test_metrics_count_checkouts_and_wait_time()
+    print("✅ Pool metrics count checkouts and wait time")
+    test_metrics_count_timeouts()
+    print("✅ Pool metrics count timeouts")
+    teardown_module()
@@ -0,0 +1,244 @@
+"""
+Test the daily sales rollups: incremental updates on status changes and backfill
+Runs against a temporary SQLite database
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from database import models
+from database.models import Category, DailyRollup, MenuItem, Order, Table
+from database.rollups import backfill_rollups, get_rollup_totals
+
+
+def setup_module(module=None):
+    """Two categories, three items, three tables"""
+    db_path = os.path.join(tempfile.mkdtemp(), "test_rollups.db")
+    os.environ['DATABASE_URL'] = f"sqlite:///{db_path}"
+    models.dispose_engine()
+    models.init_db()
+    
+    session = models.get_session()
+    pizzas = Category(name="Pizzalar")
+    drinks = Category(name="İçecekler")
+    session.add_all([pizzas, drinks])
+    session.flush()
+    session.add_all([
+        MenuItem(category_id=pizzas.id, name="Margherita", price=100.0, order_count=0),
+        MenuItem(category_id=pizzas.id, name="Karışık", price=150.0, order_count=0),
+        MenuItem(category_id=drinks.id, name="Ayran", price=20.0, order_count=0),
+    ])
+    for i in range(1, 4):
+        session.add(Table(table_number=i))
+    session.commit()
+    session.close()
+
+
+def place(table_id, lines):
+    from database.db_manager import get_db
+    
+    db = get_db()
+    order = db.place_order(table_id, f"session-{table_id}", [
+        {'item_id': item_id, 'quantity': quantity} for item_id, quantity in lines
+    ])
+    order_id = order.id
+    db.close()
+    return order_id
+
+
+def set_status(order_id, status):
+    from database.db_manager import get_db
+    
+    db = get_db()
+    db.update_order_status(order_id, status)
+    db.close()
+
+
+def snapshot():
+    session = models.get_session()
+    try:
+        return {
+            (r.dimension, r.day, r.dimension_id, r.status): (r.orders, round(r.amount, 2), r.quantity)
+            for r in session.query(DailyRollup).all() if r.orders
+        }
+    finally:
+        session.close()
+
+
+def totals(dimension, status='paid'):
+    today = datetime.now().date()
+    session = models.get_session()
+    try:
+        df = get_rollup_totals(session, dimension, today, today, status=status)
+    finally:
+        session.close()
+    return {row.dimension_id: (row.orders, row.amount, row.quantity) for row in df.itertuples()}
+
+
+def test_status_changes_update_rollups():
+    from database.db_manager import get_db
+    
+    first = place(1, [(1, 2), (3, 1)])   # 2x Margherita + Ayran = 220
+    second = place(2, [(2, 1), (3, 2)])  # Karışık + 2x Ayran = 190
+    third = place(1, [(1, 1)])           # Margherita = 100
+    
+    for status in ('preparing', 'served', 'paid'):
+        set_status(first, status)
+        set_status(second, status)
+    set_status(third, 'cancelled')
+    
+    assert totals('day') == {0: (2, 410.0, 6)}
+    assert totals('table') == {1: (1, 220.0, 3), 2: (1, 190.0, 3)}
+    assert totals('item') == {2: (1, 150.0, 1), 1: (1, 200.0, 2), 3: (2, 60.0, 3)}
+    assert totals('category') == {1: (2, 350.0, 3), 2: (2, 60.0, 3)}
+    session = models.get_session()
+    hours = {session.get(Order, order_id).created_at.hour for order_id in (first, second)}
+    session.close()
+    assert sum(orders for orders, _, _ in totals('hour').values()) == 2
+    assert set(totals('hour')) == hours
+    assert totals('day', status='cancelled') == {0: (1, 100.0, 1)}
+    
+    # Dashboard correction: paid -> served takes the order out again
+    set_status(second, 'served')
+    assert totals('day') == {0: (1, 220.0, 3)}
+    assert 2 not in totals('table')
+    
+    db = get_db()
+    try:
+        assert db.get_daily_stats()['total_revenue'] == 220.0
+    finally:
+        db.close()
+
+
+def test_backfill_matches_incremental():
+    incremental = snapshot()
+    session = models.get_session()
+    try:
+        written = backfill_rollups(session)
+    finally:
+        session.close()
+    assert written['day'] == 2  # paid and cancelled
+    assert snapshot() == incremental
+    
+    # Rebuilding a range leaves other days alone
+    session = models.get_session()
+    try:
+        session.add(DailyRollup(dimension='day', day=datetime.now().date() - timedelta(days=30),
+                                dimension_id=0, status='paid', orders=1, amount=10.0, quantity=1))
+        session.commit()
+        backfill_rollups(session, datetime.now().date())
+        assert session.query(DailyRollup).filter(DailyRollup.amount == 10.0).count() == 1
+    finally:
+        session.close()
+
+
+def test_product_report_reads_rollups():
+    from database.reports import get_category_report, get_product_report
+    
+    today = datetime.now().date()
+    session = models.get_session()
+    try:
+        products = get_product_report(session, today, today)
+        categories = get_category_report(session, today, today)
+    finally:
+        session.close()
+    assert list(products['name']) == ["Margherita", "Ayran"]
+    assert list(products['total_revenue']) == [200.0, 20.0]
+    assert list(categories['name']) == ["Pizzalar", "İçecekler"]
+
+
+def test_table_report_reads_rollups():
+    from database.reports import get_table_report
+    
+    today = datetime.now().date()
+    session = models.get_session()
+    try:
+        tables = get_table_report(session, today, today)
+    finally:
+        session.close()
+    assert list(tables['table_number']) == [1]
+    assert list(tables['revenue']) == [220.0]
+
+
+def test_existing_orders_backfilled_on_first_use():
+    """An upgraded database: paid orders written before the rollup table existed"""
+    from database import rollups
+    from database.db_manager import get_db
+    
+    db_path = os.path.join(tempfile.mkdtemp(), "test_rollups_upgrade.db")
+    os.environ['DATABASE_URL'] = f"sqlite:///{db_path}"
+    models.dispose_engine()
+    models.init_db()
+    session = models.get_session()
+    session.add(Table(table_number=1))
+    session.flush()
+    session.add(Order(order_number="ORD-OLD-1", table_id=1, session_id="old", status='paid',
+                      total_amount=75.0, created_at=datetime.now()))
+    session.commit()
+    session.close()
+    
+    # The rollup table is created empty on the next start and filled on first use
+    DailyRollup.__table__.drop(models.get_engine())
+    rollups._ready_databases.clear()
+    db = get_db()
+    try:
+        assert db.get_daily_stats()['total_revenue'] == 75.0
+    finally:
+        db.close()
+    assert rollups.ensure_rollups() is False
+
+
+def test_first_status_change_backfills_before_bumping():
+    from database import rollups
+    from database.db_manager import get_db
+    
+    db_path = os.path.join(tempfile.mkdtemp(), "test_rollups_paid_first.db")
+    os.environ['DATABASE_URL'] = f"sqlite:///{db_path}"
+    models.dispose_engine()
+    models.init_db()
+    session = models.get_session()
+    session.add(Table(table_number=1))
+    session.flush()
+    session.add_all([
+        Order(order_number="ORD-OLD-1", table_id=1, session_id="old", status='paid',
+              total_amount=10.0, created_at=datetime.now()),
+        Order(order_number="ORD-NEW-1", table_id=1, session_id="new", status='served',
+              total_amount=20.0, created_at=datetime.now()),
+    ])
+    session.commit()
+    new_order_id = session.query(Order.id).filter(Order.order_number == "ORD-NEW-1").scalar()
+    session.close()
+    
+    # Rollup table missing, and an order is paid before any report is opened
+    DailyRollup.__table__.drop(models.get_engine())
+    rollups._ready_databases.clear()
+    set_status(new_order_id, 'paid')
+    
+    db = get_db()
+    try:
+        assert db.get_daily_stats()['total_revenue'] == 30.0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Daily Rollups Test")
+    print("=" * 60)
+    setup_module()
+    test_status_changes_update_rollups()
+    print("✅ Paid/cancelled status changes update the rollups")
+    test_backfill_matches_incremental()
+    print("✅ Backfill rebuilds the same rows")
+    test_product_report_reads_rollups()
+    print("✅ Product and category reports")
+    test_table_report_reads_rollups()
+    print("✅ Table report")
+    test_existing_orders_backfilled_on_first_use()
+    print("✅ Existing orders backfilled on first use")
+    test_first_status_change_backfills_before_bumping()
+    print("✅ First status change backfills before updating")
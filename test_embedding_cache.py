@@ -0,0 +1,99 @@
+"""
+Test the persistent embedding cache
+Runs against a temporary cache file with deterministic fake embeddings
+"""
+
+import hashlib
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from langchain_core.embeddings import Embeddings
+
+from ai.embedding_cache import CachedEmbeddings
+
+
+class CountingEmbeddings(Embeddings):
+    """Hash-based vectors; records every text sent to the model"""
+    
+    def __init__(self):
+        self.calls = []
+    
+    def _vector(self, text):
+        digest = hashlib.sha256(text.encode("utf-8")).digest()
+        return [byte / 255 for byte in digest[:8]]
+    
+    def embed_documents(self, texts):
+        self.calls.extend(texts)
+        return [self._vector(text) for text in texts]
+    
+    def embed_query(self, text):
+        self.calls.append(text)
+        return self._vector(text)
+
+
+def make_cache(path, model="test-model", max_entries=100):
+    model_embeddings = CountingEmbeddings()
+    return CachedEmbeddings(model_embeddings, model, db_path=path, max_entries=max_entries), model_embeddings
+
+
+def test_repeated_texts_are_embedded_once():
+    path = os.path.join(tempfile.mkdtemp(), "cache.db")
+    cache, model = make_cache(path)
+    
+    vectors = cache.embed_documents(["Margherita", "Pepperoni", "Margherita"])
+    assert model.calls == ["Margherita", "Pepperoni"]
+    assert vectors[0] == vectors[2] == model._vector("Margherita")
+    
+    # Queries and documents share the cache
+    assert cache.embed_query("Pepperoni") == model._vector("Pepperoni")
+    assert cache.embed_query("vejetaryen pizza") == model._vector("vejetaryen pizza")
+    assert cache.embed_query("vejetaryen pizza") == model._vector("vejetaryen pizza")
+    assert model.calls == ["Margherita", "Pepperoni", "vejetaryen pizza"]
+    assert cache.stats() == {'hits': 3, 'misses': 3, 'hit_rate': 0.5, 'entries': 3}
+    cache.close()
+    
+    # Persistent across processes; keyed by model name
+    cache, model = make_cache(path)
+    assert cache.embed_documents(["Margherita", "Pepperoni"]) == \
+        [model._vector("Margherita"), model._vector("Pepperoni")]
+    assert model.calls == []
+    cache.close()
+    
+    cache, model = make_cache(path, model="other-model")
+    cache.embed_documents(["Margherita"])
+    assert model.calls == ["Margherita"]
+    cache.close()
+
+
+def test_least_recently_used_entries_are_evicted():
+    path = os.path.join(tempfile.mkdtemp(), "cache.db")
+    cache, model = make_cache(path, max_entries=3)
+    
+    for text in ["a", "b", "c"]:
+        cache.embed_documents([text])
+        time.sleep(0.01)
+    cache.embed_query("a")  # "b" is now the least recently used
+    time.sleep(0.01)
+    cache.embed_documents(["d"])
+    assert cache.stats()['entries'] == 3
+    
+    model.calls.clear()
+    cache.embed_documents(["a", "c", "d"])
+    assert model.calls == []
+    cache.embed_documents(["b"])
+    assert model.calls == ["b"]
+    cache.close()
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Embedding Cache Test")
+    print("=" * 60)
+    test_repeated_texts_are_embedded_once()
+    print("✅ Repeated texts embedded once, cache persisted per model")
+    test_least_recently_used_entries_are_evicted()
+    print("✅ Least recently used entries evicted")
@@ -0,0 +1,87 @@
+"""
+Test hybrid keyword + vector retrieval over the seeded menu
+Uses deterministic fake embeddings (no Ollama needed), so every keyword
+result below comes from the BM25 side or the exact-name fast path
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ai.hybrid_search import matches_where, reciprocal_rank_fusion
+
+_engine = None
+
+
+def setup_module(module=None):
+    """Seeded menu plus a RAG engine over it"""
+    global _engine
+    import test_rag_filters
+    
+    test_rag_filters.setup_module()
+    _engine = test_rag_filters._engine
+
+
+def names(docs):
+    return [doc.metadata['name'] for doc in docs]
+
+
+def test_exact_name_comes_first():
+    assert names(_engine.hybrid_search("Margherita var mı?", k=3))[0] == "Margherita"
+    # Longest name wins; Turkish casing and diacritics are folded
+    assert names(_engine.hybrid_search("TON BALIKLI SALATA istiyorum", k=3))[:2] == \
+        ["Ton Balıklı Salata", "Ton Balıklı"]
+    assert names(_engine.hybrid_search("do you have caesar salad", k=1)) == ["Sezar Salata"]
+    # Filters still apply to exact matches
+    assert "Margherita" not in names(_engine.hybrid_search("Margherita var mı?", k=3, where={"is_vegan": True}))
+
+
+def test_keywords_match_word_forms():
+    # "mantarlı" shares its prefix with "mantar" in Karışık's description
+    assert names(_engine.keyword_index.search("mantarlı bir şey", k=1)) == ["Karışık"]
+    found = _engine.keyword_index.search("tuna", k=5)
+    assert set(names(found)) == {"Ton Balıklı", "Ton Balıklı Salata"}
+
+
+def test_find_item_and_allergen_check():
+    from database.db_manager import get_db
+    
+    db = get_db()
+    try:
+        db.get_restaurant_info()  # ai.prompts reads the restaurant record on import
+    finally:
+        db.close()
+    from ai.assistant import MenuAssistant
+    
+    assert _engine.find_item("dört peynir").metadata['name'] == "Dört Peynir"
+    
+    assistant = MenuAssistant.__new__(MenuAssistant)
+    assistant.rag_engine = _engine
+    is_safe, _ = assistant.check_allergens("Sütlaç", ["süt"])
+    assert not is_safe
+    is_safe, _ = assistant.check_allergens("Limonata", ["gluten", "süt"])
+    assert is_safe
+
+
+def test_fusion_and_where_helpers():
+    assert reciprocal_rank_fusion([["a", "b", "c"], ["c", "a"]])[:2] == ["a", "c"]
+    metadata = {"price": 50.0, "is_vegan": False, "allergen_dairy": True}
+    assert matches_where(metadata, {"price": {"$lte": 60}})
+    assert not matches_where(metadata, {"$and": [{"price": {"$lte": 60}}, {"is_vegan": True}]})
+    assert matches_where(metadata, {"$or": [{"is_vegan": True}, {"allergen_dairy": True}]})
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Hybrid Search Test")
+    print("=" * 60)
+    setup_module()
+    test_exact_name_comes_first()
+    print("✅ Exact dish names first")
+    test_keywords_match_word_forms()
+    print("✅ Keyword matches across Turkish word forms")
+    test_find_item_and_allergen_check()
+    print("✅ Item lookup and allergen check")
+    test_fusion_and_where_helpers()
+    print("✅ Fusion and metadata filters")
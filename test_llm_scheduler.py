@@ -0,0 +1,146 @@
+"""
+Test the LLM request scheduler: concurrency limit, fair queueing, shedding
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ai.scheduler import LLMScheduler, SchedulerBusy
+
+
+def start(target, *args):
+    thread = threading.Thread(target=target, args=args)
+    thread.start()
+    return thread
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.005)
+    assert condition()
+
+
+def test_concurrency_limit():
+    scheduler = LLMScheduler(max_concurrent=2, max_queue=20, queue_timeout=10)
+    running = []
+    peak = []
+    lock = threading.Lock()
+    
+    def generate():
+        with scheduler.slot("masa"):
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+            time.sleep(0.03)
+            with lock:
+                running.pop()
+    
+    threads = [start(generate) for _ in range(8)]
+    for thread in threads:
+        thread.join()
+    
+    assert max(peak) == 2
+    assert scheduler.stats()['served'] == 8
+    assert scheduler.stats()['active'] == 0
+
+
+def test_round_robin_between_tables_and_positions():
+    scheduler = LLMScheduler(max_concurrent=1, max_queue=20, queue_timeout=10)
+    scheduler.acquire("busy")
+    
+    order = []
+    positions = {}
+    
+    def ask(name, table):
+        def on_position(position):
+            positions[name] = position
+        with scheduler.slot(table, on_position=on_position):
+            order.append(name)
+            time.sleep(0.02)
+    
+    # Table 1 asks three questions before table 2 asks one
+    threads = []
+    for name, table in [("1a", 1), ("1b", 1), ("1c", 1), ("2a", 2)]:
+        threads.append(start(ask, name, table))
+        wait_for(lambda: name in positions)
+    
+    # Table 2's question goes ahead of table 1's second one; waiting positions update
+    wait_for(lambda: positions["1b"] == 3)
+    assert positions == {"1a": 1, "1b": 3, "1c": 4, "2a": 2}
+    
+    scheduler.release()
+    for thread in threads:
+        thread.join()
+    assert order == ["1a", "2a", "1b", "1c"]
+
+
+def test_full_queue_and_deadline_are_shed():
+    scheduler = LLMScheduler(max_concurrent=1, max_queue=1, queue_timeout=0.1)
+    scheduler.acquire("busy")
+    
+    # One question may wait; it is shed when its deadline passes
+    waiting = []
+    
+    def ask():
+        try:
+            scheduler.acquire("masa")
+            waiting.append("served")
+        except SchedulerBusy as e:
+            waiting.append(e.reason)
+    
+    thread = start(ask)
+    wait_for(lambda: scheduler.stats()['waiting'] == 1)
+    
+    # The queue is full for a second question
+    try:
+        scheduler.acquire("masa 2")
+        assert False, "expected SchedulerBusy"
+    except SchedulerBusy as e:
+        assert e.reason == 'queue_full'
+    
+    thread.join()
+    assert waiting == ['deadline']
+    stats = scheduler.stats()
+    assert stats['shed_queue_full'] == 1 and stats['shed_deadline'] == 1
+    assert stats['waiting'] == 0 and stats['active'] == 1
+    scheduler.release()
+
+
+def test_assistant_answers_with_fallback_when_shed():
+    from test_assistant_stream import setup_module as setup_assistant, make_assistant
+    
+    setup_assistant()
+    assistant = make_assistant()
+    assistant.scheduler = LLMScheduler(max_concurrent=1, max_queue=5, queue_timeout=0.1)
+    assistant.scheduler.acquire("busy")
+    
+    stats = {}
+    answer = "".join(assistant.stream_response("Vejetaryen pizza var mı?", stats=stats, table=4))
+    assert answer.startswith("⏳")
+    assert "[PRODUCT:" in answer
+    assert stats['shed'] is True
+    # A fallback is not cached as the real answer
+    assert assistant.response_cache.get("Vejetaryen pizza var mı?") is None
+    
+    assistant.scheduler.release()
+    answer = "".join(assistant.stream_response("Vejetaryen pizza var mı?", table=4))
+    assert not answer.startswith("⏳")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("LLM Scheduler Test")
+    print("=" * 60)
+    test_concurrency_limit()
+    print("✅ Concurrency limited")
+    test_round_robin_between_tables_and_positions()
+    print("✅ Tables served round-robin with queue positions")
+    test_full_queue_and_deadline_are_shed()
+    print("✅ Full queue and expired deadlines shed")
+    test_assistant_answers_with_fallback_when_shed()
+    print("✅ Assistant falls back when shed")
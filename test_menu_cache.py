@@ -0,0 +1,148 @@
+"""
+Test the cached menu snapshot and its version-based invalidation
+Runs against a temporary SQLite database
+"""
+
+import os
+import sys
+import tempfile
+from dataclasses import FrozenInstanceError
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import event
+
+from database import models, menu_cache
+from database.models import Category, MenuItem, Table
+
+
+def setup_module(module=None):
+    """Point the shared engine at a fresh temporary database with a small menu"""
+    db_path = os.path.join(tempfile.mkdtemp(), "test_menu_cache.db")
+    os.environ['DATABASE_URL'] = f"sqlite:///{db_path}"
+    models.dispose_engine()
+    models.init_db()
+    menu_cache.clear_menu_cache()
+    
+    session = models.get_session()
+    pizzas = Category(name="Pizzalar", display_order=1)
+    drinks = Category(name="İçecekler", display_order=2)
+    session.add_all([pizzas, drinks])
+    session.flush()
+    session.add_all([
+        MenuItem(category_id=pizzas.id, name="Margherita", price=120.0, is_vegetarian=True, order_count=0),
+        MenuItem(category_id=pizzas.id, name="Pepperoni", price=150.0, is_spicy=True, order_count=0),
+        MenuItem(category_id=drinks.id, name="Ayran", price=25.0, order_count=0),
+        MenuItem(category_id=drinks.id, name="Kola", price=35.0, is_available=False, order_count=0),
+    ])
+    session.add(Table(table_number=1))
+    session.commit()
+    session.close()
+
+
+def count_statements(operation):
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    engine = models.get_engine()
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        result = operation()
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    return result, statements
+
+
+def test_snapshot_hot_path_runs_no_sql():
+    menu = menu_cache.get_menu_snapshot()
+    assert [cat.name for cat in menu.categories] == ["Pizzalar", "İçecekler"]
+    assert [item.name for item in menu.items] == ["Margherita", "Pepperoni", "Ayran"]
+    assert [item.name for item in menu.items_in_category(menu.category_by_name("Pizzalar").id)] == \
+        ["Margherita", "Pepperoni"]
+    assert menu.restaurant.name_tr
+    assert [item.name for item in menu.index.filter(vegetarian=True)] == ["Margherita"]
+    assert menu.index is menu.index
+    
+    again, statements = count_statements(menu_cache.get_menu_snapshot)
+    assert again is menu
+    assert statements == []
+    
+    try:
+        menu.items[0].price = 1
+        assert False, "snapshot items must be read-only"
+    except FrozenInstanceError:
+        pass
+
+
+def test_menu_writes_invalidate_snapshot():
+    from database.db_manager import get_db
+    
+    menu = menu_cache.get_menu_snapshot()
+    
+    db = get_db()
+    db.update_menu_item(menu.items[0].id, price=130.0)
+    db.close()
+    
+    updated = menu_cache.get_menu_snapshot()
+    assert updated is not menu
+    assert updated.items[0].price == 130.0
+    
+    # Direct session writes (as in the management pages) are tracked too
+    session = models.get_session()
+    session.query(Category).filter(Category.name == "İçecekler").one().is_active = False
+    session.commit()
+    session.close()
+    
+    assert [cat.name for cat in menu_cache.get_menu_snapshot().categories] == ["Pizzalar"]
+
+
+def test_orders_do_not_invalidate_snapshot():
+    from database.db_manager import get_db
+    
+    menu = menu_cache.get_menu_snapshot()
+    version = menu_cache.get_menu_version()
+    
+    db = get_db()
+    order = db.create_order(1, "session-1")
+    db.add_order_item(order.id, menu.items[0].id, quantity=2)
+    db.place_order(1, "session-1", [{'item_id': menu.items[1].id, 'quantity': 1}])
+    db.close()
+    
+    assert menu_cache.get_menu_version() == version
+    assert menu_cache.get_menu_snapshot() is menu
+
+
+def test_rolled_back_changes_do_not_invalidate():
+    version = menu_cache.get_menu_version()
+    
+    session = models.get_session()
+    session.add(Category(name="Tatlılar"))
+    session.flush()
+    session.rollback()
+    session.close()
+    
+    assert menu_cache.get_menu_version() == version
+
+
+def test_ttl_expiry_reloads():
+    menu = menu_cache.get_menu_snapshot()
+    os.environ['MENU_CACHE_TTL'] = '0'
+    try:
+        assert menu_cache.get_menu_snapshot() is not menu
+    finally:
+        os.environ.pop('MENU_CACHE_TTL')
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Menu Cache Test")
+    print("=" * 60)
+    setup_module()
+    test_snapshot_hot_path_runs_no_sql()
+    print("✅ Cached menu renders without SQL")
+    test_menu_writes_invalidate_snapshot()
+    print("✅ Menu writes invalidate the snapshot")
+    test_orders_do_not_invalidate_snapshot()
+    test_rolled_back_changes_do_not_invalidate()
+    print("✅ Orders and rollbacks keep the snapshot")
+    test_ttl_expiry_reloads()
+    print("✅ TTL fallback")
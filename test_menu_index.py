@@ -0,0 +1,74 @@
+"""
+Test that the menu filter index matches the list comprehension filters
+"""
+
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from benchmark_menu_filter import build_catalog, filter_combinations, legacy_filter_items, indexed_filter_items
+from database.menu_index import MenuIndex
+
+
+def test_index_matches_list_filters():
+    items = build_catalog(500)
+    index = MenuIndex(items)
+    
+    for filters in filter_combinations():
+        expected = [item.id for item in legacy_filter_items(items, filters)]
+        assert [item.id for item in indexed_filter_items(index, filters)] == expected, filters
+
+
+def test_price_bounds_and_unknown_category():
+    items = build_catalog(50)
+    index = MenuIndex(items)
+    cheapest = min(item.price for item in items)
+    
+    assert index.filter(max_price=cheapest - 0.01) == []
+    assert [item.price for item in index.filter(max_price=cheapest)] == [cheapest]
+    assert index.filter(category_id=999) == []
+    assert index.filter() == items
+
+
+def test_empty_menu():
+    index = MenuIndex([])
+    assert index.filter(vegetarian=True, max_price=100, search="pizza") == []
+
+
+def test_search_cache_is_bounded_across_threads():
+    """Sessions share one index; concurrent searches must not break the cache eviction"""
+    items = build_catalog(200)
+    index = MenuIndex(items)
+    errors = []
+    
+    def search(offset):
+        try:
+            for i in range(500):
+                index.search_mask(f"term {offset}-{i}")
+                index.search_mask("pizza")
+        except Exception as e:
+            errors.append(e)
+    
+    threads = [threading.Thread(target=search, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert errors == []
+    assert len(index._search_masks) <= MenuIndex.SEARCH_CACHE_SIZE
+    assert index.search_mask("pizza") == MenuIndex(items).search_mask("pizza")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Menu Index Test")
+    print("=" * 60)
+    test_index_matches_list_filters()
+    test_price_bounds_and_unknown_category()
+    test_empty_menu()
+    print("✅ Index filters match list filters")
+    test_search_cache_is_bounded_across_threads()
+    print("✅ Search cache is bounded across threads")
@@ -0,0 +1,147 @@
+"""
+Test Turkish-aware full-text menu search (SQLite FTS5)
+Runs against a temporary SQLite database
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from database import models
+from database.models import Category, MenuItem
+from database.search import turkish_fold
+
+
+def setup_module(module=None):
+    """Point the shared engine at a fresh temporary database with a Turkish menu"""
+    db_path = os.path.join(tempfile.mkdtemp(), "test_search.db")
+    os.environ['DATABASE_URL'] = f"sqlite:///{db_path}"
+    models.dispose_engine()
+    models.init_db()
+    
+    session = models.get_session()
+    category = Category(name="Ana Yemekler")
+    session.add(category)
+    session.flush()
+    session.add_all([
+        MenuItem(category_id=category.id, name="ISPANAKLI BÖREK", name_en="Spinach Pastry",
+                 description="Çıtır yufka", price=90.0),
+        MenuItem(category_id=category.id, name="Tavuk Şiş", name_en="Chicken Skewer",
+                 description="Izgara tavuk", ingredients="tavuk, biber", price=180.0),
+        MenuItem(category_id=category.id, name="Margherita", name_en="Margherita",
+                 description="Domates, mozzarella, fesleğen", price=120.0),
+        MenuItem(category_id=category.id, name="Izgara Köfte", name_en="Grilled Meatballs",
+                 description="Yanında ıspanak salatası", price=160.0),
+        MenuItem(category_id=category.id, name="Günün Çorbası", description="Mercimek",
+                 price=60.0, is_available=False),
+    ])
+    session.commit()
+    session.close()
+
+
+def search(term, **kwargs):
+    from database.db_manager import get_db
+    
+    db = get_db()
+    names = [item.name for item in db.search_menu_items(term, **kwargs)]
+    db.close()
+    return names
+
+
+def test_turkish_fold():
+    assert turkish_fold("ISPANAK") == turkish_fold("ıspanak") == "ispanak"
+    assert turkish_fold("İSKENDER") == "iskender"
+    assert turkish_fold("Şiş Köfte") == "sis kofte"
+    assert turkish_fold("Fesleğen Çorbası") == "feslegen corbasi"
+    assert turkish_fold(None) == ""
+
+
+def test_casing_diacritics_and_ranking():
+    # Name match ranks above a description-only match
+    assert search("ıspanak") == ["ISPANAKLI BÖREK", "Izgara Köfte"]
+    assert search("sis") == ["Tavuk Şiş"]
+    assert search("IZGARA") == ["Izgara Köfte", "Tavuk Şiş"]
+    assert search("skewer") == ["Tavuk Şiş"]
+    assert search("biber") == ["Tavuk Şiş"]
+
+
+def test_prefix_and_multiple_words():
+    assert search("marg") == ["Margherita"]
+    assert search("domates fes") == ["Margherita"]
+    # Every word is a prefix, not only the last one
+    assert search("marg moz") == ["Margherita"]
+    assert search("dom fesleğen") == ["Margherita"]
+    assert search("tav izg") == ["Tavuk Şiş"]
+    assert search("domates tavuk") == []
+    assert search("   ") == []
+
+
+def test_unavailable_items_filtered():
+    assert search("mercimek") == []
+    assert search("mercimek", available_only=False) == ["Günün Çorbası"]
+
+
+def test_index_follows_item_writes():
+    from database.db_manager import get_db
+    
+    db = get_db()
+    item = db.search_menu_items("margherita")[0]
+    db.update_menu_item(item.id, name="Pizza Napoli", description="Ançüez, kapari")
+    db.close()
+    
+    assert search("mozzarella") == []
+    assert search("ancuez") == ["Pizza Napoli"]
+    
+    session = models.get_session()
+    session.delete(session.query(MenuItem).filter(MenuItem.name == "Pizza Napoli").one())
+    session.commit()
+    session.close()
+    
+    assert search("napoli") == []
+
+
+def test_fallback_without_fts_table():
+    from database.db_manager import get_db
+    from database.search import ensure_search_index
+    
+    engine = models.get_engine()
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DROP TABLE menu_items_fts")
+    try:
+        assert search("ıspanak") == ["ISPANAKLI BÖREK", "Izgara Köfte"]
+        assert search("izg") == ["Izgara Köfte", "Tavuk Şiş"]
+        assert search("tav izg") == ["Tavuk Şiş"]
+        
+        # The fallback leaves the caller's pending changes alone
+        db = get_db()
+        try:
+            item = db.session.query(MenuItem).filter(MenuItem.name == "Tavuk Şiş").one()
+            item.price = 185.0
+            assert [i.name for i in db.search_menu_items("köfte")] == ["Izgara Köfte"]
+            db.session.commit()
+        finally:
+            db.close()
+        session = models.get_session()
+        assert session.query(MenuItem.price).filter(MenuItem.name == "Tavuk Şiş").scalar() == 185.0
+        session.close()
+    finally:
+        assert ensure_search_index(engine)
+    assert search("sis") == ["Tavuk Şiş"]
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Menu Search Test")
+    print("=" * 60)
+    setup_module()
+    test_turkish_fold()
+    test_casing_diacritics_and_ranking()
+    test_prefix_and_multiple_words()
+    test_unavailable_items_filtered()
+    print("✅ Turkish-aware ranked search")
+    test_index_follows_item_writes()
+    print("✅ Index follows item writes")
+    test_fallback_without_fts_table()
+    print("✅ Fallback without FTS")
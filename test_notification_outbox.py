@@ -0,0 +1,282 @@
+"""
+Test background notification delivery through the outbox
+Runs against a temporary SQLite database and a local SMTP stand-in server
+"""
+
+import os
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from database import models
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP for smtplib: EHLO, AUTH, MAIL, RCPT, DATA, QUIT"""
+    
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+    
+    def handle(self):
+        server = self.server
+        server.connections += 1
+        self.reply("220 localhost test SMTP")
+        
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode().strip().upper()
+            
+            if command.startswith("EHLO"):
+                self.reply("250-localhost")
+                self.reply("250 AUTH PLAIN")
+            elif command.startswith("AUTH"):
+                self.reply("235 Authentication successful")
+            elif command.startswith(("HELO", "MAIL", "RCPT", "RSET", "NOOP")):
+                self.reply("250 OK")
+            elif command == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = []
+                for data_line in self.rfile:
+                    if data_line in (b".\r\n", b".\n"):
+                        break
+                    data.append(data_line)
+                if server.fail_next:
+                    server.fail_next -= 1
+                    self.reply("451 Try again later")
+                else:
+                    server.messages.append(b"".join(data))
+                    self.reply("250 OK queued")
+            elif command == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Not implemented")
+
+
+def start_smtp_server():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), SMTPHandler)
+    server.daemon_threads = True
+    server.connections = 0
+    server.fail_next = 0
+    server.messages = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def setup_module(module=None):
+    """Point the shared engine at a fresh temporary database"""
+    db_path = os.path.join(tempfile.mkdtemp(), "test_outbox.db")
+    os.environ['DATABASE_URL'] = f"sqlite:///{db_path}"
+    models.dispose_engine()
+    models.init_db()
+
+
+def make_worker(server, **kwargs):
+    import smtplib
+    from utils.notification_outbox import OutboxWorker
+    
+    port = server.server_address[1]
+    worker = OutboxWorker(smtp_factory=lambda: smtplib.SMTP("127.0.0.1", port, timeout=5), **kwargs)
+    worker.email_from = "restaurant@example.com"
+    return worker
+
+
+def enqueue(count, subject="Test"):
+    from database.db_manager import get_db
+    
+    db = get_db()
+    for i in range(count):
+        db.enqueue_outbox_message('email', f"Mesaj {i}", recipient="admin@example.com", subject=subject)
+    db.close()
+
+
+def clear_outbox():
+    session = models.get_session()
+    session.query(models.NotificationOutbox).delete()
+    session.commit()
+    session.close()
+
+
+def outbox_counts():
+    from database.db_manager import get_db
+    
+    db = get_db()
+    counts = db.get_outbox_counts()
+    db.close()
+    return counts
+
+
+def test_batch_uses_one_connection():
+    clear_outbox()
+    server = start_smtp_server()
+    worker = make_worker(server, batch_size=10)
+    
+    enqueue(6)
+    assert worker.run_once() == 6
+    assert worker.run_once() == 0
+    worker.stop()
+    server.shutdown()
+    
+    assert len(server.messages) == 6
+    assert server.connections == 1
+    assert outbox_counts() == {'sent': 6}
+
+
+def test_retry_with_backoff_then_dead_letter():
+    clear_outbox()
+    server = start_smtp_server()
+    
+    # Temporary failure, retried as soon as it is due
+    worker = make_worker(server, retry_base=0)
+    server.fail_next = 1
+    enqueue(1, subject="Retry")
+    worker.run_once()
+    assert outbox_counts() == {'pending': 1}
+    worker.run_once()
+    assert outbox_counts() == {'sent': 1}
+    
+    # Backoff: the next attempt is scheduled in the future
+    worker = make_worker(server, retry_base=60)
+    server.fail_next = 1
+    enqueue(1, subject="Later")
+    worker.run_once()
+    assert worker.run_once() == 0
+    
+    # Permanent failure ends up in the dead letter state
+    clear_outbox()
+    worker = make_worker(server, retry_base=0, max_attempts=2)
+    server.fail_next = 10
+    enqueue(1, subject="Dead")
+    worker.run_once()
+    worker.run_once()
+    assert worker.run_once() == 0
+    assert outbox_counts() == {'dead': 1}
+    worker.stop()
+    server.shutdown()
+
+
+@contextmanager
+def smtp_settings(server):
+    """Point the default outbox worker at the local SMTP server"""
+    settings = {
+        'EMAIL_ENABLED': 'true',
+        'EMAIL_FROM': 'admin@example.com',
+        'EMAIL_PASSWORD': 'secret',
+        'SMTP_SERVER': '127.0.0.1',
+        'SMTP_PORT': str(server.server_address[1]),
+        'SMTP_STARTTLS': 'false',
+    }
+    previous = {key: os.environ.get(key) for key in settings}
+    os.environ.update(settings)
+    try:
+        yield
+    finally:
+        for key, value in previous.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def wait_for_messages(server, count, timeout=5):
+    deadline = time.time() + timeout
+    while len(server.messages) < count and time.time() < deadline:
+        time.sleep(0.05)
+
+
+def test_notify_does_not_wait_for_smtp():
+    """Enqueueing is one insert; the background worker delivers it"""
+    from utils import notification_outbox
+    from utils.notification_manager import NotificationManager
+    
+    clear_outbox()
+    server = start_smtp_server()
+    try:
+        with smtp_settings(server):
+            nm = NotificationManager()
+            started = time.perf_counter()
+            nm.notify_new_order(1, 3, 120.0, [{'quantity': 1, 'name': 'Margherita'}])
+            elapsed = time.perf_counter() - started
+            wait_for_messages(server, 1)
+    finally:
+        notification_outbox.get_outbox_worker().stop()
+        server.shutdown()
+    
+    assert elapsed < 0.5, f"notify took {elapsed:.2f}s"
+    assert len(server.messages) == 1
+    assert outbox_counts() == {'sent': 1}
+
+
+def test_pending_messages_resume_on_startup():
+    """Messages left by a previous process are sent without a new enqueue"""
+    from utils import notification_outbox
+    
+    clear_outbox()
+    enqueue(2, subject="Left over")
+    # A fresh process: no worker yet, startup check not done
+    notification_outbox._outbox_worker = None
+    notification_outbox._startup_checked = False
+    
+    server = start_smtp_server()
+    try:
+        with smtp_settings(server):
+            notification_outbox.resume_pending_deliveries()
+            wait_for_messages(server, 2)
+            deadline = time.time() + 5
+            while outbox_counts() != {'sent': 2} and time.time() < deadline:
+                time.sleep(0.05)
+    finally:
+        if notification_outbox._outbox_worker is not None:
+            notification_outbox._outbox_worker.stop()
+        server.shutdown()
+    
+    assert len(server.messages) == 2
+    assert outbox_counts() == {'sent': 2}
+    
+    # Nothing pending: the check does not start a worker
+    notification_outbox._outbox_worker = None
+    notification_outbox._startup_checked = False
+    notification_outbox.resume_pending_deliveries()
+    assert notification_outbox._outbox_worker is None
+
+
+def test_missing_outbox_table_does_not_break_pages():
+    """An upgraded install without the table: the startup check logs and gives up once"""
+    from add_notification_tables import add_notification_tables
+    from utils import notification_outbox
+    
+    models.NotificationOutbox.__table__.drop(models.get_engine())
+    notification_outbox._outbox_worker = None
+    notification_outbox._startup_checked = False
+    try:
+        notification_outbox.resume_pending_deliveries()
+        assert notification_outbox._startup_checked
+        assert notification_outbox._outbox_worker is None
+    finally:
+        assert add_notification_tables()
+    
+    assert outbox_counts() == {}
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Notification Outbox Test")
+    print("=" * 60)
+    setup_module()
+    test_batch_uses_one_connection()
+    print("✅ One SMTP connection per batch")
+    test_retry_with_backoff_then_dead_letter()
+    print("✅ Retry with backoff and dead letter")
+    test_notify_does_not_wait_for_smtp()
+    print("✅ Notifications delivered in the background")
+    test_pending_messages_resume_on_startup()
+    print("✅ Pending messages resume on startup")
+    test_missing_outbox_table_does_not_break_pages()
+    print("✅ Missing outbox table does not break pages")
@@ -0,0 +1,138 @@
+"""
+Test the shared, database-backed notification store
+Runs against a temporary SQLite database
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import event
+
+from database import models
+
+
+def setup_module(module=None):
+    """Point the shared engine at a fresh temporary database"""
+    db_path = os.path.join(tempfile.mkdtemp(), "test_notifications.db")
+    os.environ['DATABASE_URL'] = f"sqlite:///{db_path}"
+    models.dispose_engine()
+    models.init_db()
+
+
+def count_statements(operation):
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    engine = models.get_engine()
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        result = operation()
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    return result, statements
+
+
+def test_notifications_reach_every_session():
+    from utils.notification_manager import NotificationManager, get_notification_store
+    
+    get_notification_store().clear()
+    customer = NotificationManager()
+    staff = NotificationManager()
+    staff_cursor = staff.store.latest_cursor()
+    
+    customer.notify_new_order(1, 5, 240.0, [{'quantity': 2, 'name': 'Margherita'}])
+    customer.notify_table_call(5, 'bill')
+    
+    new, staff_cursor = staff.store.changes_since(staff_cursor)
+    assert [n['type'] for n in new] == ['new_order', 'table_call']
+    assert new[0]['table_number'] == 5
+    assert staff.store.changes_since(staff_cursor)[0] == []
+    
+    # Counts are kept in memory - no query per badge render
+    count, statements = count_statements(staff.get_notification_count)
+    assert count == 2 and statements == []
+    
+    unread = staff.get_unread_notifications()
+    assert [n['type'] for n in unread] == ['table_call', 'new_order']
+    
+    staff.mark_as_read(unread[0]['id'])
+    assert customer.get_notification_count() == 1
+    staff.mark_all_as_read()
+    assert staff.get_notification_count() == 0
+    assert staff.get_unread_notifications() == []
+
+
+def test_ring_buffer_and_persistence():
+    from utils.notification_manager import NotificationStore
+    
+    store = NotificationStore(buffer_size=5)
+    store.clear()
+    for i in range(12):
+        store.publish('low_stock', f"Stok {i}", priority='high')
+    
+    recent = store.recent()
+    assert len(recent) == 5
+    assert recent[0]['title'] == "Stok 11"
+    assert store.total_count() == 12
+    
+    # A restarted process reloads counts and the latest notifications from the database
+    store.reset()
+    assert store.unread_count() == 12
+    assert store.total_count() == 12
+    assert [n['title'] for n in store.recent(2)] == ["Stok 11", "Stok 10"]
+    assert len(store.unread(limit=3)) == 3
+
+
+def test_unread_lookup_uses_index():
+    from database.db_manager import get_db
+    
+    db = get_db()
+    _, statements = count_statements(lambda: db.get_unread_notifications(limit=5))
+    with models.get_engine().connect() as conn:
+        plan = conn.exec_driver_sql(
+            f"EXPLAIN QUERY PLAN {statements[0]}", (False, 5)
+        ).fetchall()
+    db.close()
+    
+    assert "ix_notifications_is_read_id" in " ".join(row[-1] for row in plan)
+
+
+def test_table_keeps_newest_rows_only():
+    from database.db_manager import get_db
+    from utils.notification_manager import NotificationStore
+    
+    store = NotificationStore(buffer_size=5, retention=10)
+    store.clear()
+    for i in range(25):
+        store.publish('low_stock', f"Stok {i}")
+    
+    db = get_db()
+    try:
+        titles = [n.title for n in db.get_recent_notifications(limit=100)]
+    finally:
+        db.close()
+    assert titles == [f"Stok {i}" for i in range(24, 14, -1)]
+    assert store.total_count() == 10
+    assert store.unread_count() == 10
+    assert [n['title'] for n in store.recent(2)] == ["Stok 24", "Stok 23"]
+    
+    # Below the retention nothing is deleted
+    _, statements = count_statements(lambda: NotificationStore(retention=100).publish('low_stock', "Stok 25"))
+    assert not any(statement.startswith("DELETE") for statement in statements)
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Notification Store Test")
+    print("=" * 60)
+    setup_module()
+    test_notifications_reach_every_session()
+    print("✅ Notifications reach every session")
+    test_ring_buffer_and_persistence()
+    print("✅ Bounded buffer, persistent counts")
+    test_table_keeps_newest_rows_only()
+    print("✅ Notifications table keeps the newest rows only")
+    test_unread_lookup_uses_index()
+    print("✅ Unread lookup uses index")
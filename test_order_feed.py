@@ -0,0 +1,133 @@
+"""
+Test the shared order change feed used for new order detection
+Runs against a temporary SQLite database
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import event
+
+from database import models
+from database.models import Category, MenuItem, Table, Order
+
+
+def setup_module(module=None):
+    """Point the shared engine at a fresh temporary database with one old order"""
+    from database.db_manager import get_db
+    
+    db_path = os.path.join(tempfile.mkdtemp(), "test_feed.db")
+    os.environ['DATABASE_URL'] = f"sqlite:///{db_path}"
+    models.dispose_engine()
+    models.init_db()
+    
+    session = models.get_session()
+    category = Category(name="Pizzalar")
+    session.add(category)
+    session.flush()
+    session.add(MenuItem(category_id=category.id, name="Margherita", price=120.0, order_count=0))
+    for i in range(1, 4):
+        session.add(Table(table_number=i))
+    session.commit()
+    session.close()
+    
+    db = get_db()
+    db.place_order(1, "old-session", [{'item_id': 1, 'quantity': 1}])
+    db.close()
+
+
+def place(table_id):
+    from database.db_manager import get_db
+    
+    db = get_db()
+    order = db.place_order(table_id, f"session-{table_id}", [{'item_id': 1, 'quantity': 2}])
+    order_id = order.id
+    db.close()
+    return order_id
+
+
+def test_subscribers_share_one_feed():
+    from database.order_feed import OrderFeed
+    
+    feed = OrderFeed(poll_interval=0)
+    tab_a = feed.latest_cursor()
+    tab_b = feed.latest_cursor()
+    
+    # Existing orders are not reported as new
+    assert feed.changes_since(tab_a) == ([], tab_a)
+    
+    first = place(2)
+    second = place(3)
+    
+    events, tab_a = feed.changes_since(tab_a)
+    assert [e['order_id'] for e in events] == [first, second]
+    assert events[0]['table_number'] == 2
+    
+    # The second tab gets the same events from the buffer, and nothing twice
+    events, tab_b = feed.changes_since(tab_b)
+    assert [e['order_id'] for e in events] == [first, second]
+    assert feed.changes_since(tab_a)[0] == []
+
+
+def test_poll_interval_limits_database_reads():
+    from database.order_feed import OrderFeed
+    
+    feed = OrderFeed(poll_interval=60)
+    cursors = [feed.latest_cursor() for _ in range(5)]
+    
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    engine = models.get_engine()
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        for cursor in cursors:
+            feed.changes_since(cursor)
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    
+    assert statements == []
+
+
+def move_order(order_id, new_id):
+    session = models.get_session()
+    session.query(Order).filter(Order.id == order_id).update({Order.id: new_id})
+    session.commit()
+    session.close()
+
+
+def test_late_committed_order_is_not_missed():
+    """An order with a lower id that becomes visible after a higher id was seen"""
+    from database.order_feed import OrderFeed
+    
+    feed = OrderFeed(poll_interval=0, lookback=10)
+    cursor = feed.latest_cursor()
+    
+    # Leave a gap in the ids, as if the transaction holding it had not committed yet
+    first = place(1)
+    move_order(place(2), first + 2)
+    
+    events, cursor = feed.changes_since(cursor)
+    assert [e['order_id'] for e in events] == [first, first + 2]
+    
+    # The slow transaction commits
+    move_order(place(3), first + 1)
+    
+    events, cursor = feed.changes_since(cursor)
+    assert [e['order_id'] for e in events] == [first + 1]
+    assert feed.changes_since(cursor)[0] == []
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Order Feed Test")
+    print("=" * 60)
+    setup_module()
+    test_subscribers_share_one_feed()
+    print("✅ Admin tabs share one feed")
+    test_poll_interval_limits_database_reads()
+    print("✅ Poll interval shared across tabs")
+    test_late_committed_order_is_not_missed()
+    print("✅ Late commits are delivered")
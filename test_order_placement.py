@@ -0,0 +1,126 @@
+"""
+Test atomic order placement (DatabaseManager.place_order)
+Runs against a temporary SQLite database
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import event
+
+from database import models
+from database.models import Category, MenuItem, Table, Order, OrderItem
+
+
+def setup_module(module=None):
+    """Point the shared engine at a fresh temporary database and seed it"""
+    db_path = os.path.join(tempfile.mkdtemp(), "test_orders.db")
+    os.environ['DATABASE_URL'] = f"sqlite:///{db_path}"
+    models.dispose_engine()
+    models.init_db()
+
+    session = models.get_session()
+    category = Category(name="Pizzalar", name_en="Pizzas", display_order=1)
+    session.add(category)
+    session.flush()
+    session.add_all([
+        MenuItem(category_id=category.id, name="Margherita", price=95.0, order_count=0),
+        MenuItem(category_id=category.id, name="Karışık Pizza", price=105.0, order_count=0),
+        MenuItem(category_id=category.id, name="Sucuklu Pizza", price=110.0, order_count=0),
+        Table(table_number=1, capacity=4, status='available'),
+    ])
+    session.commit()
+    session.close()
+
+
+def test_place_order_is_single_transaction():
+    """All items, totals, popularity and table status are written with one commit"""
+    from database.db_manager import get_db
+
+    db = get_db()
+    items = {item.name: item for item in db.get_all_menu_items()}
+    table = db.get_table_by_number(1)
+
+    cart = [
+        {'item_id': items["Margherita"].id, 'quantity': 2, 'notes': ''},
+        {'item_id': items["Karışık Pizza"].id, 'quantity': 1, 'notes': 'Ekstra peynir'},
+        {'item_id': items["Margherita"].id, 'quantity': 1, 'notes': 'Acısız'},
+    ]
+
+    commits = []
+    event.listen(db.session, "after_commit", lambda session: commits.append(1))
+    order = db.place_order(table.id, "session-1", cart)
+
+    assert len(commits) == 1
+    assert order.order_number.startswith("ORD-")
+    assert order.total_amount == 95.0 * 3 + 105.0
+
+    order_items = db.get_order_items(order.id)
+    assert len(order_items) == 3
+    assert {oi.notes for oi in order_items} == {None, 'Ekstra peynir', 'Acısız'}
+
+    db.session.expire_all()
+    assert db.get_menu_item(items["Margherita"].id).order_count == 3
+    assert db.get_menu_item(items["Karışık Pizza"].id).order_count == 1
+    assert db.get_menu_item(items["Sucuklu Pizza"].id).order_count == 0
+
+    table = db.get_table_by_id(table.id)
+    assert table.status == 'occupied'
+    assert table.current_session_id == "session-1"
+    db.close()
+
+
+def test_place_order_rolls_back_on_failure():
+    """A failure mid-way leaves no half-written order behind"""
+    from database.db_manager import get_db
+
+    db = get_db()
+    item = db.get_all_menu_items()[0]
+    orders_before = db.session.query(Order).count()
+    items_before = db.session.query(OrderItem).count()
+
+    # The order row is flushed first, then the item insert fails to bind the notes value
+    cart = [{'item_id': item.id, 'quantity': 1, 'notes': object()}]
+    raised = False
+    try:
+        db.place_order(1, "session-2", cart)
+    except Exception:
+        raised = True
+    assert raised, "place_order should have raised"
+
+    assert db.session.query(Order).count() == orders_before
+    assert db.session.query(OrderItem).count() == items_before
+    db.close()
+
+
+def test_place_order_ignores_unknown_items():
+    """Unknown menu items are skipped; an order with no known items is not created"""
+    from database.db_manager import get_db
+
+    db = get_db()
+    assert db.place_order(1, "session-3", [{'item_id': 9999, 'quantity': 1}]) is None
+
+    item = db.get_all_menu_items()[0]
+    order = db.place_order(1, "session-3", [
+        {'item_id': 9999, 'quantity': 1},
+        {'item_id': item.id, 'quantity': 1},
+    ])
+    assert len(db.get_order_items(order.id)) == 1
+    assert order.total_amount == item.price
+    db.close()
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Order Placement Test")
+    print("=" * 60)
+    setup_module()
+    test_place_order_is_single_transaction()
+    print("✅ Single transaction order placement")
+    test_place_order_rolls_back_on_failure()
+    print("✅ Rollback on failure")
+    test_place_order_ignores_unknown_items()
+    print("✅ Unknown items skipped")
@@ -0,0 +1,185 @@
+"""
+Test that admin pages load their data in a constant number of queries
+Runs against a temporary SQLite database
+"""
+
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import event, insert
+
+from database import models
+from database.models import Category, MenuItem, Table
+
+ACTIVE_ORDERS = 30
+ITEMS_PER_ORDER = 3
+
+
+def setup_module(module=None):
+    """Point the shared engine at a fresh temporary database and seed active orders"""
+    from database.db_manager import get_db
+
+    db_path = os.path.join(tempfile.mkdtemp(), "test_counts.db")
+    os.environ['DATABASE_URL'] = f"sqlite:///{db_path}"
+    models.dispose_engine()
+    models.init_db()
+
+    session = models.get_session()
+    categories = [Category(name=f"Kategori {i}") for i in range(3)]
+    session.add_all(categories)
+    session.flush()
+    for i in range(12):
+        session.add(MenuItem(category_id=categories[i % 3].id, name=f"Ürün {i}",
+                             price=40.0 + i, order_count=i))
+    for i in range(1, 11):
+        session.add(Table(table_number=i))
+    session.commit()
+    session.close()
+
+    db = get_db()
+    for n in range(ACTIVE_ORDERS):
+        cart = [{'item_id': (n + k) % 12 + 1, 'quantity': 1} for k in range(ITEMS_PER_ORDER)]
+        db.place_order(n % 10 + 1, f"session-{n}", cart)
+    db.close()
+
+
+@contextmanager
+def count_queries():
+    """Count SQL statements sent to the database inside the block"""
+    engine = models.get_engine()
+    counter = {'count': 0}
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        counter['count'] += 1
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
+
+
+def render_active_orders(orders):
+    """Touch every attribute the dashboard's orders panel displays"""
+    lines = []
+    for order in orders:
+        lines.append(f"{order.order_number} - Masa {order.table.table_number}")
+        for item in order.items:
+            lines.append(f"{item.quantity}x {item.menu_item.name}")
+    return lines
+
+
+def test_active_orders_dashboard_constant_queries():
+    from database.db_manager import get_db
+
+    db = get_db()
+    with count_queries() as counter:
+        orders = db.get_active_orders(with_items=True)
+        lines = render_active_orders(orders)
+    db.close()
+
+    assert len(orders) == ACTIVE_ORDERS
+    assert len(lines) == ACTIVE_ORDERS * (1 + ITEMS_PER_ORDER)
+    assert counter['count'] <= 3, f"{counter['count']} queries"
+
+
+def test_lazy_active_orders_is_n_plus_one():
+    """Reference: the lazy path issues queries per order and per item"""
+    from database.db_manager import get_db
+
+    db = get_db()
+    with count_queries() as counter:
+        render_active_orders(db.get_active_orders())
+    db.close()
+
+    assert counter['count'] > ACTIVE_ORDERS
+
+
+def render_table_report(orders):
+    """Build the rows of the Reports page table report"""
+    return [
+        (order.order_number, order.table.table_number,
+         ", ".join(f"{item.quantity}x {item.menu_item.name}" for item in order.items))
+        for order in orders
+    ]
+
+
+def test_table_report_constant_queries():
+    from database.db_manager import get_db
+    from database.models import Order, OrderItem
+
+    # Paid orders from two days ago: more than one selectinload batch (500 ids)
+    old_orders = 600
+    session = models.get_session()
+    created_at = datetime.now() - timedelta(days=2)
+    session.execute(insert(Order), [
+        {'id': 10000 + n, 'order_number': f"ORD-OLD-{n:04d}", 'table_id': n % 10 + 1,
+         'session_id': f"old-{n}", 'status': 'paid', 'total_amount': 40.0,
+         'created_at': created_at, 'updated_at': created_at}
+        for n in range(old_orders)
+    ])
+    session.execute(insert(OrderItem), [
+        {'order_id': 10000 + n, 'menu_item_id': 1, 'quantity': 1, 'unit_price': 40.0, 'subtotal': 40.0}
+        for n in range(old_orders)
+    ])
+    session.commit()
+    session.close()
+
+    today = datetime.now().date()
+    for start_date, expected in ((today, ACTIVE_ORDERS), (today - timedelta(days=7), ACTIVE_ORDERS + old_orders)):
+        db = get_db()
+        with count_queries() as counter:
+            rows = render_table_report(db.get_orders_by_table_and_date_range(None, start_date, today, with_items=True))
+        db.close()
+
+        assert len(rows) == expected
+        assert all(items for _, _, items in rows)
+        assert counter['count'] == 2, f"{counter['count']} queries"
+
+    # The page shows counts from one aggregate query and loads a single page of orders
+    start_date = today - timedelta(days=7)
+    db = get_db()
+    with count_queries() as counter:
+        summary = db.get_order_summary_by_table_and_date_range(None, start_date, today)
+        last_page = render_table_report(db.get_orders_by_table_and_date_range(
+            None, start_date, today, with_items=True, limit=100, offset=600
+        ))
+    db.close()
+
+    assert summary['total_orders'] == ACTIVE_ORDERS + old_orders
+    assert summary['paid_orders'] == old_orders
+    assert summary['total_revenue'] == old_orders * 40.0
+    assert [number for number, _, _ in last_page] == [f"ORD-OLD-{n:04d}" for n in range(29, -1, -1)]
+    assert all(items for _, _, items in last_page)
+    assert counter['count'] == 3, f"{counter['count']} queries"
+
+
+def test_popular_items_with_category_single_query():
+    from database.db_manager import get_db
+
+    db = get_db()
+    with count_queries() as counter:
+        rows = [(item.name, item.category.name) for item in db.get_popular_items(limit=10, with_category=True)]
+    db.close()
+
+    assert len(rows) == 10
+    assert counter['count'] == 1
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Query Count Test")
+    print("=" * 60)
+    setup_module()
+    test_active_orders_dashboard_constant_queries()
+    print("✅ Active orders panel: constant query count")
+    test_lazy_active_orders_is_n_plus_one()
+    test_table_report_constant_queries()
+    print("✅ Table report: constant query count")
+    test_popular_items_with_category_single_query()
+    print("✅ Popular items: single query")
@@ -0,0 +1,136 @@
+"""
+Test that order / chat queries are served by indexes (SQLite EXPLAIN QUERY PLAN)
+Runs against a temporary SQLite database
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import create_engine, event, func, text
+
+from database import models
+from database.models import Base, Order
+
+
+def setup_module(module=None):
+    """Point the shared engine at a fresh temporary database"""
+    db_path = os.path.join(tempfile.mkdtemp(), "test_plans.db")
+    os.environ['DATABASE_URL'] = f"sqlite:///{db_path}"
+    models.dispose_engine()
+    models.init_db()
+
+
+def query_plans(operation):
+    """Run operation and return the EXPLAIN QUERY PLAN detail lines of each SELECT it issued"""
+    engine = models.get_engine()
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        operation()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    plans = []
+    with engine.connect() as conn:
+        for statement, parameters in statements:
+            rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+            plans.append(" | ".join(row[-1] for row in rows))
+    return plans
+
+
+def assert_uses_index(plan, index_name):
+    assert index_name in plan, f"expected {index_name} in plan: {plan}"
+
+
+def test_daily_stats_uses_indexes():
+    from database.db_manager import get_db
+
+    db = get_db()
+    plans = query_plans(db.get_daily_stats)
+    db.close()
+
+    assert len(plans) == 2
+    assert "ix_orders_" in plans[0] and "created_at" in plans[0], plans[0]
+    # Revenue comes from the day rollup row (primary key lookup)
+    assert_uses_index(plans[1], "sqlite_autoindex_daily_rollups_1")
+
+
+def test_table_date_range_uses_table_index():
+    from database.db_manager import get_db
+
+    db = get_db()
+    today = datetime.now().date()
+    plans = query_plans(lambda: db.get_orders_by_table_and_date_range(1, today - timedelta(days=7), today))
+    db.close()
+
+    assert_uses_index(plans[0], "ix_orders_table_id_created_at")
+
+
+def test_sales_report_range_is_sargable():
+    from database.db_manager import get_db, day_range
+
+    db = get_db()
+    today = datetime.now().date()
+    start, end = day_range(today - timedelta(days=30), today)
+
+    plans = query_plans(lambda: db.session.query(Order).filter(
+        Order.created_at >= start, Order.created_at < end
+    ).all())
+    assert_uses_index(plans[0], "ix_orders_created_at")
+
+    # The old DATE() filter cannot use the index
+    legacy = query_plans(lambda: db.session.query(Order).filter(
+        func.DATE(Order.created_at) >= start.date(), func.DATE(Order.created_at) <= today
+    ).all())
+    assert "ix_orders_created_at" not in legacy[0]
+    db.close()
+
+
+def test_order_items_and_chat_history_use_indexes():
+    from database.db_manager import get_db
+
+    db = get_db()
+    plans = query_plans(lambda: db.get_order_items(1))
+    assert_uses_index(plans[0], "ix_order_items_order_id")
+
+    plans = query_plans(lambda: db.get_chat_history("session-1"))
+    assert_uses_index(plans[0], "ix_chat_history_session_id_created_at")
+    db.close()
+
+
+def test_create_missing_indexes_upgrades_existing_database():
+    """Tables created before the indexes existed get them from the migration helper"""
+    engine = create_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'legacy.db')}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                conn.execute(text(f"DROP INDEX {index.name}"))
+
+    created = models.create_missing_indexes(engine)
+    assert "ix_orders_status_created_at" in created
+    assert "ix_order_items_menu_item_id" in created
+    assert models.create_missing_indexes(engine) == []
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Query Plan Test")
+    print("=" * 60)
+    setup_module()
+    test_daily_stats_uses_indexes()
+    test_table_date_range_uses_table_index()
+    test_sales_report_range_is_sargable()
+    test_order_items_and_chat_history_use_indexes()
+    test_create_missing_indexes_upgrades_existing_database()
+    print("✅ All order queries use indexes")
@@ -0,0 +1,120 @@
+"""
+Test metadata filters pushed into the menu vector query
+Runs over the seeded menu (data/menu_items.csv) in a temporary SQLite database
+and Chroma directory with deterministic fake embeddings (no Ollama needed)
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from database import models
+from test_rag_sync import CountingEmbeddings
+
+
+FILTER_CASES = [
+    {'vegan': True},
+    {'vegetarian': True, 'max_price': 60},
+    {'vegan': True, 'exclude_allergens': ['gluten']},
+    {'vegetarian': True, 'exclude_allergens': ['dairy', 'gluten']},
+    {'exclude_allergens': ['Süt', 'yumurta']},
+    {'max_price': 40, 'exclude_allergens': ['nuts']},
+]
+QUERIES = ["pizza", "hafif bir şey", "tatlı", "vejetaryen yemek"]
+
+_engine = None
+
+
+def setup_module(module=None):
+    """Seeded menu plus a RAG engine over it"""
+    global _engine
+    from database.init_data import init_sample_data
+    from ai.rag_engine import MenuRAGEngine
+    
+    tmp_dir = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmp_dir, 'test_rag_filters.db')}"
+    os.environ['VECTOR_DB_PATH'] = os.path.join(tmp_dir, "vector_db")
+    models.dispose_engine()
+    init_sample_data()
+    _engine = MenuRAGEngine(embeddings=CountingEmbeddings())
+
+
+def expected_ids(filters):
+    """Ground truth straight from the database"""
+    from ai.rag_engine import normalize_allergen, parse_allergens
+    
+    session = models.get_session()
+    items = session.query(models.MenuItem).filter(models.MenuItem.is_available == True).all()
+    session.close()
+    
+    excluded = {normalize_allergen(name) for name in filters.get('exclude_allergens', [])}
+    return {
+        item.id for item in items
+        if (not filters.get('vegetarian') or item.is_vegetarian)
+        and (not filters.get('vegan') or item.is_vegan)
+        and (not filters.get('max_price') or item.price <= filters['max_price'])
+        and not (parse_allergens(item.allergens) & excluded)
+    }
+
+
+def test_filtered_recall_is_complete():
+    """Every query returns min(k, matching items) results, all of them matching"""
+    k = 5
+    for filters in FILTER_CASES:
+        expected = expected_ids(filters)
+        assert expected, filters
+        for query in QUERIES:
+            found = [doc.metadata['item_id'] for doc in _engine.get_recommendations(query, filters, k=k)]
+            assert set(found) <= expected, (filters, query)
+            assert len(found) == min(k, len(expected)), (filters, query, found)
+
+
+def test_where_clause():
+    where, residual = _engine._build_where({'vegan': True, 'max_price': 50, 'exclude_allergens': ['Gluten']})
+    assert where == {"$and": [{"is_vegan": True}, {"price": {"$lte": 50.0}}, {"allergen_gluten": False}]}
+    assert residual == []
+    
+    assert _engine._build_where(None) == (None, [])
+    assert _engine._build_where({'exclude_allergens': ['susam']}) == (None, ['susam'])
+
+
+def test_unknown_allergens_filtered_after_query():
+    session = models.get_session()
+    item = session.query(models.MenuItem).filter(models.MenuItem.is_available == True).first()
+    item.allergens = "gluten,susam"
+    item_id = item.id
+    session.commit()
+    session.close()
+    _engine.sync_index()
+    
+    found = [doc.metadata['item_id'] for doc in
+             _engine.get_recommendations("yemek", {'exclude_allergens': ['susam']}, k=5)]
+    assert len(found) == 5
+    assert item_id not in found
+
+
+def test_allergen_spellings_fold_like_search_terms():
+    from ai.rag_engine import normalize_allergen, parse_allergens
+    
+    assert normalize_allergen("SÜT") == normalize_allergen("Sut") == "dairy"
+    assert normalize_allergen(" BALIK ") == "fish"
+    assert normalize_allergen("FINDIK") == normalize_allergen("fındık") == "nuts"
+    assert normalize_allergen("İstiridye") is None
+    assert parse_allergens("Buğday, Süt Ürünleri, yumurta") == {"gluten", "dairy", "egg"}
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("RAG Filter Recall Test")
+    print("=" * 60)
+    setup_module()
+    test_filtered_recall_is_complete()
+    print("✅ Filtered queries return k matching items")
+    test_where_clause()
+    print("✅ Filters translated to where clauses")
+    test_unknown_allergens_filtered_after_query()
+    print("✅ Unknown allergens filtered after the query")
+    test_allergen_spellings_fold_like_search_terms()
+    print("✅ Allergen spellings fold like search terms")
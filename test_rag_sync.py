@@ -0,0 +1,163 @@
+"""
+Test incremental sync of the menu vector index
+Runs against a temporary SQLite database and Chroma directory with
+deterministic fake embeddings (no Ollama needed)
+"""
+
+import hashlib
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from langchain_core.embeddings import Embeddings
+
+from database import models
+from database.models import Category, MenuItem
+
+
+class CountingEmbeddings(Embeddings):
+    """Hash-based vectors; counts how many texts were embedded"""
+    
+    def __init__(self):
+        self.embedded = 0
+        self.on_embed = None
+    
+    def _vector(self, text):
+        digest = hashlib.sha256(text.encode("utf-8")).digest()
+        return [byte / 255 for byte in digest[:16]]
+    
+    def embed_documents(self, texts):
+        if self.on_embed:
+            self.on_embed()
+        self.embedded += len(texts)
+        return [self._vector(text) for text in texts]
+    
+    def embed_query(self, text):
+        return self._vector(text)
+
+
+def setup_module(module=None):
+    """Fresh database with a small menu and an empty vector directory"""
+    tmp_dir = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmp_dir, 'test_rag_sync.db')}"
+    os.environ['VECTOR_DB_PATH'] = os.path.join(tmp_dir, "vector_db")
+    models.dispose_engine()
+    models.init_db()
+    
+    session = models.get_session()
+    pizzas = Category(name="Pizzalar", display_order=1)
+    session.add(pizzas)
+    session.flush()
+    session.add_all([
+        MenuItem(category_id=pizzas.id, name="Margherita", price=120.0, is_vegetarian=True, order_count=0),
+        MenuItem(category_id=pizzas.id, name="Pepperoni", price=150.0, order_count=0),
+        MenuItem(category_id=pizzas.id, name="Funghi", price=130.0, is_vegetarian=True, order_count=0),
+        MenuItem(category_id=pizzas.id, name="Tonno", price=140.0, is_available=False, order_count=0),
+    ])
+    session.commit()
+    session.close()
+
+
+def make_engine():
+    from ai.rag_engine import MenuRAGEngine
+    
+    embeddings = CountingEmbeddings()
+    return MenuRAGEngine(embeddings=embeddings), embeddings
+
+
+def stored_names(engine):
+    return sorted(metadata["name"] for metadata in engine.vector_store.get(include=["metadatas"])["metadatas"])
+
+
+def update_item(name, **values):
+    session = models.get_session()
+    session.query(MenuItem).filter(MenuItem.name == name).update(values)
+    session.commit()
+    session.close()
+
+
+def test_sync_embeds_only_changed_items():
+    engine, embeddings = make_engine()
+    assert embeddings.embedded == 3
+    assert stored_names(engine) == ["Funghi", "Margherita", "Pepperoni"]
+    
+    # Nothing changed: nothing embedded
+    embeddings.embedded = 0
+    assert engine.sync_index() == {"added": 0, "updated": 0, "deleted": 0, "unchanged": 3}
+    assert embeddings.embedded == 0
+    
+    # One price change, one item disabled, one item enabled
+    update_item("Margherita", price=125.0)
+    update_item("Pepperoni", is_available=False)
+    update_item("Tonno", is_available=True)
+    assert engine.sync_index() == {"added": 1, "updated": 1, "deleted": 1, "unchanged": 1}
+    assert embeddings.embedded == 2
+    assert stored_names(engine) == ["Funghi", "Margherita", "Tonno"]
+    
+    stored = engine.vector_store.get(ids=[str(item_id) for item_id in range(1, 5)], include=["metadatas"])
+    prices = {metadata["name"]: metadata["price"] for metadata in stored["metadatas"]}
+    assert prices["Margherita"] == 125.0
+    
+    # A reopened engine keeps the stored hashes
+    engine, embeddings = make_engine()
+    assert engine.sync_index()["unchanged"] == 3
+    assert embeddings.embedded == 0
+
+
+def test_rebuild_swaps_collection_without_empty_window():
+    engine, embeddings = make_engine()
+    old_name = engine.vector_store._collection.name
+    
+    # While the new collection is being embedded, queries still hit the old one
+    visible = []
+    embeddings.on_embed = lambda: visible.append(len(engine.search_menu("pizza")))
+    engine.rebuild_index()
+    embeddings.on_embed = None
+    
+    assert visible and min(visible) > 0
+    new_name = engine.vector_store._collection.name
+    assert new_name != old_name
+    assert stored_names(engine) == ["Funghi", "Margherita", "Tonno"]
+    
+    # The swap is persisted: a new engine opens the rebuilt collection
+    reopened, embeddings = make_engine()
+    assert reopened.vector_store._collection.name == new_name
+    assert reopened.sync_index()["unchanged"] == 3
+    assert embeddings.embedded == 0
+
+
+def test_keyword_index_waits_for_vector_writes():
+    engine, embeddings = make_engine()
+    keyword_index = engine.keyword_index
+    update_item("Funghi", price=135.0)
+    
+    def fail():
+        raise RuntimeError("embedding service down")
+    
+    # A failed vector write leaves the keyword index on the old menu
+    embeddings.on_embed = fail
+    try:
+        engine.sync_index()
+        raise AssertionError("sync should have failed")
+    except RuntimeError:
+        pass
+    embeddings.on_embed = None
+    assert engine.keyword_index is keyword_index
+    
+    assert engine.sync_index()["updated"] == 1
+    assert engine.keyword_index is not keyword_index
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Vector Index Sync Test")
+    print("=" * 60)
+    setup_module()
+    test_sync_embeds_only_changed_items()
+    print("✅ Only changed items re-embedded")
+    test_rebuild_swaps_collection_without_empty_window()
+    print("✅ Full rebuild swaps collections atomically")
+    test_keyword_index_waits_for_vector_writes()
+    print("✅ Keyword index swapped only after vector writes")
@@ -0,0 +1,94 @@
+"""
+Test the assistant response cache
+Uses deterministic fake embeddings for the semantic tier (no Ollama needed)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from langchain_core.embeddings import Embeddings
+
+from ai.response_cache import ResponseCache, normalize_question
+from database.menu_cache import bump_menu_version
+
+
+class KeywordEmbeddings(Embeddings):
+    """Bag-of-keywords vectors: questions about the same topics are similar"""
+    
+    KEYWORDS = ("vejetaryen", "vegan", "pizza", "aci", "tatli", "icecek")
+    
+    def embed_query(self, text):
+        words = normalize_question(text)
+        return [1.0 if keyword in words else 0.0 for keyword in self.KEYWORDS] + [0.1]
+    
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+
+def test_normalized_questions_share_an_entry():
+    cache = ResponseCache(max_entries=10, ttl=60, similarity=0)
+    assert cache.get("Vejetaryen pizzanız var mı?") is None
+    cache.put("Vejetaryen pizzanız var mı?", 'tr', None, "Evet, Margherita!")
+    
+    assert cache.get("VEJETARYEN PIZZANIZ VAR MI") == "Evet, Margherita!"
+    assert cache.get("vejetaryen pizzaniz var mi") == "Evet, Margherita!"
+    # Language and filters are part of the key
+    assert cache.get("Vejetaryen pizzanız var mı?", 'en') is None
+    assert cache.get("Vejetaryen pizzanız var mı?", 'tr', {'vegan': True}) is None
+    assert cache.stats()['hits'] == 2
+
+
+def test_menu_change_invalidates():
+    cache = ResponseCache(max_entries=10, ttl=60, similarity=0)
+    cache.put("En ucuz yemek ne?", 'tr', None, "Ayran")
+    assert cache.get("En ucuz yemek ne?") == "Ayran"
+    
+    bump_menu_version()
+    assert cache.get("En ucuz yemek ne?") is None
+    
+    # An answer generated from the previous menu is not stored
+    version = cache._menu_version
+    bump_menu_version()
+    cache.put("En ucuz yemek ne?", 'tr', None, "Eski cevap", menu_version=version)
+    assert cache.get("En ucuz yemek ne?") is None
+
+
+def test_ttl_and_lru_eviction():
+    cache = ResponseCache(max_entries=2, ttl=0, similarity=0)
+    cache.put("soru", 'tr', None, "cevap")
+    assert cache.get("soru") is None
+    
+    cache = ResponseCache(max_entries=2, ttl=60, similarity=0)
+    cache.put("bir", 'tr', None, "1")
+    cache.put("iki", 'tr', None, "2")
+    cache.get("bir")
+    cache.put("uc", 'tr', None, "3")
+    assert cache.get("iki") is None
+    assert cache.get("bir") == "1"
+    assert cache.get("uc") == "3"
+
+
+def test_semantic_tier_matches_paraphrases():
+    cache = ResponseCache(max_entries=10, ttl=60, similarity=0.95, embeddings=KeywordEmbeddings())
+    cache.put("Vejetaryen pizzanız var mı?", 'tr', None, "Margherita")
+    
+    assert cache.get("Hangi pizzalar vejetaryen?") == "Margherita"
+    assert cache.get("Acı bir pizza önerir misiniz?") is None
+    assert cache.get("Hangi pizzalar vejetaryen?", 'en') is None
+    assert cache.stats()['semantic_hits'] == 1
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Response Cache Test")
+    print("=" * 60)
+    test_normalized_questions_share_an_entry()
+    print("✅ Normalized questions share an entry")
+    test_menu_change_invalidates()
+    print("✅ Menu changes invalidate cached answers")
+    test_ttl_and_lru_eviction()
+    print("✅ TTL and LRU eviction")
+    test_semantic_tier_matches_paraphrases()
+    print("✅ Semantic tier matches paraphrases")
@@ -0,0 +1,102 @@
+"""
+Test the SQL-aggregated sales report against the old per-order computation
+Runs against a temporary SQLite database
+"""
+
+import os
+import sys
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from database import models
+from database.models import Order
+from database.reports import get_sales_report, sales_by_day_and_status
+from benchmark_sales_report import legacy_sales_report, setup_database
+
+
+def setup_module(module=None):
+    """Ten days of synthetic orders plus a few hand-placed ones on fixed days"""
+    setup_database(orders_per_day=30, days=10)
+    
+    session = models.get_session()
+    for n, (day, hour, status, amount) in enumerate([
+        (date(2024, 2, 28), 23, 'paid', 100.0),
+        (date(2024, 2, 29), 0, 'paid', 50.0),
+        (date(2024, 2, 29), 12, 'cancelled', 70.0),
+        (date(2024, 3, 1), 0, 'pending', 30.0),
+    ]):
+        created_at = datetime.combine(day, datetime.min.time()) + timedelta(hours=hour, minutes=30)
+        session.add(Order(order_number=f"ORD-TEST-{n}", table_id=1, session_id="test",
+                          status=status, total_amount=amount, created_at=created_at))
+    session.commit()
+    session.close()
+
+
+def report(start_date, end_date):
+    session = models.get_session()
+    try:
+        return get_sales_report(session, start_date, end_date)
+    finally:
+        session.close()
+
+
+def test_fixed_days():
+    result = report(date(2024, 2, 29), date(2024, 2, 29))
+    assert result['total_orders'] == 2
+    assert result['total_revenue'] == 50.0
+    assert result['avg_order_value'] == 25.0
+    assert dict(result['status_counts'].itertuples(index=False)) == {'paid': 1, 'cancelled': 1}
+    assert list(result['daily'].itertuples(index=False, name=None)) == [(date(2024, 2, 29), 2, 50.0)]
+    
+    daily = report(date(2024, 2, 28), date(2024, 3, 1))['daily']
+    assert list(daily['date']) == [date(2024, 2, 28), date(2024, 2, 29), date(2024, 3, 1)]
+    assert list(daily['orders']) == [1, 2, 1]
+    assert list(daily['revenue']) == [100.0, 50.0, 0.0]
+
+
+def test_empty_range():
+    assert report(date(2020, 1, 1), date(2020, 1, 31)) is None
+    session = models.get_session()
+    try:
+        empty = sales_by_day_and_status(session, date(2020, 1, 1), date(2020, 1, 31))
+    finally:
+        session.close()
+    assert empty.empty and list(empty.columns) == ['date', 'status', 'orders', 'revenue']
+
+
+def test_matches_legacy_report():
+    from database.db_manager import get_db
+    
+    end_date = datetime.now().date()
+    start_date = end_date - timedelta(days=6)
+    db = get_db()
+    try:
+        legacy = legacy_sales_report(db, start_date, end_date)
+    finally:
+        db.close()
+    result = report(start_date, end_date)
+    
+    assert result['total_orders'] == legacy['total_orders'] == 7 * 30
+    assert abs(result['total_revenue'] - legacy['total_revenue']) < 1e-6
+    assert dict(result['status_counts'].itertuples(index=False)) == legacy['status_counts']
+    assert {
+        row.date: {'orders': row.orders, 'revenue': row.revenue}
+        for row in result['daily'].itertuples(index=False)
+    } == {
+        day: {'orders': data['orders'], 'revenue': data['revenue']}
+        for day, data in legacy['daily_data'].items()
+    }
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("Sales Report Test")
+    print("=" * 60)
+    setup_module()
+    test_fixed_days()
+    print("✅ Day boundaries, statuses and paid revenue")
+    test_empty_range()
+    print("✅ Empty range")
+    test_matches_legacy_report()
+    print("✅ Same figures as the old per-order report")
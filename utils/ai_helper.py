@@ -147,3 +147,36 @@ def parse_ai_response_for_products(response, language='tr'):
     cleaned_response = re.sub(r'\[PRODUCT:\d+\]', '', response)
     
     return product_ids, cleaned_response.strip()
+
+
+def _is_partial_product_tag(text):
+    """True if text could still grow into a [PRODUCT:id] marker"""
+    prefix = '[PRODUCT:'
+    if len(text) <= len(prefix):
+        return prefix.startswith(text)
+    return text.startswith(prefix) and text[len(prefix):].isdigit()
+
+
+def hide_product_tags(chunks, raw=None):
+    """
+    Pass streamed chunks through with [PRODUCT:id] markers removed
+    
+    A marker can be split across chunks, so text from a trailing "[" is held
+    back until it is either a complete marker (dropped) or cannot become one
+    (released). The unmodified chunks are appended to raw, if given, so the
+    full answer can still be parsed for product cards.
+    """
+    pending = ''
+    for chunk in chunks:
+        if raw is not None:
+            raw.append(chunk)
+        pending = re.sub(r'\[PRODUCT:\d+\]', '', pending + chunk)
+        start = pending.rfind('[')
+        if start != -1 and _is_partial_product_tag(pending[start:]):
+            text, pending = pending[:start], pending[start:]
+        else:
+            text, pending = pending, ''
+        if text:
+            yield text
+    if pending:
+        yield pending
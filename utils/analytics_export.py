@@ -0,0 +1,224 @@
+"""
+Analytics Export - Incremental Parquet copies of orders, items, menu and chat history
+
+Heavier analysis (basket analysis, hourly demand) runs offline on Parquet
+files instead of the production database. Each run appends only the rows
+added or changed since the previous run:
+
+- order_items, chat_history: immutable, high-water mark on id
+- orders, menu_items:        change-tracked, high-water mark on
+                             (updated_at, id) - a changed row is appended
+                             again as a new version (ORM writes bump
+                             updated_at; bulk SQL must set it too; the
+                             menu order_count counter leaves it alone)
+
+Files are hive-partitioned by day and never rewritten:
+
+    <ANALYTICS_EXPORT_PATH>/orders/day=2025-01-06/part-20250107T030000-0001.parquet
+
+Read them with pandas.read_parquet(path) or pyarrow.dataset. For orders and
+menu_items keep the last version per id (highest updated_at). Rows are read
+in keyset-paginated batches of EXPORT_CHUNK_SIZE, each in its own short
+transaction. Each batch is written to temporary part files that are renamed
+into place once the whole batch is written, and the high-water marks in
+_state.json are saved after every batch, so a failed run leaves no partial
+batch behind and the next run resumes where this one stopped.
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import Boolean, Date, DateTime, Float, Integer, and_, or_
+
+from database.models import ChatHistory, MenuItem, Order, OrderItem, get_session
+
+
+STATE_FILE = "_state.json"
+# Part files being written; hidden until renamed, so readers never see a half-written batch
+TMP_SUFFIX = ".tmp"
+
+# name -> (model, change-tracked, partition column)
+TABLES = OrderedDict([
+    ('orders', (Order, True, 'created_at')),
+    ('order_items', (OrderItem, False, 'created_at')),
+    ('menu_items', (MenuItem, True, 'updated_at')),
+    ('chat_history', (ChatHistory, False, 'created_at')),
+])
+
+_export_lock = threading.Lock()
+
+
+def _arrow_schema(model):
+    import pyarrow as pa
+    
+    fields = []
+    for column in model.__table__.columns:
+        if isinstance(column.type, Boolean):
+            arrow_type = pa.bool_()
+        elif isinstance(column.type, Integer):
+            arrow_type = pa.int64()
+        elif isinstance(column.type, Float):
+            arrow_type = pa.float64()
+        elif isinstance(column.type, DateTime):
+            arrow_type = pa.timestamp('us')
+        elif isinstance(column.type, Date):
+            arrow_type = pa.date32()
+        else:
+            arrow_type = pa.string()
+        fields.append(pa.field(column.name, arrow_type))
+    return pa.schema(fields)
+
+
+class AnalyticsExporter:
+    """Append new and changed rows to day-partitioned Parquet files"""
+    
+    def __init__(self, output_dir=None, chunk_size=None):
+        self.output_dir = output_dir or os.getenv('ANALYTICS_EXPORT_PATH', './analytics_export')
+        self.chunk_size = int(chunk_size or os.getenv('EXPORT_CHUNK_SIZE', '5000'))
+        self.state_path = os.path.join(self.output_dir, STATE_FILE)
+    
+    # ========================
+    # STATE
+    # ========================
+    
+    def load_state(self) -> Dict:
+        """High-water marks per table ({} before the first run)"""
+        try:
+            with open(self.state_path, encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+    
+    def _save_state(self, state):
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+    
+    # ========================
+    # READING
+    # ========================
+    
+    def _batches(self, model, change_tracked, mark):
+        """Rows after the high-water mark, in watermark order, as lists of dicts"""
+        columns = list(model.__table__.columns)
+        version = model.updated_at if change_tracked else None
+        last_id = mark.get('id', 0) if mark else 0
+        last_version = datetime.fromisoformat(mark['updated_at']) if mark and mark.get('updated_at') else None
+        
+        while True:
+            session = get_session()
+            try:
+                query = session.query(*columns)
+                if change_tracked:
+                    query = query.filter(version.isnot(None))
+                    if last_version is not None:
+                        query = query.filter(or_(
+                            version > last_version,
+                            and_(version == last_version, model.id > last_id)
+                        ))
+                    query = query.order_by(version, model.id)
+                else:
+                    query = query.filter(model.id > last_id).order_by(model.id)
+                rows = query.limit(self.chunk_size).all()
+            finally:
+                session.close()
+            if not rows:
+                return
+            
+            last_id = rows[-1].id
+            if change_tracked:
+                last_version = rows[-1].updated_at
+            yield [{column.name: getattr(row, column.name) for column in columns} for row in rows], \
+                {'id': last_id, 'updated_at': last_version.isoformat() if last_version else None}
+            if len(rows) < self.chunk_size:
+                return
+    
+    # ========================
+    # WRITING
+    # ========================
+    
+    def _remove_unfinished_parts(self, name):
+        """Delete temporary part files left by a run that stopped mid-batch"""
+        table_dir = os.path.join(self.output_dir, name)
+        if not os.path.isdir(table_dir):
+            return
+        for directory, _, files in os.walk(table_dir):
+            for file_name in files:
+                if file_name.endswith(TMP_SUFFIX):
+                    os.remove(os.path.join(directory, file_name))
+    
+    def export_table(self, name, state, run_id) -> int:
+        """
+        Append one table's new rows; updates and saves state[name] after each batch
+
+        A batch is written to hidden temporary files (ignored by Parquet readers)
+        and renamed into place only when all its day partitions are written, so
+        a failed batch leaves no rows behind and is exported again by the next
+        run. Only a crash between the renames and saving the state repeats a
+        batch; keeping the last row per id removes such duplicates.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        model, change_tracked, partition_column = TABLES[name]
+        schema = _arrow_schema(model)
+        self._remove_unfinished_parts(name)
+        part = 0
+        count = 0
+        
+        for rows, mark in self._batches(model, change_tracked, state.get(name)):
+            by_day = OrderedDict()
+            for row in rows:
+                value = row[partition_column]
+                by_day.setdefault(value.date().isoformat() if value else 'unknown', []).append(row)
+            
+            written = []
+            try:
+                for day, day_rows in by_day.items():
+                    directory = os.path.join(self.output_dir, name, f"day={day}")
+                    os.makedirs(directory, exist_ok=True)
+                    part += 1
+                    final_path = os.path.join(directory, f"part-{run_id}-{part:04d}.parquet")
+                    tmp_path = os.path.join(directory, f".{os.path.basename(final_path)}{TMP_SUFFIX}")
+                    written.append((tmp_path, final_path))
+                    pq.write_table(pa.Table.from_pylist(day_rows, schema=schema), tmp_path)
+            except BaseException:
+                for tmp_path, _ in written:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                raise
+            
+            for tmp_path, final_path in written:
+                os.replace(tmp_path, final_path)
+            count += len(rows)
+            state[name] = mark
+            self._save_state(state)
+        return count
+    
+    def run(self, tables=None) -> Dict[str, int]:
+        """
+        Export every table (or the given names) incrementally
+
+        Returns:
+            Rows appended per table
+        """
+        with _export_lock:
+            os.makedirs(self.output_dir, exist_ok=True)
+            state = self.load_state()
+            run_id = datetime.now().strftime('%Y%m%dT%H%M%S%f')
+            appended = {}
+            for name in tables or TABLES:
+                # Batches already written stay exported even if a later one fails
+                appended[name] = self.export_table(name, state, run_id)
+            self._save_state(state)
+            return appended
+
+
+def export_analytics(output_dir: Optional[str] = None, tables=None) -> Dict[str, int]:
+    """Run one incremental analytics export (see AnalyticsExporter)"""
+    return AnalyticsExporter(output_dir).run(tables)
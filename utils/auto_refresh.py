@@ -0,0 +1,57 @@
+"""
+Auto Refresh - Non-blocking panel refresh driven by a cheap change token
+"""
+
+import streamlit as st
+from datetime import datetime
+
+# st.fragment (Streamlit >= 1.37) or its experimental predecessor
+_fragment = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None)
+
+
+def _data_key(key):
+    return f"_panel_data_{key}"
+
+
+def load_if_changed(key, get_token, load):
+    """
+    Panel data for the current change token, calling load() only when the token moved
+
+    The token is read before loading, so a change that lands while the data is
+    being loaded is still picked up by the next poll.
+    """
+    token = get_token()
+    cached = st.session_state.get(_data_key(key))
+    if cached is None or cached[0] != token:
+        cached = (token, load())
+        st.session_state[_data_key(key)] = cached
+    return cached[1]
+
+
+def refreshing_panel(key, get_token, load, render, interval=10, label=None):
+    """
+    Render one panel in a fragment that re-runs on its own every `interval` seconds
+
+    Only the panel is re-executed, not the page. Each run costs one token query;
+    load() runs again only when the token changed, otherwise render(data) redraws
+    the panel from the data kept in session state. Without fragment support the
+    panel is rendered once per page run with a manual refresh button.
+    """
+    def _panel():
+        render(load_if_changed(key, get_token, load))
+        
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            timestamp = datetime.now().strftime('%d.%m.%Y %H:%M:%S')
+            st.caption(f"📅 {timestamp} - {label}" if label else f"📅 {timestamp}")
+        with col2:
+            if _fragment is None:
+                if st.button("🔄 Yenile", key=f"refresh_{key}"):
+                    st.rerun()
+            else:
+                st.caption(f"🔄 Her {interval}s kontrol ediliyor")
+    
+    if _fragment is None:
+        _panel()
+    else:
+        _fragment(run_every=interval)(_panel)()
@@ -3,12 +3,187 @@ Notification Manager - Handle notifications for orders and events
 """
 
 import os
-from datetime import datetime
+import threading
+from collections import deque
 from typing import Optional, List, Dict
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 import streamlit as st
+from database.db_manager import get_db
+from utils.notification_outbox import enqueue_message
+
+
+def _notification_to_dict(notification) -> Dict:
+    """Plain dict in the shape the notification pages display"""
+    notif = {
+        'id': notification.id,
+        'type': notification.type,
+        'title': notification.title,
+        'message': notification.message or '',
+        'priority': notification.priority or 'low',
+        'timestamp': notification.created_at,
+        'is_read': bool(notification.is_read),
+    }
+    if notification.order_id is not None:
+        notif['order_id'] = notification.order_id
+    if notification.table_number is not None:
+        notif['table_number'] = notification.table_number
+    return notif
+
+
+class NotificationStore:
+    """
+    Process-wide notification store shared by every browser session
+    
+    Notifications are saved to the notifications table, so an order placed from
+    a customer's phone reaches every staff session and survives restarts. The
+    latest NOTIFICATION_BUFFER notifications are kept in a ring buffer and the
+    unread / total counts are kept up to date in memory, so badges never rescan.
+    The table itself keeps the newest NOTIFICATION_RETENTION rows; older ones
+    are pruned as new notifications are published.
+    Subscribers (e.g. a sidebar showing toasts) keep their own id cursor.
+    """
+    
+    def __init__(self, buffer_size=None, retention=None):
+        self.buffer_size = int(buffer_size or os.getenv('NOTIFICATION_BUFFER', '200'))
+        self.retention = max(int(retention or os.getenv('NOTIFICATION_RETENTION', '1000')), self.buffer_size)
+        self._lock = threading.RLock()
+        self.reset()
+    
+    def reset(self):
+        """Drop the in-memory state; it is reloaded from the database on next use"""
+        with self._lock:
+            self._recent = deque(maxlen=self.buffer_size)
+            self._unread_count = 0
+            self._total_count = 0
+            self._loaded = False
+    
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        
+        db = get_db()
+        try:
+            rows = db.get_recent_notifications(limit=self.buffer_size)
+            self._recent.extend(_notification_to_dict(n) for n in reversed(rows))
+            self._unread_count = db.count_notifications(unread_only=True)
+            self._total_count = db.count_notifications()
+        finally:
+            db.close()
+        self._loaded = True
+    
+    def publish(self, type: str, title: str, message: str = '', priority: str = 'low',
+                order_id: Optional[int] = None, table_number: Optional[int] = None) -> Dict:
+        """Save a notification and make it visible to every subscriber"""
+        with self._lock:
+            self._ensure_loaded()
+            db = get_db()
+            try:
+                notif = _notification_to_dict(db.create_notification(
+                    type=type, title=title, message=message, priority=priority,
+                    order_id=order_id, table_number=table_number
+                ))
+                self._recent.append(notif)
+                self._unread_count += 1
+                self._total_count += 1
+                
+                # Ring buffer retention in the table too
+                if self._total_count > self.retention and db.prune_notifications(self.retention):
+                    self._unread_count = db.count_notifications(unread_only=True)
+                    self._total_count = db.count_notifications()
+            finally:
+                db.close()
+            return dict(notif)
+    
+    def recent(self, limit: Optional[int] = None) -> List[Dict]:
+        """Latest notifications from the ring buffer, newest first"""
+        with self._lock:
+            self._ensure_loaded()
+            items = list(reversed(self._recent))
+        if limit:
+            items = items[:limit]
+        return [dict(n) for n in items]
+    
+    def unread(self, limit: Optional[int] = None) -> List[Dict]:
+        """Unread notifications, newest first (indexed lookup, none when the count is 0)"""
+        with self._lock:
+            self._ensure_loaded()
+            if self._unread_count == 0:
+                return []
+        
+        db = get_db()
+        try:
+            return [_notification_to_dict(n) for n in db.get_unread_notifications(limit=limit)]
+        finally:
+            db.close()
+    
+    def unread_count(self) -> int:
+        with self._lock:
+            self._ensure_loaded()
+            return self._unread_count
+    
+    def total_count(self) -> int:
+        with self._lock:
+            self._ensure_loaded()
+            return self._total_count
+    
+    def latest_cursor(self) -> int:
+        """Cursor for a new subscriber - only later notifications are delivered"""
+        with self._lock:
+            self._ensure_loaded()
+            return self._recent[-1]['id'] if self._recent else 0
+    
+    def changes_since(self, cursor: int):
+        """Return (notifications published after cursor oldest first, new cursor)"""
+        with self._lock:
+            self._ensure_loaded()
+            new = [dict(n) for n in self._recent if n['id'] > cursor]
+        return new, (new[-1]['id'] if new else cursor)
+    
+    def mark_as_read(self, notification_ids: Optional[List[int]] = None) -> int:
+        """Mark the given notifications (or all of them) as read"""
+        with self._lock:
+            self._ensure_loaded()
+            db = get_db()
+            try:
+                changed = db.mark_notifications_read(notification_ids)
+            finally:
+                db.close()
+            
+            self._unread_count = max(self._unread_count - changed, 0)
+            ids = set(notification_ids) if notification_ids is not None else None
+            for notif in self._recent:
+                if ids is None or notif['id'] in ids:
+                    notif['is_read'] = True
+            return changed
+    
+    def clear(self):
+        """Delete all notifications"""
+        with self._lock:
+            db = get_db()
+            try:
+                db.delete_all_notifications()
+            finally:
+                db.close()
+            self._recent.clear()
+            self._unread_count = 0
+            self._total_count = 0
+            self._loaded = True
+
+
+# Global notification store instance (shared by all sessions)
+_notification_store = None
+_notification_store_lock = threading.Lock()
+
+def get_notification_store() -> NotificationStore:
+    """Get or create the process-wide notification store"""
+    global _notification_store
+    
+    if _notification_store is None:
+        with _notification_store_lock:
+            if _notification_store is None:
+                _notification_store = NotificationStore()
+    
+    return _notification_store
+
 
 class NotificationManager:
     """Manage notifications across different channels"""
@@ -27,6 +202,9 @@ class NotificationManager:
         # SMS settings (placeholder - would need Twilio or similar)
         self.sms_api_key = os.getenv('SMS_API_KEY', '')
         self.sms_from = os.getenv('SMS_FROM', '')
+        
+        # In-app notifications are shared by all sessions
+        self.store = get_notification_store()
     
     def notify_new_order(self, order_id: int, table_number: int, total_amount: float, items: List[Dict]) -> bool:
         """Notify about new order"""
@@ -42,17 +220,14 @@ Toplam: ₺{total_amount:.2f}
         for item in items:
             message += f"- {item['quantity']}x {item['name']}\n"
         
-        # Show in-app notification
-        if 'notifications' not in st.session_state:
-            st.session_state.notifications = []
-        
-        st.session_state.notifications.append({
-            'type': 'new_order',
-            'title': title,
-            'message': message,
-            'timestamp': datetime.now(),
-            'order_id': order_id
-        })
+        # Show in-app notification (visible to every staff session)
+        self.store.publish(
+            type='new_order',
+            title=title,
+            message=message,
+            order_id=order_id,
+            table_number=table_number
+        )
         
         # Send email if enabled
         if self.email_enabled:
@@ -85,17 +260,14 @@ Masa: {table_number}
 Durum: {status_labels.get(old_status, old_status)} → {status_labels.get(new_status, new_status)}
 """
         
-        # Show in-app notification
-        if 'notifications' not in st.session_state:
-            st.session_state.notifications = []
-        
-        st.session_state.notifications.append({
-            'type': 'status_change',
-            'title': title,
-            'message': message,
-            'timestamp': datetime.now(),
-            'order_id': order_id
-        })
+        # Show in-app notification (visible to every staff session)
+        self.store.publish(
+            type='status_change',
+            title=title,
+            message=message,
+            order_id=order_id,
+            table_number=table_number
+        )
         
         # Notify customer for important status changes
         if new_status in ['ready', 'served']:
@@ -117,17 +289,13 @@ Minimum Eşik: {threshold}
 Stok yenilemesi gerekiyor!
 """
         
-        # Show in-app notification
-        if 'notifications' not in st.session_state:
-            st.session_state.notifications = []
-        
-        st.session_state.notifications.append({
-            'type': 'low_stock',
-            'title': title,
-            'message': message,
-            'timestamp': datetime.now(),
-            'priority': 'high'
-        })
+        # Show in-app notification (visible to every staff session)
+        self.store.publish(
+            type='low_stock',
+            title=title,
+            message=message,
+            priority='high'
+        )
         
         # Send email for critical alerts
         if self.email_enabled:
@@ -149,96 +317,71 @@ Stok yenilemesi gerekiyor!
         title = request_labels.get(request_type, '🔔 Masa Çağrısı')
         message = f"Masa {table_number} - {title}"
         
-        # Show in-app notification
-        if 'notifications' not in st.session_state:
-            st.session_state.notifications = []
-        
-        st.session_state.notifications.append({
-            'type': 'table_call',
-            'title': title,
-            'message': message,
-            'timestamp': datetime.now(),
-            'table_number': table_number,
-            'priority': 'high'
-        })
+        # Show in-app notification (visible to every staff session)
+        self.store.publish(
+            type='table_call',
+            title=title,
+            message=message,
+            table_number=table_number,
+            priority='high'
+        )
         
         return True
     
     def _send_email(self, subject: str, body: str, to_email: Optional[str] = None) -> bool:
-        """Send email notification"""
+        """Queue email notification (sent by the background outbox worker)"""
         if not self.email_enabled or not self.email_from or not self.email_password:
             return False
         
         try:
             # Use admin email if no recipient specified
-            if not to_email:
-                to_email = self.email_from
-            
-            # Create message
-            msg = MIMEMultipart()
-            msg['From'] = self.email_from
-            msg['To'] = to_email
-            msg['Subject'] = subject
-            
-            msg.attach(MIMEText(body, 'plain', 'utf-8'))
-            
-            # Send email
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.email_from, self.email_password)
-                server.send_message(msg)
-            
+            enqueue_message('email', body, recipient=to_email or self.email_from, subject=subject)
             return True
         
         except Exception as e:
-            print(f"Email send error: {e}")
+            print(f"Email queue error: {e}")
             return False
     
     def _send_sms(self, message: str, to_phone: Optional[str] = None) -> bool:
-        """Send SMS notification"""
+        """Queue SMS notification (sent by the background outbox worker)"""
         if not self.sms_enabled or not self.sms_api_key:
             return False
         
-        # Placeholder for SMS integration
-        # Would integrate with Twilio, AWS SNS, or similar service
-        # Example with Twilio:
-        # from twilio.rest import Client
-        # client = Client(account_sid, auth_token)
-        # client.messages.create(to=to_phone, from_=self.sms_from, body=message)
+        try:
+            enqueue_message('sms', message, recipient=to_phone)
+            return True
         
-        print(f"SMS (would send): {message}")
-        return True
+        except Exception as e:
+            print(f"SMS queue error: {e}")
+            return False
     
-    def get_unread_notifications(self) -> List[Dict]:
-        """Get unread notifications"""
-        if 'notifications' not in st.session_state:
-            st.session_state.notifications = []
-        
-        if 'read_notifications' not in st.session_state:
-            st.session_state.read_notifications = set()
-        
-        unread = []
-        for i, notif in enumerate(st.session_state.notifications):
-            if i not in st.session_state.read_notifications:
-                unread.append({'index': i, **notif})
-        
-        return unread
+    def get_unread_notifications(self, limit: Optional[int] = None) -> List[Dict]:
+        """Get unread notifications, newest first"""
+        return self.store.unread(limit)
+    
+    def get_recent_notifications(self, limit: Optional[int] = None) -> List[Dict]:
+        """Get the latest notifications (read and unread), newest first"""
+        return self.store.recent(limit)
     
-    def mark_as_read(self, notification_index: int):
+    def mark_as_read(self, notification_id: int):
         """Mark notification as read"""
-        if 'read_notifications' not in st.session_state:
-            st.session_state.read_notifications = set()
-        
-        st.session_state.read_notifications.add(notification_index)
+        self.store.mark_as_read([notification_id])
+    
+    def mark_all_as_read(self):
+        """Mark every notification as read"""
+        self.store.mark_as_read()
     
     def clear_all_notifications(self):
         """Clear all notifications"""
-        st.session_state.notifications = []
-        st.session_state.read_notifications = set()
+        self.store.clear()
     
     def get_notification_count(self) -> int:
         """Get count of unread notifications"""
-        return len(self.get_unread_notifications())
+        return self.store.unread_count()
+    
+    def get_total_count(self) -> int:
+        """Get count of all notifications"""
+        return self.store.total_count()
 
 # Global notification manager instance
 _notification_manager = None
@@ -255,32 +398,44 @@ def get_notification_manager() -> NotificationManager:
 def show_notifications_sidebar():
     """Show notifications in sidebar"""
     nm = get_notification_manager()
-    unread = nm.get_unread_notifications()
     
-    if unread:
+    # Toast notifications that arrived since this session last looked
+    if 'notification_cursor' not in st.session_state:
+        st.session_state.notification_cursor = nm.store.latest_cursor()
+    new_notifications, st.session_state.notification_cursor = nm.store.changes_since(
+        st.session_state.notification_cursor
+    )
+    for notif in new_notifications:
+        st.toast(notif['title'], icon="🔔")
+    
+    unread_count = nm.get_notification_count()
+    
+    if unread_count:
+        unread = nm.get_unread_notifications(limit=5)  # Show only latest 5
+        
         with st.sidebar:
             st.markdown("---")
-            st.markdown(f"### 🔔 Bildirimler ({len(unread)})")
+            st.markdown(f"### 🔔 Bildirimler ({unread_count})")
             
-            for notif in unread[:5]:  # Show only latest 5
+            for notif in unread:
                 with st.expander(f"{notif['title']} - {notif['timestamp'].strftime('%H:%M')}"):
                     st.write(notif['message'])
                     
                     col1, col2 = st.columns(2)
                     with col1:
-                        if st.button("✓ Okundu", key=f"read_{notif['index']}"):
-                            nm.mark_as_read(notif['index'])
+                        if st.button("✓ Okundu", key=f"read_{notif['id']}"):
+                            nm.mark_as_read(notif['id'])
                             st.rerun()
                     
                     with col2:
                         # Action buttons based on notification type
                         if notif['type'] == 'new_order' and 'order_id' in notif:
-                            if st.button("👀 Görüntüle", key=f"view_{notif['index']}"):
+                            if st.button("👀 Görüntüle", key=f"view_{notif['id']}"):
                                 st.session_state.view_order_id = notif['order_id']
                                 st.switch_page("pages/4_📊_Admin_Dashboard.py")
             
-            if len(unread) > 5:
-                st.info(f"+{len(unread) - 5} bildirim daha...")
+            if unread_count > 5:
+                st.info(f"+{unread_count - 5} bildirim daha...")
             
             if st.button("🗑️ Tümünü Temizle"):
                 nm.clear_all_notifications()
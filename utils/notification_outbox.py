@@ -0,0 +1,257 @@
+"""
+Notification Outbox - Deliver emails/SMS in the background
+
+notify_* calls only insert a row into notification_outbox; a single worker
+thread per process picks due messages up in batches, sends them over one
+persistent SMTP connection, retries failures with exponential backoff and
+dead-letters messages that keep failing. Checkout never waits for SMTP.
+"""
+
+import os
+import random
+import smtplib
+import threading
+import time
+from datetime import datetime, timedelta
+from email.mime.text import MIMEText
+from email.mime.multipart import MIMEMultipart
+from typing import Callable, Optional
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from database.db_manager import get_db
+
+
+class OutboxWorker:
+    """Background sender for the notification outbox"""
+    
+    def __init__(self, smtp_factory: Optional[Callable] = None, sms_sender: Optional[Callable] = None,
+                 batch_size=None, poll_interval=None, max_attempts=None, retry_base=None, idle_timeout=None):
+        # Email settings
+        self.smtp_server = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
+        self.smtp_port = int(os.getenv('SMTP_PORT', '587'))
+        self.smtp_starttls = os.getenv('SMTP_STARTTLS', 'true').lower() == 'true'
+        self.email_from = os.getenv('EMAIL_FROM', '')
+        self.email_password = os.getenv('EMAIL_PASSWORD', '')
+        
+        self.smtp_factory = smtp_factory or self._default_smtp_factory
+        self.sms_sender = sms_sender or self._default_sms_sender
+        
+        # Delivery settings
+        self.batch_size = int(batch_size or os.getenv('OUTBOX_BATCH_SIZE', '20'))
+        self.poll_interval = float(poll_interval if poll_interval is not None
+                                   else os.getenv('OUTBOX_POLL_INTERVAL', '5'))
+        self.max_attempts = int(max_attempts or os.getenv('OUTBOX_MAX_ATTEMPTS', '5'))
+        self.retry_base = float(retry_base if retry_base is not None
+                                else os.getenv('OUTBOX_RETRY_BASE', '10'))
+        self.retry_max = float(os.getenv('OUTBOX_RETRY_MAX', '900'))
+        # Close the SMTP connection after this many idle seconds
+        self.idle_timeout = float(idle_timeout if idle_timeout is not None
+                                  else os.getenv('OUTBOX_SMTP_IDLE_TIMEOUT', '60'))
+        
+        self._smtp = None
+        self._smtp_last_used = 0.0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+    
+    # ========================
+    # CHANNELS
+    # ========================
+    
+    def _default_smtp_factory(self):
+        """Open and authenticate an SMTP connection"""
+        smtp = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=10)
+        if self.smtp_starttls:
+            smtp.starttls()
+        if self.email_from and self.email_password:
+            smtp.login(self.email_from, self.email_password)
+        return smtp
+    
+    def _default_sms_sender(self, to_phone, message):
+        # Placeholder for SMS integration
+        # Would integrate with Twilio, AWS SNS, or similar service
+        # Example with Twilio:
+        # from twilio.rest import Client
+        # client = Client(account_sid, auth_token)
+        # client.messages.create(to=to_phone, from_=os.getenv('SMS_FROM'), body=message)
+        print(f"SMS (would send): {message}")
+    
+    def _get_smtp(self):
+        if self._smtp is None:
+            self._smtp = self.smtp_factory()
+        return self._smtp
+    
+    def _close_smtp(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except Exception:
+                pass
+            self._smtp = None
+    
+    def _send_email(self, message):
+        msg = MIMEMultipart()
+        msg['From'] = self.email_from
+        msg['To'] = message['recipient'] or self.email_from
+        msg['Subject'] = message['subject'] or ''
+        msg.attach(MIMEText(message['body'], 'plain', 'utf-8'))
+        
+        try:
+            self._get_smtp().send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            # The kept-alive connection was dropped by the server - reconnect once
+            self._close_smtp()
+            self._get_smtp().send_message(msg)
+        self._smtp_last_used = time.monotonic()
+    
+    def _deliver(self, message):
+        if message['channel'] == 'email':
+            self._send_email(message)
+        elif message['channel'] == 'sms':
+            self.sms_sender(message['recipient'], message['body'])
+        else:
+            raise ValueError(f"Unknown channel: {message['channel']}")
+    
+    def _retry_at(self, attempts):
+        """Next attempt time after `attempts` failures, or None to dead-letter"""
+        if attempts >= self.max_attempts:
+            return None
+        delay = min(self.retry_base * (2 ** (attempts - 1)), self.retry_max)
+        return datetime.now() + timedelta(seconds=delay * random.uniform(0.8, 1.2))
+    
+    # ========================
+    # PROCESSING
+    # ========================
+    
+    def run_once(self):
+        """Deliver one batch of due messages, return how many were processed"""
+        with self._lock:
+            db = get_db()
+            try:
+                messages = [
+                    {
+                        'id': m.id,
+                        'channel': m.channel,
+                        'recipient': m.recipient,
+                        'subject': m.subject,
+                        'body': m.body,
+                        'attempts': m.attempts,
+                    }
+                    for m in db.get_due_outbox_messages(limit=self.batch_size)
+                ]
+                
+                sent = []
+                for message in messages:
+                    try:
+                        self._deliver(message)
+                        sent.append(message['id'])
+                    except Exception as e:
+                        # Rejected by the server: the connection itself is still fine
+                        if message['channel'] == 'email' and not isinstance(e, smtplib.SMTPResponseException):
+                            self._close_smtp()
+                        db.record_outbox_failure(
+                            message['id'], e, self._retry_at(message['attempts'] + 1)
+                        )
+                
+                db.mark_outbox_sent(sent)
+            finally:
+                db.close()
+            
+            return len(messages)
+    
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                while self.run_once() and not self._stop.is_set():
+                    pass
+            except Exception as e:
+                print(f"Outbox worker error: {e}")
+            
+            if self._smtp is not None and time.monotonic() - self._smtp_last_used > self.idle_timeout:
+                self._close_smtp()
+            
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+        
+        self._close_smtp()
+    
+    def wake(self):
+        """Ask the worker to look at the outbox now (called after enqueueing)"""
+        self._wake.set()
+    
+    def start(self):
+        """Start the background thread (no-op if already running)"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="notification-outbox", daemon=True)
+            self._thread.start()
+    
+    def stop(self, timeout=5):
+        """Stop the background thread and close the SMTP connection"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+def enqueue_message(channel: str, body: str, recipient: Optional[str] = None, subject: Optional[str] = None):
+    """Queue a message for background delivery and wake the worker"""
+    db = get_db()
+    try:
+        db.enqueue_outbox_message(channel, body, recipient=recipient, subject=subject)
+    finally:
+        db.close()
+    
+    get_outbox_worker().wake()
+
+
+# Global outbox worker instance
+_outbox_worker = None
+_outbox_worker_lock = threading.Lock()
+
+def get_outbox_worker() -> OutboxWorker:
+    """Get the process-wide outbox worker, starting it on first use"""
+    global _outbox_worker
+    
+    if _outbox_worker is None:
+        with _outbox_worker_lock:
+            if _outbox_worker is None:
+                _outbox_worker = OutboxWorker()
+                _outbox_worker.start()
+    
+    return _outbox_worker
+
+
+_startup_checked = False
+_startup_lock = threading.Lock()
+
+def resume_pending_deliveries():
+    """
+    Start the worker if a previous process left pending or retrying messages
+    
+    Runs the check once per process (from init_session_state); later messages
+    start the worker themselves through enqueue_message.
+    """
+    global _startup_checked
+    
+    if _startup_checked:
+        return
+    with _startup_lock:
+        if _startup_checked:
+            return
+        try:
+            db = get_db()
+            try:
+                pending = db.has_pending_outbox_messages()
+            finally:
+                db.close()
+            if pending:
+                get_outbox_worker()
+        except SQLAlchemyError as e:
+            # e.g. no notification_outbox table yet (run add_notification_tables.py); pages still load
+            print(f"Outbox startup check failed: {e}")
+        finally:
+            _startup_checked = True
@@ -7,11 +7,13 @@ from streamlit_option_menu import option_menu
 
 def show_customer_navigation():
     """Show customer navigation menu"""
-    # Get restaurant info for logo
-    from database.db_manager import get_db
-    db = get_db()
-    restaurant = db.get_restaurant_info()
-    db.close()
+    # Load the AI assistant in the background while the diner browses (once per process)
+    from ai.warmup import start_warmup
+    start_warmup()
+    
+    # Get restaurant info for logo (cached menu snapshot - no query per rerun)
+    from database.menu_cache import get_menu_snapshot
+    restaurant = get_menu_snapshot().restaurant
     
     with st.sidebar:
         # Show logo at the top of sidebar (responsive, smaller on mobile)
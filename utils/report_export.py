@@ -0,0 +1,220 @@
+"""
+Report Export - Stream order reports to CSV, Excel or Parquet with bounded memory
+
+The old exports built a DataFrame of every order and an in-memory openpyxl
+workbook before offering the download; a year of orders meant hundreds of MB.
+Here orders are read from a streaming cursor in chunks (EXPORT_CHUNK_SIZE
+rows; one extra query per chunk fetches the chunk's items) and each chunk is
+written straight to a file:
+
+- csv:     csv module, UTF-8 with BOM so Excel shows Turkish characters
+- xlsx:    xlsxwriter in constant_memory mode (rows are flushed to disk as
+           they are written); continues on a new sheet past Excel's row limit
+- parquet: pyarrow ParquetWriter, one row group per chunk (needs pyarrow)
+
+Memory stays proportional to the chunk size, whatever the date range.
+
+    path = export_orders_to_file('xlsx', start_date, end_date, table_id=None)
+"""
+
+import csv
+import os
+import tempfile
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from sqlalchemy import select
+
+from database.db_manager import day_range
+from database.models import MenuItem, Order, OrderItem, Table, get_session
+
+
+FORMATS = {
+    'xlsx': ('.xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+    'csv': ('.csv', 'text/csv'),
+    'parquet': ('.parquet', 'application/vnd.apache.parquet'),
+}
+
+ORDER_COLUMNS = ['Sipariş No', 'Masa', 'Tarih', 'Saat', 'Durum', 'Ürünler', 'Toplam (₺)', 'Özel İstek']
+
+# Excel's limit is 1,048,576 rows per sheet, including the header
+EXCEL_MAX_ROWS = 1_048_575
+
+
+def _chunk_size(chunk_size=None):
+    return int(chunk_size or os.getenv('EXPORT_CHUNK_SIZE', '5000'))
+
+
+# ========================
+# READING
+# ========================
+
+def iter_order_chunks(start_date, end_date, table_id=None, chunk_size=None) -> Iterator[List[tuple]]:
+    """
+    Orders in the date range as lists of ORDER_COLUMNS tuples, newest first
+
+    Opens its own session (safe to call from a download callback thread).
+    """
+    chunk_size = _chunk_size(chunk_size)
+    range_start, range_end = day_range(start_date, end_date)
+    query = select(
+        Order.id, Order.order_number, Table.table_number, Order.created_at,
+        Order.status, Order.total_amount, Order.special_requests
+    ).join(
+        Table, Order.table_id == Table.id
+    ).where(
+        Order.created_at >= range_start,
+        Order.created_at < range_end
+    ).order_by(Order.created_at.desc(), Order.id.desc())
+    if table_id:
+        query = query.where(Order.table_id == table_id)
+    
+    session = get_session()
+    try:
+        orders = session.execute(query.execution_options(stream_results=True, yield_per=chunk_size))
+        for partition in orders.partitions():
+            items = {}
+            for order_id, quantity, name in session.execute(
+                select(OrderItem.order_id, OrderItem.quantity, MenuItem.name)
+                .join(MenuItem, OrderItem.menu_item_id == MenuItem.id)
+                .where(OrderItem.order_id.in_([row.id for row in partition]))
+                .order_by(OrderItem.order_id, OrderItem.id)
+            ):
+                items.setdefault(order_id, []).append(f"{quantity}x {name}")
+            
+            yield [
+                (
+                    row.order_number,
+                    row.table_number,
+                    row.created_at.strftime('%d.%m.%Y'),
+                    row.created_at.strftime('%H:%M'),
+                    row.status,
+                    ", ".join(items.get(row.id, [])),
+                    round(row.total_amount or 0.0, 2),
+                    row.special_requests or '-',
+                )
+                for row in partition
+            ]
+    finally:
+        session.close()
+
+
+# ========================
+# WRITING
+# ========================
+
+def write_csv(chunks: Iterable[Sequence[tuple]], columns: Sequence[str], path) -> int:
+    """Write row chunks to a CSV file; returns the number of rows"""
+    count = 0
+    with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for chunk in chunks:
+            writer.writerows(chunk)
+            count += len(chunk)
+    return count
+
+
+def write_xlsx(chunks: Iterable[Sequence[tuple]], columns: Sequence[str], path,
+               sheet_name='Siparişler', summary: Optional[Dict] = None) -> int:
+    """
+    Write row chunks to an Excel file in constant_memory mode; returns the number of rows
+
+    summary (label -> value) is written to an 'Özet' sheet after the data.
+    """
+    import xlsxwriter
+    
+    workbook = xlsxwriter.Workbook(path, {'constant_memory': True})
+    try:
+        header = workbook.add_format({'bold': True})
+        count = 0
+        sheets = 0
+        worksheet = None
+        row_index = EXCEL_MAX_ROWS
+        for chunk in chunks:
+            for row in chunk:
+                if row_index == EXCEL_MAX_ROWS:
+                    sheets += 1
+                    worksheet = workbook.add_worksheet(sheet_name if sheets == 1 else f"{sheet_name} {sheets}")
+                    worksheet.write_row(0, 0, columns, header)
+                    row_index = 0
+                row_index += 1
+                worksheet.write_row(row_index, 0, row)
+            count += len(chunk)
+        if worksheet is None:
+            worksheet = workbook.add_worksheet(sheet_name)
+            worksheet.write_row(0, 0, columns, header)
+        
+        if summary:
+            summary_sheet = workbook.add_worksheet('Özet')
+            for i, (label, value) in enumerate(summary.items()):
+                summary_sheet.write_row(i, 0, (label, value))
+    finally:
+        workbook.close()
+    return count
+
+
+def write_parquet(chunks: Iterable[Sequence[tuple]], columns: Sequence[str], path) -> int:
+    """Write row chunks to a Parquet file, one row group per chunk; returns the number of rows"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    
+    count = 0
+    writer = None
+    try:
+        for chunk in chunks:
+            if not chunk:
+                continue
+            batch = pa.Table.from_arrays(
+                [pa.array(values) for values in zip(*chunk)], names=list(columns)
+            )
+            if writer is None:
+                writer = pq.ParquetWriter(path, batch.schema)
+            writer.write_table(batch.cast(writer.schema))
+            count += len(chunk)
+        if writer is None:
+            pq.write_table(pa.table({name: pa.array([], pa.string()) for name in columns}), path)
+    finally:
+        if writer is not None:
+            writer.close()
+    return count
+
+
+# ========================
+# ORDER EXPORT
+# ========================
+
+def export_orders(path, fmt, start_date, end_date, table_id=None, chunk_size=None, summary=None) -> int:
+    """
+    Stream the orders in a date range into a file
+
+    Args:
+        path: Output file path
+        fmt: 'xlsx', 'csv' or 'parquet'
+        summary: Extra label -> value rows for the xlsx 'Özet' sheet
+
+    Returns:
+        Number of orders written
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    chunks = iter_order_chunks(start_date, end_date, table_id=table_id, chunk_size=chunk_size)
+    if fmt == 'xlsx':
+        return write_xlsx(chunks, ORDER_COLUMNS, path, summary=summary)
+    if fmt == 'csv':
+        return write_csv(chunks, ORDER_COLUMNS, path)
+    return write_parquet(chunks, ORDER_COLUMNS, path)
+
+
+def export_orders_to_file(fmt, start_date, end_date, table_id=None, chunk_size=None, summary=None) -> str:
+    """export_orders() into a new temporary file; the caller deletes it"""
+    suffix = FORMATS[fmt][0]
+    fd, path = tempfile.mkstemp(prefix=f"orders_{datetime.now():%Y%m%d%H%M%S}_", suffix=suffix)
+    os.close(fd)
+    try:
+        export_orders(path, fmt, start_date, end_date, table_id=table_id,
+                      chunk_size=chunk_size, summary=summary)
+    except Exception:
+        os.remove(path)
+        raise
+    return path
@@ -6,10 +6,15 @@ import streamlit as st
 import uuid
 from datetime import datetime
 
+from utils.notification_outbox import resume_pending_deliveries
+
 
 def init_session_state():
     """Initialize session state variables"""
     
+    # Deliver notifications left in the outbox by a previous process
+    resume_pending_deliveries()
+    
     # User session
     if 'session_id' not in st.session_state:
         st.session_state.session_id = str(uuid.uuid4())
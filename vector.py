@@ -1,11 +1,11 @@
-from langchain_ollama import OllamaEmbeddings
 from langchain_chroma import Chroma
 from langchain_core.documents import Document
 import os
 import pandas as pd
+from ai.embedding_cache import get_cached_embeddings
 
 df = pd.read_csv("realistic_restaurant_reviews.csv")
-embeddings = OllamaEmbeddings(model="mxbai-embed-large")
+embeddings = get_cached_embeddings("mxbai-embed-large")
 
 db_location = "./chrome_langchain_db"
 add_documents = not os.path.exists(db_location)